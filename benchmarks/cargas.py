@@ -0,0 +1,140 @@
+import random
+
+
+# Programas gerados para o suite.py: os de tamanho crescem com o código (muitos comandos, blocos
+# aninhados, expressões longas) e os de laço com o número de iterações. Todos terminam sem erro e
+# exibem pouca coisa, para que o tempo medido seja o do compilador e não o da saída.
+def comandos(quantidade, variaveis=10):
+    random.seed(quantidade)
+    linhas = ["INICIO"]
+    linhas.extend(f"    GUARDAR V{i} COMO NUMERO COM {i} ;" for i in range(variaveis))
+
+    for i in range(quantidade):
+        destino = random.randrange(variaveis)
+        origem = random.randrange(variaveis)
+        operador = random.choice(("MAIS", "MENOS", "VEZES"))
+        linhas.append(f"    V{destino} RECEBE V{origem} {operador} {random.randint(1, 9)} DIVIDIDO 3 ;")
+
+        if i % 100 == 99:
+            linhas.append(f"    EXIBIR(V{destino}) ;")
+
+    linhas.append("FIM")
+    return "\n".join(linhas)
+
+
+def aninhamento(profundidade):
+    linhas = ["INICIO", "    GUARDAR X COMO NUMERO COM 0 ;", "    GUARDAR T COMO TEXTO COM \"\" ;"]
+
+    for nivel in range(profundidade):
+        recuo = "    " * (nivel + 1)
+
+        if nivel % 2:
+            linhas.append(f"{recuo}QUANDO (X MAIOR {nivel - 1} E NAO (X IGUAL 1000)) INICIO")
+        else:
+            # Laço de uma volta só: o corpo executa uma vez e a condição fica falsa na saída
+            linhas.append(f"{recuo}GUARDAR N{nivel} COMO NUMERO COM 0 ;")
+            linhas.append(f"{recuo}ENQUANTO (N{nivel} MENOR 1) INICIO")
+            linhas.append(f"{recuo}    N{nivel} RECEBE N{nivel} MAIS 1 ;")
+
+        linhas.append(f"{recuo}    X RECEBE X MAIS 1 ;")
+        linhas.append(f"{recuo}    T RECEBE T CONCATENA \"+\" ;")
+
+    for nivel in reversed(range(profundidade)):
+        linhas.append("    " * (nivel + 1) + "FIM")
+
+    linhas.append("    EXIBIR(X CONCATENA \" \" CONCATENA T) ;")
+    linhas.append("FIM")
+    return "\n".join(linhas)
+
+
+def expressao(operandos, repeticoes=20):
+    random.seed(operandos)
+    partes = ["X"]
+
+    for i in range(1, operandos):
+        partes.append(random.choice(("MAIS", "MENOS", "VEZES", "DIVIDIDO")))
+        partes.append(random.choice(("X", "(X MAIS 1)", str(random.randint(1, 9)))))
+
+    cadeia = " ".join(partes)
+    linhas = ["INICIO", "    GUARDAR X COMO NUMERO COM 3 ;", "    GUARDAR Y COMO NUMERO COM 0 ;"]
+    linhas.extend(f"    Y RECEBE {cadeia} ;" for _ in range(repeticoes))
+    linhas.append("    EXIBIR(Y) ;")
+    linhas.append("FIM")
+    return "\n".join(linhas)
+
+
+def contagem(iteracoes):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {iteracoes})
+        INICIO
+            SOMA RECEBE SOMA MAIS I VEZES 2 MENOS I DIVIDIDO 3 ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(SOMA) ;
+    FIM
+    """
+
+
+def textos(iteracoes):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR T COMO TEXTO COM "" ;
+        GUARDAR LINHA COMO TEXTO COM "" ;
+        ENQUANTO (I MENOR {iteracoes})
+        INICIO
+            LINHA RECEBE "item " CONCATENA I CONCATENA ": " CONCATENA (I MAIOR {iteracoes // 2}) ;
+            T RECEBE T CONCATENA LINHA ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(LINHA) ;
+    FIM
+    """
+
+
+def condicoes(iteracoes):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 1 ;
+        GUARDAR A COMO NUMERO COM 0 ;
+        GUARDAR B COMO NUMERO COM 0 ;
+        GUARDAR C COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {iteracoes + 1})
+        INICIO
+            QUANDO (I DIVIDIDO 15 VEZES 15 IGUAL I)
+            INICIO
+                A RECEBE A MAIS 1 ;
+            FIM
+            SENAO
+            INICIO
+                QUANDO (I DIVIDIDO 5 VEZES 5 IGUAL I)
+                INICIO
+                    B RECEBE B MAIS 1 ;
+                FIM
+                SENAO
+                INICIO
+                    QUANDO ((I DIVIDIDO 3 VEZES 3 IGUAL I) OU (I MENOR 10))
+                    INICIO
+                        C RECEBE C MAIS 1 ;
+                    FIM
+                FIM
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(A CONCATENA " " CONCATENA B CONCATENA " " CONCATENA C) ;
+    FIM
+    """
+
+
+# Nome -> (gerador, tamanho padrão); o suite.py multiplica o tamanho por --escala
+CARGAS = {
+    "comandos": (comandos, 20000),
+    "aninhamento": (aninhamento, 150),
+    "expressao": (expressao, 2000),
+    "contagem": (contagem, 100000),
+    "textos": (textos, 20000),
+    "condicoes": (condicoes, 100000),
+}
@@ -0,0 +1,85 @@
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Input, Parser
+
+
+# Lê um nome e uma lista de notas, como nas execuções de correção alimentadas por arquivo
+def notas(quantidade):
+    return f"""
+    INICIO
+        GUARDAR NOME COMO TEXTO COM PERGUNTAR() ;
+        GUARDAR NOTA COMO NUMERO COM 0 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {quantidade})
+        INICIO
+            NOTA RECEBE PERGUNTAR() ;
+            SOMA RECEBE SOMA MAIS NOTA ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(NOME CONCATENA ": " CONCATENA SOMA) ;
+    FIM
+    """
+
+
+def entrada(quantidade, arquivo):
+    random.seed(0)
+
+    with open(arquivo, "w", encoding="utf-8") as f:
+        f.write("Turma de teste\n")
+        f.writelines(f"{random.randint(-100, 100)}\n" for _ in range(quantidade))
+
+
+def interpretar(codigo, arquivo, lote):
+    with open(arquivo, encoding="utf-8") as f, open(os.devnull, "w") as nulo:
+        stdin, stdout = sys.stdin, sys.stdout
+        sys.stdin, sys.stdout = f, nulo
+        Input.configure(lote)
+        inicio = time.perf_counter()
+
+        try:
+            Parser.run(codigo)
+        finally:
+            sys.stdin, sys.stdout = stdin, stdout
+            Input.configure()
+
+    return time.perf_counter() - inicio
+
+
+def compilado(codigo, arquivo, destino):
+    programa = os.path.join(destino, "notas.lumen")
+    Parser.geracodigo(codigo, programa)
+    inicio = time.perf_counter()
+
+    with open(arquivo, encoding="utf-8") as f:
+        saida = subprocess.run(["lli", "-O2", os.path.join(destino, "notas.ll")], stdin=f, capture_output=True, text=True, check=True)
+
+    return time.perf_counter() - inicio, saida.stdout
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    codigo = notas(quantidade)
+
+    with tempfile.TemporaryDirectory() as destino:
+        arquivo = os.path.join(destino, "entrada.txt")
+        entrada(quantidade, arquivo)
+
+        print(f"{quantidade} linhas de entrada")
+        print(f"{'execução':24} {'tempo':>12} {'linhas/s':>12}")
+
+        for nome, lote in (("input() por PERGUNTAR", False), ("em lote", True)):
+            tempo = interpretar(codigo, arquivo, lote)
+            print(f"{nome:24} {tempo * 1000:9.1f} ms {quantidade / tempo:12.0f}")
+
+        if shutil.which("lli") is not None:
+            tempo, saida = compilado(codigo, arquivo, destino)
+            print(f"{'LLVM (lli)':24} {tempo * 1000:9.1f} ms {quantidade / tempo:12.0f}   {saida.strip()}")
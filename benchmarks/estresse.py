@@ -0,0 +1,141 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador import gerar
+from main import Parser, Telemetry
+
+
+# Roda em um processo novo para cada tamanho, para que o pico de RSS de uma medida não contamine
+# a seguinte: compila o arquivo como o main.py faz (streaming, -O1) e escreve a telemetria em JSON
+def medir(arquivo):
+    rss_inicial = Telemetry.peakRss()
+    telemetria = Telemetry(arquivo, memory=False, rss=True)
+    inicio = time.perf_counter()
+
+    with open(arquivo, encoding="utf-8") as codigo:
+        Parser.geracodigo(codigo, arquivo, telemetry=telemetria)
+
+    resumo = telemetria.summary()
+    resumo["rss_inicial"] = rss_inicial
+    resumo["tempo_parede"] = time.perf_counter() - inicio
+    json.dump(resumo, sys.stdout)
+
+
+def expoente(pontos):
+    # Inclinação da reta de mínimos quadrados em escala log-log: 1 é linear, 2 é quadrático
+    pontos = [(math.log(x), math.log(y)) for x, y in pontos if y > 0]
+
+    if len(pontos) < 2:
+        return None
+
+    media_x = sum(x for x, _ in pontos) / len(pontos)
+    media_y = sum(y for _, y in pontos) / len(pontos)
+    variancia = sum((x - media_x) ** 2 for x, _ in pontos)
+    return sum((x - media_x) * (y - media_y) for x, y in pontos) / variancia if variancia else None
+
+
+def executar(opcoes):
+    resultados = {}
+
+    with tempfile.TemporaryDirectory() as destino:
+        for tamanho in opcoes.tamanhos:
+            arquivo = os.path.join(destino, f"estresse_{tamanho}.lumen")
+            gerar(arquivo, tamanho, opcoes.profundidade, opcoes.operandos, opcoes.variaveis, opcoes.semente)
+            print(f"{tamanho} comandos ({os.path.getsize(arquivo) / (1 << 20):.1f} MB de código)...", file=sys.stderr, flush=True)
+
+            try:
+                processo = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--medir", arquivo],
+                    capture_output=True, text=True, timeout=opcoes.tempo_limite,
+                )
+            except subprocess.TimeoutExpired:
+                resultados[tamanho] = {"erro": f"passou de {opcoes.tempo_limite} s"}
+                continue
+
+            if processo.returncode != 0:
+                linhas = processo.stderr.strip().splitlines()
+                resultados[tamanho] = {"erro": linhas[-1] if linhas else f"código de saída {processo.returncode}"}
+                continue
+
+            resultados[tamanho] = json.loads(processo.stdout)
+
+    return resultados
+
+
+# Uma linha por fase: tempo e RSS acrescido em cada tamanho, e o expoente de crescimento de cada um
+def relatorio(resultados, tolerancia):
+    medidos = {tamanho: resultado for tamanho, resultado in resultados.items() if "erro" not in resultado}
+    fases = list(dict.fromkeys(fase for resultado in medidos.values() for fase in resultado["fases"]))
+    superlineares = []
+
+    print(f"{'fase':14}" + "".join(f"{tamanho:>20}" for tamanho in medidos) + f"{'expoente':>18}")
+
+    for fase in fases:
+        tempos = []
+        memorias = []
+        colunas = ""
+
+        for tamanho, resultado in medidos.items():
+            medida = resultado["fases"].get(fase)
+
+            if medida is None:
+                colunas += f"{'-':>20}"
+                continue
+
+            acrescimo = (medida["rss_pico"] or 0) - resultado["rss_inicial"]
+            tempos.append((tamanho, medida["tempo"]))
+            memorias.append((tamanho, acrescimo))
+            colunas += f"{medida['tempo'] * 1000:11.0f} ms {max(acrescimo, 0) / (1 << 20):4.0f} MB"
+
+        expoente_tempo = expoente(tempos)
+        expoente_memoria = expoente(memorias)
+        marcas = []
+
+        for nome, valor in (("tempo", expoente_tempo), ("RSS", expoente_memoria)):
+            if valor is not None and valor > 1 + tolerancia:
+                marcas.append(nome)
+                superlineares.append((fase, nome, valor))
+
+        descricao = " / ".join("-" if valor is None else f"{valor:.2f}" for valor in (expoente_tempo, expoente_memoria))
+        print(f"{fase:14}{colunas}{descricao:>18}" + (f"  SUPERLINEAR ({', '.join(marcas)})" if marcas else ""))
+
+    for tamanho, resultado in resultados.items():
+        if "erro" in resultado:
+            print(f"{tamanho} comandos: falhou ({resultado['erro']})")
+
+    return superlineares
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Compila programas gerados de tamanhos crescentes e aponta fases que crescem mais que linearmente")
+    argumentos.add_argument("--tamanhos", type=int, nargs="+", default=[10000, 30000, 100000, 300000, 1000000], help="números de comandos a medir")
+    argumentos.add_argument("--profundidade", type=int, default=8, help="aninhamento máximo de QUANDO e ENQUANTO (padrão: 8)")
+    argumentos.add_argument("--operandos", type=int, default=6, help="operandos por expressão, no máximo (padrão: 6)")
+    argumentos.add_argument("--variaveis", type=int, default=20, help="número de variáveis (padrão: 20)")
+    argumentos.add_argument("--semente", type=int, default=0, help="semente do gerador (padrão: 0)")
+    argumentos.add_argument("--tolerancia", type=float, default=0.15, help="expoente acima de 1 + tolerância conta como superlinear (padrão: 0.15)")
+    argumentos.add_argument("--tempo-limite", type=float, default=1800, help="segundos por tamanho antes de desistir (padrão: 1800)")
+    argumentos.add_argument("--json", metavar="ARQUIVO", help="grava as medidas de todos os tamanhos em JSON")
+    argumentos.add_argument("--medir", metavar="ARQUIVO", help=argparse.SUPPRESS)
+    opcoes = argumentos.parse_args()
+
+    if opcoes.medir:
+        medir(opcoes.medir)
+        sys.exit(0)
+
+    resultados = executar(opcoes)
+
+    if opcoes.json:
+        with open(opcoes.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"parametros": vars(opcoes), "resultados": resultados}, arquivo, ensure_ascii=False, indent=2)
+
+    if relatorio(resultados, opcoes.tolerancia):
+        sys.exit(1)
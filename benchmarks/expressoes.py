@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser, PreLexTokenizer
+
+
+# Cadeias longas de operadores, como as geradas por ferramentas
+def cadeia(operandos):
+    operadores = ["MAIS", "VEZES", "MENOS", "DIVIDIDO"]
+    partes = ["1"]
+
+    for i in range(1, operandos):
+        partes.append(operadores[i % len(operadores)])
+        partes.append(str(i))
+
+    return " ".join(partes)
+
+
+def logica(operandos):
+    partes = ["(X MENOR 1)"]
+
+    for i in range(1, operandos):
+        partes.append("E" if i % 2 else "OU")
+        partes.append(f"(X IGUAL {i})")
+
+    return " ".join(partes)
+
+
+def parenteses(profundidade):
+    return "(" * profundidade + "1" + " MAIS 1)" * profundidade
+
+
+def medir(expressao, recursive, repeticoes):
+    melhor = None
+
+    for _ in range(repeticoes):
+        tokenizer = PreLexTokenizer(expressao, 0, None)
+        tokenizer.selectNext()
+        parser = Parser(tokenizer, recursive)
+
+        inicio = time.perf_counter()
+
+        try:
+            parser.parseExpressionTree()
+        except RecursionError:
+            return None
+
+        tempo = time.perf_counter() - inicio
+        melhor = tempo if melhor is None else min(melhor, tempo)
+
+    return melhor
+
+
+def formatar(tempo):
+    return "RecursionError" if tempo is None else f"{tempo * 1000:10.2f} ms"
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    casos = [
+        ("aritmética, 1.000 operandos", cadeia(1000)),
+        ("aritmética, 100.000 operandos", cadeia(100000)),
+        ("lógica, 10.000 comparações", logica(10000)),
+        ("parênteses, profundidade 100", parenteses(100)),
+        ("parênteses, profundidade 5.000", parenteses(5000)),
+    ]
+
+    print(f"{'caso':34} {'recursivo':>14} {'precedência':>14}")
+
+    for nome, expressao in casos:
+        recursivo = medir(expressao, True, repeticoes)
+        iterativo = medir(expressao, False, repeticoes)
+        print(f"{nome:34} {formatar(recursivo):>14} {formatar(iterativo):>14}")
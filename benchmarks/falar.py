@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser, RecordedSpeech, SpeechEngine
+
+
+# Backend sem áudio que demora um tempo fixo por fala, como um sintetizador de verdade
+class FalaLenta(RecordedSpeech):
+    def __init__(self, duracao):
+        super().__init__()
+        self.duracao = duracao
+
+    def say(self, text):
+        time.sleep(self.duracao)
+        super().say(text)
+
+
+# Cada fala é seguida de um laço de cálculo, que pode rodar enquanto a fala anterior toca
+def programa(falas, trabalho):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR J COMO NUMERO COM 0 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {falas})
+        INICIO
+            FALAR("passo " CONCATENA I) ;
+            J RECEBE 0 ;
+            ENQUANTO (J MENOR {trabalho})
+            INICIO
+                SOMA RECEBE SOMA MAIS J ;
+                J RECEBE J MAIS 1 ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+    FIM
+    """
+
+
+def medir(codigo, backend, bloqueante):
+    SpeechEngine.configure(backend, bloqueante)
+    inicio = time.perf_counter()
+    Parser.run(codigo)
+    tempo = time.perf_counter() - inicio
+    SpeechEngine.configure()
+    return tempo
+
+
+if __name__ == "__main__":
+    falas = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    duracao = 0.002
+    codigo = programa(falas, 500)
+
+    print(f"{falas} falas de {duracao * 1000:.0f} ms")
+    print(f"{'modo':16} {'tempo':>12}")
+
+    for nome, bloqueante in (("bloqueante", True), ("fila", False)):
+        backend = FalaLenta(duracao)
+        tempo = medir(codigo, backend, bloqueante)
+
+        if len(backend.spoken) != falas:
+            raise AssertionError(f"Número de falas diferente no modo '{nome}'")
+
+        print(f"{nome:16} {tempo * 1000:9.1f} ms")
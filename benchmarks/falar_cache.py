@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import CachedSpeech, Parser, Pyttsx3Speech, SpeechCache, SpeechEngine
+
+
+# Imita o motor do pyttsx3 sem áudio: sintetizar custa um tempo fixo e gera um "wav" do tamanho
+# do texto, e o player é um processo que só lê a entrada
+class MotorFalso:
+    def __init__(self, duracao):
+        self.duracao = duracao
+        self.pendente = None
+        self.sintetizadas = 0
+
+    def getProperty(self, name):
+        return {"voice": "pt", "rate": 200, "volume": 0.7}[name]
+
+    def say(self, text):
+        self.pendente = (text, None)
+
+    def save_to_file(self, text, path):
+        self.pendente = (text, path)
+
+    def runAndWait(self):
+        time.sleep(self.duracao)
+
+        if self.pendente is not None:
+            text, path = self.pendente
+
+            if path is not None:
+                with open(path, "wb") as file:
+                    file.write(text.encode() * 2000)
+
+            self.sintetizadas += 1
+            self.pendente = None
+
+
+# Poucas frases repetidas muitas vezes, como respostas e avisos que se alternam em ciclo
+def programa(falas):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {falas})
+        INICIO
+            QUANDO (I DIVIDIDO 3 VEZES 3 IGUAL I)
+            INICIO
+                FALAR("Correto!") ;
+            FIM
+            SENAO
+            INICIO
+                FALAR("Tente a pergunta " CONCATENA (I MENOS I DIVIDIDO 12 VEZES 12)) ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+    FIM
+    """
+
+
+def medir(codigo, backend):
+    SpeechEngine.configure(backend, True)
+    inicio = time.perf_counter()
+    Parser.run(codigo)
+    tempo = time.perf_counter() - inicio
+    SpeechEngine.configure()
+    return tempo
+
+
+if __name__ == "__main__":
+    falas = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    duracao = 0.01
+    codigo = programa(falas)
+
+    print(f"{falas} falas, síntese de {duracao * 1000:.0f} ms")
+
+    sem_cache = Pyttsx3Speech()
+    sem_cache.engine = MotorFalso(duracao)
+    print(f"{'sem cache':28} {medir(codigo, sem_cache) * 1000:9.1f} ms, {sem_cache.engine.sintetizadas} sínteses")
+
+    with tempfile.TemporaryDirectory() as destino:
+        # Com pouca memória, o ciclo de frases não cabe e os acertos passam a vir do disco
+        for nome, memoria in (("cache em memória", 64 << 20), ("memória de 128 kB", 128 << 10)):
+            cache = SpeechCache(os.path.join(destino, nome), memory_limit=memoria, disk_limit=1 << 20)
+            com_cache = CachedSpeech(cache, player=("sh", "-c", "cat > /dev/null"))
+            com_cache.engine = MotorFalso(duracao)
+            tempo = medir(codigo, com_cache)
+
+            contadores = ", ".join(f"{total} {descricao}" for descricao, total in cache.stats().items())
+            print(f"{nome:28} {tempo * 1000:9.1f} ms, {com_cache.engine.sintetizadas} sínteses ({contadores})")
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser
+
+
+def falas(quantidade):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {quantidade})
+        INICIO
+            FALAR("fala número " CONCATENA I) ;
+            I RECEBE I MAIS 1 ;
+        FIM
+    FIM
+    """
+
+
+def executar(programa, ambiente):
+    inicio = time.perf_counter()
+    subprocess.run(["lli", "-O2", programa], env={**os.environ, **ambiente}, check=True)
+    return time.perf_counter() - inicio
+
+
+# Referência: o custo de abrir um shell por fala, como fazia o system("espeak ...")
+def processo_por_fala(quantidade):
+    inicio = time.perf_counter()
+
+    for _ in range(quantidade):
+        subprocess.run(["sh", "-c", ":"], check=True)
+
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    referencia = min(quantidade, 1000)
+
+    with tempfile.TemporaryDirectory() as destino:
+        arquivo = os.path.join(destino, "falas.lumen")
+        Parser.geracodigo(falas(quantidade), arquivo)
+        programa = os.path.join(destino, "falas.ll")
+        saida = os.path.join(destino, "falas.txt")
+
+        backends = [
+            ("arquivo", {"LUMEN_FALA_ARQUIVO": saida}),
+            ("pipe (cat)", {"LUMEN_FALA_COMANDO": f"cat > {saida}"}),
+        ]
+
+        print(f"{'saída de fala':26} {'falas':>9} {'tempo':>12} {'falas/s':>12}")
+
+        for nome, ambiente in backends:
+            tempo = executar(programa, ambiente)
+
+            with open(saida, encoding="utf-8") as f:
+                if sum(1 for _ in f) != quantidade:
+                    raise AssertionError(f"Número de falas diferente em '{nome}'")
+
+            os.remove(saida)
+            print(f"{nome:26} {quantidade:9} {tempo * 1000:9.1f} ms {quantidade / tempo:12.0f}")
+
+    tempo = processo_por_fala(referencia)
+    print(f"{'um processo por fala':26} {referencia:9} {tempo * 1000:9.1f} ms {referencia / tempo:12.0f}")
@@ -0,0 +1,60 @@
+import contextlib
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Code, Parser, SymbolTable, TypeChecker
+from memoria_ast import programa
+
+
+# Só a geração de código é medida: a árvore é lida, otimizada e verificada uma vez antes
+def gerar(arvore, stream, arquivo):
+    with (Code.temporary() if stream else contextlib.nullcontext()) as corpo:
+        codigo = Code(corpo)
+        arvore.Generate(SymbolTable(), codigo)
+        codigo.dump(arquivo)
+
+
+def medir(arvore, stream, arquivo, repeticoes):
+    melhor = None
+
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        gerar(arvore, stream, arquivo)
+        tempo = time.perf_counter() - inicio
+        melhor = tempo if melhor is None else min(melhor, tempo)
+
+    # O pico de memória é medido à parte, já que o tracemalloc deixa tudo mais lento
+    gc.collect()
+    tracemalloc.start()
+    gerar(arvore, stream, arquivo)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return melhor, pico
+
+
+if __name__ == "__main__":
+    comandos = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    codigo, comandos = programa(comandos // 4)
+
+    arvore, _ = Parser.optimize(Parser.parse(codigo))
+    TypeChecker().check(arvore)
+
+    print(f"{comandos} comandos, {len(codigo)} caracteres de código")
+    print(f"{'corpo do main':22} {'tempo':>12} {'pico de memória':>18} {'.ll':>12}")
+
+    with tempfile.TemporaryDirectory() as destino:
+        arquivo = os.path.join(destino, "programa.lumen")
+
+        for nome, stream in (("em memória", False), ("arquivo temporário", True)):
+            tempo, pico = medir(arvore, stream, arquivo, repeticoes)
+            tamanho = os.path.getsize(os.path.join(destino, "programa.ll"))
+            print(f"{nome:22} {tempo * 1000:9.1f} ms {pico / 2 ** 20:15.1f} MB {tamanho / 2 ** 20:9.1f} MB")
@@ -0,0 +1,95 @@
+import argparse
+import random
+
+
+# Gera programas LumenScript válidos de qualquer tamanho, linha a linha, sem montar o programa
+# inteiro na memória. Todas as variáveis são declaradas no início; expressões usam só NUMERO e
+# dividem apenas por constantes diferentes de zero, e cada ENQUANTO tem um contador próprio por
+# nível que limita o laço a duas voltas. Com a mesma semente, o programa gerado é sempre o mesmo.
+# São feitos para medir o compilador: executados no interpretador, os números crescem sem limite.
+def linhas(comandos, profundidade=8, operandos=6, variaveis=20, semente=0):
+    aleatorio = random.Random(semente)
+
+    def operando():
+        sorteio = aleatorio.random()
+
+        if sorteio < 0.55:
+            return f"V{aleatorio.randrange(variaveis)}"
+        elif sorteio < 0.9:
+            return str(aleatorio.randint(1, 99))
+
+        return f"(V{aleatorio.randrange(variaveis)} MAIS {aleatorio.randint(1, 9)})"
+
+    def expressao(tamanho):
+        partes = [operando()]
+
+        for _ in range(tamanho - 1):
+            operador = aleatorio.choice(("MAIS", "MENOS", "VEZES", "DIVIDIDO"))
+            partes.append(operador)
+            partes.append(str(aleatorio.randint(1, 9)) if operador == "DIVIDIDO" else operando())
+
+        return " ".join(partes)
+
+    yield "INICIO"
+
+    for i in range(variaveis):
+        yield f"    GUARDAR V{i} COMO NUMERO COM {i} ;"
+
+    for nivel in range(profundidade):
+        yield f"    GUARDAR C{nivel} COMO NUMERO COM 0 ;"
+
+    yield "    GUARDAR T COMO TEXTO COM \"\" ;"
+
+    # Cada bloco aberto guarda as linhas que o fecham
+    abertos = []
+    emitidos = 0
+
+    while emitidos < comandos:
+        nivel = len(abertos)
+        recuo = "    " * (nivel + 1)
+        sorteio = aleatorio.random()
+
+        if abertos and sorteio < 0.08:
+            yield from abertos.pop()
+            continue
+
+        emitidos += 1
+        tamanho = aleatorio.randint(1, operandos)
+
+        if nivel < profundidade and sorteio < 0.18:
+            yield f"{recuo}QUANDO ({expressao(tamanho)} MENOR {expressao(tamanho)}) INICIO"
+            abertos.append([f"{recuo}FIM"])
+        elif nivel < profundidade and sorteio < 0.26:
+            yield f"{recuo}C{nivel} RECEBE 0 ;"
+            yield f"{recuo}ENQUANTO (C{nivel} MENOR 2) INICIO"
+            abertos.append([f"{recuo}    C{nivel} RECEBE C{nivel} MAIS 1 ;", f"{recuo}FIM"])
+        elif sorteio < 0.30:
+            yield f"{recuo}EXIBIR(V{aleatorio.randrange(variaveis)}) ;"
+        elif sorteio < 0.36:
+            yield f"{recuo}T RECEBE \"v\" CONCATENA ({expressao(tamanho)}) ;"
+        else:
+            yield f"{recuo}V{aleatorio.randrange(variaveis)} RECEBE {expressao(tamanho)} ;"
+
+    while abertos:
+        yield from abertos.pop()
+
+    yield "FIM"
+
+
+def gerar(arquivo, comandos, profundidade=8, operandos=6, variaveis=20, semente=0):
+    with open(arquivo, "w", encoding="utf-8") as saida:
+        for linha in linhas(comandos, profundidade, operandos, variaveis, semente):
+            saida.write(linha + "\n")
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Gera um programa LumenScript válido com o tamanho e a forma pedidos")
+    argumentos.add_argument("arquivo", help="arquivo .lumen de saída")
+    argumentos.add_argument("--comandos", type=int, default=1000000, help="número aproximado de comandos (padrão: 1000000)")
+    argumentos.add_argument("--profundidade", type=int, default=8, help="aninhamento máximo de QUANDO e ENQUANTO (padrão: 8)")
+    argumentos.add_argument("--operandos", type=int, default=6, help="operandos por expressão, no máximo (padrão: 6)")
+    argumentos.add_argument("--variaveis", type=int, default=20, help="número de variáveis NUMERO (padrão: 20)")
+    argumentos.add_argument("--semente", type=int, default=0, help="semente do gerador (padrão: 0)")
+    opcoes = argumentos.parse_args()
+
+    gerar(opcoes.arquivo, opcoes.comandos, opcoes.profundidade, opcoes.operandos, opcoes.variaveis, opcoes.semente)
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser
+
+
+# Limite e fator só mudam fora dos laços, então LIMITE VEZES 2 e os prefixos são invariantes
+def limites(externo, interno):
+    return f"""
+    INICIO
+        GUARDAR LIMITE COMO NUMERO COM {interno} ;
+        GUARDAR FATOR COMO NUMERO COM 3 ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR J COMO NUMERO COM 0 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {externo})
+        INICIO
+            J RECEBE 0 ;
+            ENQUANTO (J MENOR LIMITE VEZES 2)
+            INICIO
+                SOMA RECEBE SOMA MAIS (FATOR VEZES FATOR MAIS LIMITE) MAIS J ;
+                J RECEBE J MAIS 1 ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(SOMA) ;
+    FIM
+    """
+
+
+# I VEZES LARGURA é usado a cada iteração do laço interno, mas I só muda no externo
+def matriz(linhas, colunas):
+    return f"""
+    INICIO
+        GUARDAR LARGURA COMO NUMERO COM {colunas} ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR J COMO NUMERO COM 0 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {linhas})
+        INICIO
+            J RECEBE 0 ;
+            ENQUANTO (J MENOR LARGURA)
+            INICIO
+                SOMA RECEBE SOMA MAIS I VEZES LARGURA MAIS J ;
+                QUANDO (I VEZES LARGURA MAIS J MAIOR SOMA DIVIDIDO 2)
+                INICIO
+                    SOMA RECEBE SOMA MENOS 1 ;
+                FIM
+                J RECEBE J MAIS 1 ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(SOMA) ;
+    FIM
+    """
+
+
+def prefixo(externo, interno):
+    return f"""
+    INICIO
+        GUARDAR NOME COMO TEXTO COM "linha" ;
+        GUARDAR T COMO TEXTO COM "" ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR J COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {externo})
+        INICIO
+            J RECEBE 0 ;
+            ENQUANTO (J MENOR {interno})
+            INICIO
+                T RECEBE NOME CONCATENA " " CONCATENA "nº" CONCATENA J ;
+                J RECEBE J MAIS 1 ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(T) ;
+    FIM
+    """
+
+
+def medir(codigo, bytecode, nivel, repeticoes):
+    melhor = None
+    saida = None
+
+    for _ in range(repeticoes):
+        buffer = io.StringIO()
+        inicio = time.perf_counter()
+
+        with contextlib.redirect_stdout(buffer):
+            Parser.run(codigo, bytecode=bytecode, level=nivel)
+
+        tempo = time.perf_counter() - inicio
+        melhor = tempo if melhor is None else min(melhor, tempo)
+        saida = buffer.getvalue()
+
+    return melhor, saida
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    casos = [
+        ("limite invariante, 200 x 400", limites(200, 200)),
+        ("matriz, 300 x 300", matriz(300, 300)),
+        ("prefixo de texto, 200 x 200", prefixo(200, 200)),
+    ]
+
+    print(f"{'caso':30} {'execução':>9} {'-O1':>12} {'-O2':>12} {'ganho':>8}")
+
+    for nome, codigo in casos:
+        for execucao, bytecode in (("Evaluate", False), ("bytecode", True)):
+            o1, saida_o1 = medir(codigo, bytecode, 1, repeticoes)
+            o2, saida_o2 = medir(codigo, bytecode, 2, repeticoes)
+
+            if saida_o1 != saida_o2:
+                raise AssertionError(f"Saída diferente entre -O1 e -O2 em '{nome}' ({execucao})")
+
+            print(f"{nome:30} {execucao:>9} {o1 * 1000:9.1f} ms {o2 * 1000:9.1f} ms {o1 / o2:7.2f}x")
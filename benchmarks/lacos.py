@@ -0,0 +1,102 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser
+
+
+def contagem(limite):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {limite})
+        INICIO
+            SOMA RECEBE SOMA MAIS I VEZES 2 ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(SOMA) ;
+    FIM
+    """
+
+
+def aninhado(externo, interno):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR J COMO NUMERO COM 0 ;
+        GUARDAR PARES COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {externo})
+        INICIO
+            J RECEBE 0 ;
+            ENQUANTO (J MENOR {interno})
+            INICIO
+                QUANDO ((I MAIS J) DIVIDIDO 2 VEZES 2 IGUAL I MAIS J)
+                INICIO
+                    PARES RECEBE PARES MAIS 1 ;
+                FIM
+                J RECEBE J MAIS 1 ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(PARES) ;
+    FIM
+    """
+
+
+def texto(limite):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR T COMO TEXTO COM "" ;
+        ENQUANTO (I MENOR {limite})
+        INICIO
+            T RECEBE "x" CONCATENA (I MENOR 10) ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(T) ;
+    FIM
+    """
+
+
+def medir(codigo, bytecode, repeticoes):
+    melhor = None
+    saida = None
+
+    for _ in range(repeticoes):
+        buffer = io.StringIO()
+        inicio = time.perf_counter()
+
+        with contextlib.redirect_stdout(buffer):
+            Parser.run(codigo, bytecode=bytecode)
+
+        tempo = time.perf_counter() - inicio
+        melhor = tempo if melhor is None else min(melhor, tempo)
+        saida = buffer.getvalue()
+
+    return melhor, saida
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    casos = [
+        ("contagem, 100.000 iterações", contagem(100000)),
+        ("laços aninhados, 300 x 300", aninhado(300, 300)),
+        ("CONCATENA, 50.000 iterações", texto(50000)),
+    ]
+
+    print(f"{'caso':30} {'Evaluate':>12} {'bytecode':>12} {'ganho':>8}")
+
+    for nome, codigo in casos:
+        arvore, saida_arvore = medir(codigo, False, repeticoes)
+        vm, saida_vm = medir(codigo, True, repeticoes)
+
+        if saida_arvore != saida_vm:
+            raise AssertionError(f"Saída diferente entre Evaluate e bytecode em '{nome}'")
+
+        print(f"{nome:30} {arvore * 1000:9.1f} ms {vm * 1000:9.1f} ms {arvore / vm:7.2f}x")
@@ -0,0 +1,58 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gerador import gerar
+
+
+COMPILADOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "main.py")
+
+
+def cronometrar(comandos):
+    inicio = time.perf_counter()
+
+    for comando in comandos:
+        subprocess.run([sys.executable, COMPILADOR] + comando, check=False, capture_output=True)
+
+    return time.perf_counter() - inicio
+
+
+# Compara um processo do main.py por arquivo com o main.py build serial e paralelo, e mede a
+# recompilação sem mudanças, que só confere datas ou hashes. O cache da árvore fica desligado
+# para que todas as rodadas analisem os programas do zero.
+def executar(opcoes):
+    with tempfile.TemporaryDirectory() as destino:
+        arquivos = []
+
+        for i in range(opcoes.arquivos):
+            arquivo = os.path.join(destino, f"programa_{i}.lumen")
+            gerar(arquivo, opcoes.comandos, semente=i)
+            arquivos.append(arquivo)
+
+        casos = [
+            ("um processo por arquivo", [[arquivo, "--no-cache"] for arquivo in arquivos]),
+            ("build -j 1", [["build", "-j", "1", "--forcar", "--no-cache", destino]]),
+            (f"build -j {opcoes.jobs}", [["build", "-j", str(opcoes.jobs), "--forcar", "--no-cache", destino]]),
+            ("build em dia (data)", [["build", "-j", str(opcoes.jobs), destino]]),
+            ("build em dia (hash)", [["build", "-j", str(opcoes.jobs), "--checagem", "hash", destino]]),
+        ]
+
+        # A primeira checagem por hash grava o build.json; a medida é a da segunda
+        cronometrar(casos[-1][1])
+        print(f"{opcoes.arquivos} arquivos de {opcoes.comandos} comandos")
+
+        for nome, comandos in casos:
+            print(f"{nome:26}{cronometrar(comandos):10.2f} s")
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Mede a compilação em lote do main.py build contra um processo por arquivo")
+    argumentos.add_argument("--arquivos", type=int, default=200, help="número de programas gerados (padrão: 200)")
+    argumentos.add_argument("--comandos", type=int, default=200, help="comandos por programa (padrão: 200)")
+    argumentos.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="processos do build paralelo (padrão: um por CPU)")
+    executar(argumentos.parse_args())
@@ -0,0 +1,48 @@
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import main
+from main import Parser
+
+
+# Programa com declarações, atribuições, condicionais e laços em proporções fixas
+def programa(blocos):
+    linhas = ["INICIO"]
+
+    for i in range(blocos):
+        linhas.append(f"GUARDAR V{i} COMO NUMERO COM {i} MAIS 1 ;")
+        linhas.append(f"V{i} RECEBE V{i} VEZES 2 MENOS 3 ;")
+        linhas.append(f"QUANDO (V{i} MAIOR 10) INICIO EXIBIR(\"grande\") ; FIM SENAO INICIO EXIBIR(V{i}) ; FIM")
+        linhas.append(f"ENQUANTO (V{i} MENOR 100) INICIO V{i} RECEBE V{i} MAIS 1 ; FIM")
+
+    linhas.append("FIM")
+    return "\n".join(linhas), blocos * 4
+
+
+def medir(criar):
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = criar()
+    gc.collect()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, depois - antes
+
+
+if __name__ == "__main__":
+    blocos = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    codigo, comandos = programa(blocos)
+
+    print(f"{comandos} comandos, {len(codigo)} caracteres de código")
+
+    arvore, bytes_arvore = medir(lambda: Parser.parse(codigo))
+    print(f"árvore de nós:     {bytes_arvore / comandos:10.1f} bytes/comando ({bytes_arvore / len(codigo):.2f}x o código)")
+
+    if hasattr(main, "FlatAST"):
+        plana, bytes_plana = medir(lambda: main.FlatAST(arvore))
+        print(f"codificação plana: {bytes_plana / comandos:10.1f} bytes/comando ({bytes_plana / len(codigo):.2f}x o código)")
@@ -0,0 +1,67 @@
+import contextlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import OUTPUT_POLICIES, Output, Parser
+
+
+def numeros(quantidade):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {quantidade})
+        INICIO
+            EXIBIR(I) ;
+            I RECEBE I MAIS 1 ;
+        FIM
+    FIM
+    """
+
+
+# A saída vai para /dev/null, um arquivo de verdade, para que cada escrita seja uma chamada de sistema
+def interpretar(codigo, politica):
+    Output.configure(politica)
+    inicio = time.perf_counter()
+
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        Parser.run(codigo)
+
+    tempo = time.perf_counter() - inicio
+    Output.configure()
+    return tempo
+
+
+def compilar(codigo, politica, destino):
+    arquivo = os.path.join(destino, "numeros.lumen")
+    Parser.geracodigo(codigo, arquivo, output=politica)
+
+    inicio = time.perf_counter()
+
+    with open(os.devnull, "w") as nulo:
+        subprocess.run(["lli", "-O2", os.path.join(destino, "numeros.ll")], stdout=nulo, check=True)
+
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    codigo = numeros(quantidade)
+
+    print(f"{quantidade} números")
+    print(f"{'execução':12} {'política':>9} {'tempo':>12} {'linhas/s':>12}")
+
+    for politica in OUTPUT_POLICIES:
+        tempo = interpretar(codigo, politica)
+        print(f"{'bytecode':12} {politica:>9} {tempo * 1000:9.1f} ms {quantidade / tempo:12.0f}")
+
+    if shutil.which("lli") is not None:
+        with tempfile.TemporaryDirectory() as destino:
+            for politica in OUTPUT_POLICIES:
+                tempo = compilar(codigo, politica, destino)
+                print(f"{'LLVM (lli)':12} {politica:>9} {tempo * 1000:9.1f} ms {quantidade / tempo:12.0f}")
@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from cargas import CARGAS
+from main import BytecodeCompiler, Output, Parser, PythonTranspiler, SymbolTable, Telemetry, VM
+
+
+FASES = ("lexico", "sintatico", "otimizacao", "geracao", "interpretacao")
+
+
+def bytecode(raiz):
+    vm = VM()
+    vm.run(BytecodeCompiler(vm).compile(raiz))
+
+
+BACKENDS = {
+    "bytecode": bytecode,
+    "evaluate": lambda raiz: raiz.Evaluate(SymbolTable()),
+    "python": lambda raiz: PythonTranspiler().run(raiz),
+}
+
+
+# Léxico, sintático, otimização e geração de IR saem da telemetria de uma chamada do
+# Parser.geracodigo; a geração inclui a verificação de tipos e a escrita do .ll
+def compilar(codigo, destino):
+    telemetria = Telemetry(memory=False)
+    Parser.geracodigo(codigo, os.path.join(destino, "carga.lumen"), telemetry=telemetria)
+    tempos = {nome: fase["tempo"] for nome, fase in telemetria.phases.items()}
+
+    return {
+        "lexico": tempos["lexico"],
+        "sintatico": tempos["sintatico"],
+        "otimizacao": tempos["otimizacao"],
+        "geracao": tempos["tipos"] + tempos["geracao"] + tempos["escrita"],
+    }
+
+
+# Só a execução: a árvore é analisada e otimizada antes de começar a contar
+def interpretar(codigo, backend):
+    raiz, _ = Parser.optimize(Parser.parse(codigo))
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+
+    with contextlib.redirect_stdout(saida):
+        try:
+            BACKENDS[backend](raiz)
+        finally:
+            Output.finish()
+
+    return time.perf_counter() - inicio
+
+
+def medir(codigo, backend, repeticoes, aquecimento, destino):
+    amostras = {fase: [] for fase in FASES}
+
+    for rodada in range(aquecimento + repeticoes):
+        tempos = compilar(codigo, destino)
+        tempos["interpretacao"] = interpretar(codigo, backend)
+
+        if rodada >= aquecimento:
+            for fase, tempo in tempos.items():
+                amostras[fase].append(tempo)
+
+    return {
+        fase: {
+            "mediana": statistics.median(valores),
+            "minimo": min(valores),
+            "desvio": statistics.stdev(valores) if len(valores) > 1 else 0.0,
+        }
+        for fase, valores in amostras.items()
+    }
+
+
+def executar(opcoes):
+    resultados = {}
+    falhas = {}
+    print(f"{'carga':14}" + "".join(f"{fase:>18}" for fase in FASES))
+
+    with tempfile.TemporaryDirectory() as destino:
+        for nome in opcoes.cargas:
+            gerador, tamanho = CARGAS[nome]
+            codigo = gerador(max(1, int(tamanho * opcoes.escala)))
+
+            # Uma carga que estoura (RecursionError, MemoryError...) não pode sumir do relatório
+            try:
+                resultados[nome] = medir(codigo, opcoes.backend, opcoes.repeticoes, opcoes.aquecimento, destino)
+            except Exception as erro:
+                falhas[nome] = f"{type(erro).__name__}: {erro}"
+                print(f"{nome:14}FALHOU ({falhas[nome]})")
+                continue
+
+            colunas = "".join(
+                f"{fase['mediana'] * 1000:10.2f} ±{fase['desvio'] / fase['mediana'] * 100 if fase['mediana'] else 0:4.1f}%"
+                for fase in resultados[nome].values()
+            )
+            print(f"{nome:14}{colunas}")
+
+    return {
+        "python": platform.python_version(),
+        "backend": opcoes.backend,
+        "escala": opcoes.escala,
+        "repeticoes": opcoes.repeticoes,
+        "resultados": resultados,
+        "falhas": falhas,
+    }
+
+
+# Regressão: mediana acima da base por mais que o limite relativo e que a folga absoluta, para que
+# fases de poucos microssegundos não acusem ruído
+def comparar(atual, base, limite, folga):
+    regressoes = []
+    print(f"\ncomparação com a linha de base (limite {limite * 100:.0f}%, folga {folga * 1000:.1f} ms)")
+
+    if (base["backend"], base["escala"]) != (atual["backend"], atual["escala"]):
+        print(f"aviso: a base usou backend {base['backend']} e escala {base['escala']}")
+
+    for nome, fases in atual["resultados"].items():
+        for fase, medida in fases.items():
+            anterior = base["resultados"].get(nome, {}).get(fase)
+
+            if anterior is None or not anterior["mediana"]:
+                continue
+
+            razao = medida["mediana"] / anterior["mediana"]
+            diferenca = medida["mediana"] - anterior["mediana"]
+
+            if razao > 1 + limite and diferenca > folga:
+                situacao = "REGRESSÃO"
+                regressoes.append((nome, fase))
+            elif razao < 1 - limite and -diferenca > folga:
+                situacao = "melhora"
+            else:
+                continue
+
+            print(f"{nome:14} {fase:14} {anterior['mediana'] * 1000:10.2f} ms -> {medida['mediana'] * 1000:10.2f} ms ({razao:.2f}x) {situacao}")
+
+    if not regressoes:
+        print("nenhuma regressão")
+
+    return regressoes
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Mede cada fase do compilador LumenScript em cargas geradas; sai com código 1 se alguma carga falhar")
+    argumentos.add_argument("cargas", nargs="*", help=f"cargas a medir: {', '.join(CARGAS)} (padrão: todas)")
+    argumentos.add_argument("-n", "--repeticoes", type=int, default=5, help="rodadas medidas por carga (padrão: 5)")
+    argumentos.add_argument("--aquecimento", type=int, default=1, help="rodadas descartadas antes das medidas (padrão: 1)")
+    argumentos.add_argument("--escala", type=float, default=1.0, help="multiplica o tamanho de todas as cargas")
+    argumentos.add_argument("--backend", choices=tuple(BACKENDS), default="bytecode", help="como a interpretação executa o programa (padrão: bytecode)")
+    argumentos.add_argument("--salvar", metavar="ARQUIVO", help="grava os resultados como linha de base em JSON")
+    argumentos.add_argument("--base", metavar="ARQUIVO", help="compara com uma linha de base gravada por --salvar; sai com código 1 se houver regressão")
+    argumentos.add_argument("--limite", type=float, default=0.10, help="aumento relativo da mediana que conta como regressão (padrão: 0.10)")
+    argumentos.add_argument("--folga", type=float, default=0.5, help="aumento mínimo em ms para contar como regressão (padrão: 0.5)")
+    opcoes = argumentos.parse_args()
+    opcoes.cargas = opcoes.cargas or list(CARGAS)
+    desconhecidas = [nome for nome in opcoes.cargas if nome not in CARGAS]
+
+    if desconhecidas:
+        argumentos.error(f"cargas desconhecidas: {', '.join(desconhecidas)}")
+
+    atual = executar(opcoes)
+
+    if opcoes.salvar:
+        with open(opcoes.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+
+    regressoes = []
+
+    if opcoes.base:
+        with open(opcoes.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+
+        regressoes = comparar(atual, base, opcoes.limite, opcoes.folga / 1000)
+
+    if atual["falhas"]:
+        print(f"\n{len(atual['falhas'])} carga(s) falharam: {', '.join(atual['falhas'])}", file=sys.stderr)
+
+    if regressoes or atual["falhas"]:
+        sys.exit(1)
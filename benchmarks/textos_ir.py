@@ -0,0 +1,76 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser
+
+
+# Cada iteração monta textos intermediários e guarda o resultado, então a memória do programa
+# compilado deve ficar constante com o número de iterações
+def rotulos(iteracoes):
+    return f"""
+    INICIO
+        GUARDAR ROTULO COMO TEXTO COM "" ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {iteracoes})
+        INICIO
+            ROTULO RECEBE "item " CONCATENA I CONCATENA " de " CONCATENA {iteracoes} CONCATENA " (" CONCATENA (I MAIOR 10) CONCATENA ")" ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(ROTULO) ;
+    FIM
+    """
+
+
+# O texto cresce a cada iteração: o custo de cada CONCATENA deve ser linear no tamanho do resultado
+def acumulado(iteracoes):
+    return f"""
+    INICIO
+        GUARDAR T COMO TEXTO COM "" ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {iteracoes})
+        INICIO
+            T RECEBE T CONCATENA "ab" ;
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(T IGUAL T) ;
+    FIM
+    """
+
+
+def executar(codigo, destino):
+    arquivo = os.path.join(destino, "programa.lumen")
+    Parser.geracodigo(codigo, arquivo)
+
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(["lli", "-O2", os.path.join(destino, "programa.ll")], stdout=subprocess.DEVNULL)
+    _, status, uso = os.wait4(processo.pid, 0)
+    tempo = time.perf_counter() - inicio
+
+    if status != 0:
+        raise RuntimeError(f"lli terminou com status {status}")
+
+    return tempo, uso.ru_maxrss
+
+
+if __name__ == "__main__":
+    if shutil.which("lli") is None:
+        sys.exit("lli não encontrado")
+
+    casos = [
+        ("rótulos", rotulos, (100000, 1000000, 4000000)),
+        ("texto acumulado", acumulado, (10000, 20000, 40000)),
+    ]
+
+    print(f"{'caso':18} {'iterações':>10} {'tempo':>12} {'memória máxima':>16}")
+
+    with tempfile.TemporaryDirectory() as destino:
+        for nome, programa, tamanhos in casos:
+            for iteracoes in tamanhos:
+                tempo, memoria = executar(programa(iteracoes), destino)
+                print(f"{nome:18} {iteracoes:10} {tempo * 1000:9.1f} ms {memoria / 1024:13.1f} MB")
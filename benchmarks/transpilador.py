@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lacos import aninhado, contagem, texto
+from main import Parser
+
+
+def condicoes(limite):
+    return f"""
+    INICIO
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR A COMO NUMERO COM 0 ;
+        GUARDAR B COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR {limite})
+        INICIO
+            QUANDO ((I DIVIDIDO 3 VEZES 3 IGUAL I) OU (I MAIOR {limite} DIVIDIDO 2))
+            INICIO
+                A RECEBE A MAIS I ;
+            FIM
+            SENAO
+            INICIO
+                B RECEBE B MENOS 1 ;
+            FIM
+            I RECEBE I MAIS 1 ;
+        FIM
+        EXIBIR(A CONCATENA " " CONCATENA B) ;
+    FIM
+    """
+
+
+BACKENDS = {
+    "Evaluate": {"bytecode": False},
+    "bytecode": {"bytecode": True},
+    "Python": {"python": True},
+}
+
+
+def medir(codigo, opcoes, repeticoes):
+    melhor = None
+    saida = None
+
+    for _ in range(repeticoes):
+        buffer = io.StringIO()
+        inicio = time.perf_counter()
+
+        with contextlib.redirect_stdout(buffer):
+            Parser.run(codigo, **opcoes)
+
+        tempo = time.perf_counter() - inicio
+        melhor = tempo if melhor is None else min(melhor, tempo)
+        saida = buffer.getvalue()
+
+    return melhor, saida
+
+
+if __name__ == "__main__":
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    casos = [
+        ("contagem, 100.000 iterações", contagem(100000)),
+        ("laços aninhados, 300 x 300", aninhado(300, 300)),
+        ("CONCATENA, 50.000 iterações", texto(50000)),
+        ("QUANDO/SENAO, 100.000 iterações", condicoes(100000)),
+    ]
+
+    print(f"{'caso':34}" + "".join(f"{nome:>12}" for nome in BACKENDS) + f"{'ganho':>9}")
+
+    for nome, codigo in casos:
+        tempos = {}
+        saidas = {}
+
+        for backend, opcoes in BACKENDS.items():
+            tempos[backend], saidas[backend] = medir(codigo, opcoes, repeticoes)
+
+        if len(set(saidas.values())) != 1:
+            raise AssertionError(f"Saída diferente entre os backends em '{nome}'")
+
+        colunas = "".join(f"{tempo * 1000:9.1f} ms" for tempo in tempos.values())
+        print(f"{nome:34}{colunas}{tempos['Evaluate'] / tempos['Python']:8.2f}x")
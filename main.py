@@ -1,54 +1,746 @@
 import sys
 import re
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from functools import partial
+import argparse
+import atexit
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import json
+import operator
 import os
-import pyttsx3
+import pickle
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
 
 
+COMPILER_VERSION = "1.0"
+
+
+# Construtor do módulo LLVM, passado por todos os Generate. O corpo do main é escrito à medida que
+# é gerado, em um arquivo temporário com buffer (ou em memória, sem stream), então o programa nunca
+# existe inteiro como lista de strings. Globais e allocas vão para seções próprias, escritas antes
+# do corpo pelo dump. Cada texto constante é definido uma única vez no módulo, e só as constantes
+# e funções de runtime realmente usadas entram no cabeçalho.
 class Code:
-    def __init__(self):
-        self.instructions = []
+    def __init__(self, stream=None, output_policy=None, output_size=1 << 16):
+        self.globals = []
+        self.allocas = []
+        self.strings = {}
+        self.functions = set()
+        self.instructions = [] if stream is None else None
+        self.stream = stream
+        self.temporaries = False
+        self.parameters = {"output_size": output_size, "output_policy": OUTPUT_POLICIES.get(output_policy, -1)}
+
+    def string(self, text, name=None):
+        # Ponteiro i8* para o texto no pool de constantes; textos iguais compartilham a definição
+        constant = self.strings.get(text)
+
+        if constant is None:
+            name = name or f".str.{len(self.strings)}"
+            constant = self.strings[text] = (name, constantPointer(name, text))
+
+        return constant[1]
+
+    def runtime(self, name):
+        return self.string(RUNTIME_STRINGS[name], name)
+
+    def function(self, name):
+        self.functions.add(name)
+        return f"@{name}"
+
+    def allocate(self, name):
+        # Função do runtime que devolve um texto temporário na arena
+        self.temporaries = True
+        return self.function(name)
+
+    def release(self):
+        # Fim de um comando: os textos temporários dele já foram copiados ou consumidos
+        if self.temporaries:
+            self.append(f"call void {self.function('lumen_reset')}()")
+            self.temporaries = False
+
+    def resolve(self):
+        # Marca como usadas as funções de que as funções do runtime usadas dependem
+        pending = [name for name in RUNTIME_LIBRARY if name in self.functions]
+
+        while pending:
+            for dependency in RUNTIME_LIBRARY[pending.pop()][1]:
+                if dependency not in self.functions:
+                    self.functions.add(dependency)
+
+                    if dependency in RUNTIME_LIBRARY:
+                        pending.append(dependency)
+
+    def library(self):
+        # Definições das funções do runtime usadas, junto com tudo de que elas dependem
+        self.resolve()
+
+        return [
+            RUNTIME_PLACEHOLDER.sub(self.placeholder, template)
+            for name, (template, _) in RUNTIME_LIBRARY.items() if name in self.functions
+        ]
+
+    def placeholder(self, match):
+        name = match.group(1)
+        return self.runtime(name) if name.startswith(".") else str(self.parameters[name])
+
+    @staticmethod
+    def temporary():
+        return tempfile.TemporaryFile("w+", encoding="utf-8")
 
     def append(self, instruction):
         if isinstance(instruction, list):
-            self.instructions.extend(instruction)
-        else:
+            for item in instruction:
+                self.append(item)
+        elif self.stream is None:
             self.instructions.append(instruction)
+        else:
+            self.stream.write("  " + instruction + "\n")
+
+    def body(self, f):
+        if self.stream is None:
+            for instr in self.instructions:
+                f.write("  " + instr + "\n")
+        else:
+            self.stream.seek(0)
+            shutil.copyfileobj(self.stream, f)
 
     def dump(self, input_filename="output.zig"):
         output_name = os.path.splitext(input_filename)[0] + ".ll"
 
-        with open(output_name, "w") as f:
-            f.write("; === LLVM IR Module ===\n")
-
-            # === Global Constants ===
-            f.write('@.int_print_fmt = private unnamed_addr constant [4 x i8] c"%d\\0A\\00"\n')
-            f.write('@.int_read_fmt = private unnamed_addr constant [3 x i8] c"%d\\00"\n')
-            f.write('@.str_read_fmt = private unnamed_addr constant [3 x i8] c"%s\\00"\n')
-            f.write('@.newline = private unnamed_addr constant [2 x i8] c"\\0A\\00"\n')
-            f.write('@.true_str = private constant [5 x i8] c"true\\00"\n')
-            f.write('@.false_str = private constant [6 x i8] c"false\\00"\n')
-            f.write('@.espeak_prefix = private unnamed_addr constant [9 x i8] c"espeak \\22\\00"\n')
-            f.write('@.espeak_suffix = private unnamed_addr constant [2 x i8] c"\\22\\00"\n')
-            f.write('\n')
-
-            # === External Function Declarations ===
-            f.write('declare i32 @printf(i8*, ...)\n')
-            f.write('declare i32 @scanf(i8*, ...)\n')
-            f.write('declare i8* @malloc(i64)\n')
-            f.write('declare i8* @strcpy(i8*, i8*)\n')
-            f.write('declare i8* @strcat(i8*, i8*)\n')
-            f.write('declare i32 @system(i8*)\n')
-            f.write('\n')
-
-            # === Main Function ===
-            f.write('define i32 @main() {\n')
+        with open(output_name, "w", encoding="utf-8") as f:
+            self.write(f)
+
+    def write(self, f):
+        # Partes do runtime com trabalho pendente são finalizadas antes do retorno do main
+        self.resolve()
+        finalizers = [self.function(finalizer) for name, finalizer in RUNTIME_FINALIZERS.items() if name in self.functions]
+        library = self.library()
+
+        f.write("; === LLVM IR Module ===\n")
+
+        # === Global Constants ===
+        # Cada texto leva o tamanho em um i64 logo antes do primeiro caractere
+        for text, (name, _) in self.strings.items():
+            string_type, initializer = llvmString(text)
+            f.write(f"@{name} = private unnamed_addr constant {string_type} {initializer}\n")
+
+        for definition in self.globals:
+            f.write(definition + "\n")
+
+        f.write('\n')
+
+        # === External Function Declarations ===
+        for name, declaration in RUNTIME_FUNCTIONS.items():
+            if name in self.functions:
+                f.write(declaration + "\n")
+
+        f.write('\n')
+
+        # === Main Function ===
+        # Variáveis são allocas no bloco de entrada, que o mem2reg promove a registradores
+        f.write('define i32 @main() {\n')
+        f.write('entry:\n')
+
+        for instr in self.allocas:
+            f.write("  " + instr + "\n")
+
+        self.body(f)
+
+        for finalizer in finalizers:
+            f.write(f"  call void {finalizer}()\n")
+
+        f.write("  ret i32 0\n")
+        f.write("}\n")
+
+        # === Runtime ===
+        for definition in library:
+            f.write("\n" + definition)
+
+
+# Textos usados pelo código gerado, definidos no cabeçalho do módulo quando usados
+RUNTIME_STRINGS = {
+    ".int_read_fmt": "%d",
+    ".true_str": "true",
+    ".false_str": "false",
+    ".speech_command": "espeak --stdin",
+    ".speech_command_env": "LUMEN_FALA_COMANDO",
+    ".speech_file_env": "LUMEN_FALA_ARQUIVO",
+    ".write_mode": "w",
+    ".append_mode": "a",
+    ".newline": "\n",
+}
+
+RUNTIME_FUNCTIONS = {
+    "sprintf": "declare i32 @sprintf(i8*, i8*, ...)",
+    "malloc": "declare i8* @malloc(i64)",
+    "free": "declare void @free(i8*)",
+    "memchr": "declare i8* @memchr(i8*, i32, i64)",
+    "realloc": "declare i8* @realloc(i8*, i64)",
+    "strtol": "declare i64 @strtol(i8*, i8**, i32)",
+    "strcmp": "declare i32 @strcmp(i8*, i8*)",
+    "getenv": "declare i8* @getenv(i8*)",
+    "signal": "declare i8* @signal(i32, i8*)",
+    "popen": "declare i8* @popen(i8*, i8*)",
+    "pclose": "declare i32 @pclose(i8*)",
+    "fopen": "declare i8* @fopen(i8*, i8*)",
+    "fclose": "declare i32 @fclose(i8*)",
+    "fwrite": "declare i64 @fwrite(i8*, i64, i64, i8*)",
+    "fputc": "declare i32 @fputc(i32, i8*)",
+    "fflush": "declare i32 @fflush(i8*)",
+    "read": "declare i64 @read(i32, i8*, i64)",
+    "write": "declare i64 @write(i32, i8*, i64)",
+    "isatty": "declare i32 @isatty(i32)",
+    "llvm.memcpy.p0i8.p0i8.i64": "declare void @llvm.memcpy.p0i8.p0i8.i64(i8*, i8*, i64, i1)",
+    "llvm.memmove.p0i8.p0i8.i64": "declare void @llvm.memmove.p0i8.p0i8.i64(i8*, i8*, i64, i1)",
+}
+
+# Runtime de textos do código gerado. Todo texto é um ponteiro para os caracteres, terminados em
+# zero para a libc (strcmp, strtol), com o tamanho em um i64 logo antes, então concatenar é só somar
+# tamanhos e copiar com memcpy, sem percorrer os operandos. Os textos intermediários (concatenações,
+# números convertidos, leituras) vêm de uma arena liberada no fim de cada comando; uma variável
+# guarda uma cópia em um buffer próprio ([capacidade][tamanho][caracteres]), reaproveitado enquanto
+# o novo valor couber. A memória de um laço fica limitada ao maior texto vivo. <.nome> é trocado
+# pelo ponteiro do texto de runtime correspondente e <nome> pelo parâmetro do Code.
+RUNTIME_LIBRARY = {
+    "lumen_alloc": ("""@lumen.arena = internal global i8* null
+@lumen.arena.used = internal global i64 0
+@lumen.arena.size = internal global i64 0
+
+; Reserva n bytes alinhados na arena. Quando o bloco atual enche, um maior é alocado e o
+; anterior fica encadeado no início dele até o próximo reset, já que ainda pode estar em uso
+define internal i8* @lumen_alloc(i64 %n) {
+entry:
+  %block = load i8*, i8** @lumen.arena
+  %used = load i64, i64* @lumen.arena.used
+  %size = load i64, i64* @lumen.arena.size
+  %padded = add i64 %n, 7
+  %aligned = and i64 %padded, -8
+  %end = add i64 %used, %aligned
+  %fits = icmp ule i64 %end, %size
+  br i1 %fits, label %take, label %grow
+grow:
+  %double = shl i64 %size, 1
+  %need = add i64 %aligned, 8
+  %larger = icmp ugt i64 %need, %double
+  %wanted = select i1 %larger, i64 %need, i64 %double
+  %small = icmp ult i64 %wanted, 4096
+  %new_size = select i1 %small, i64 4096, i64 %wanted
+  %new = call i8* @malloc(i64 %new_size)
+  %link = bitcast i8* %new to i8**
+  store i8* %block, i8** %link
+  store i8* %new, i8** @lumen.arena
+  store i64 %new_size, i64* @lumen.arena.size
+  br label %take
+take:
+  %base = phi i8* [ %block, %entry ], [ %new, %grow ]
+  %start = phi i64 [ %used, %entry ], [ 8, %grow ]
+  %next = add i64 %start, %aligned
+  store i64 %next, i64* @lumen.arena.used
+  %pointer = getelementptr inbounds i8, i8* %base, i64 %start
+  ret i8* %pointer
+}
+""", ("malloc",)),
+    "lumen_reset": ("""; Libera os blocos anteriores da arena e volta o atual para o início
+define internal void @lumen_reset() {
+entry:
+  %block = load i8*, i8** @lumen.arena
+  %empty = icmp eq i8* %block, null
+  br i1 %empty, label %done, label %unlink
+unlink:
+  %link = bitcast i8* %block to i8**
+  %previous = load i8*, i8** %link
+  store i8* null, i8** %link
+  br label %loop
+loop:
+  %current = phi i8* [ %previous, %unlink ], [ %next, %free ]
+  %last = icmp eq i8* %current, null
+  br i1 %last, label %rewind, label %free
+free:
+  %current_link = bitcast i8* %current to i8**
+  %next = load i8*, i8** %current_link
+  call void @free(i8* %current)
+  br label %loop
+rewind:
+  store i64 8, i64* @lumen.arena.used
+  br label %done
+done:
+  ret void
+}
+""", ("lumen_alloc", "free")),
+    "lumen_length": ("""define internal i64 @lumen_length(i8* %text) {
+entry:
+  %header = getelementptr inbounds i8, i8* %text, i64 -8
+  %length = bitcast i8* %header to i64*
+  %value = load i64, i64* %length
+  ret i64 %value
+}
+""", ()),
+    "lumen_new": ("""; Texto de n caracteres na arena, com tamanho e terminador já escritos
+define internal i8* @lumen_new(i64 %n) {
+entry:
+  %size = add i64 %n, 9
+  %block = call i8* @lumen_alloc(i64 %size)
+  %length = bitcast i8* %block to i64*
+  store i64 %n, i64* %length
+  %text = getelementptr inbounds i8, i8* %block, i64 8
+  %end = getelementptr inbounds i8, i8* %text, i64 %n
+  store i8 0, i8* %end
+  ret i8* %text
+}
+""", ("lumen_alloc",)),
+    "lumen_concat": ("""define internal i8* @lumen_concat(i8* %left, i8* %right) {
+entry:
+  %left_length = call i64 @lumen_length(i8* %left)
+  %right_length = call i64 @lumen_length(i8* %right)
+  %length = add i64 %left_length, %right_length
+  %text = call i8* @lumen_new(i64 %length)
+  call void @llvm.memcpy.p0i8.p0i8.i64(i8* %text, i8* %left, i64 %left_length, i1 false)
+  %tail = getelementptr inbounds i8, i8* %text, i64 %left_length
+  call void @llvm.memcpy.p0i8.p0i8.i64(i8* %tail, i8* %right, i64 %right_length, i1 false)
+  ret i8* %text
+}
+""", ("lumen_length", "lumen_new", "llvm.memcpy.p0i8.p0i8.i64")),
+    "lumen_from_int": ("""; Espaço para "-2147483648" e o terminador; o tamanho é o retorno do sprintf
+define internal i8* @lumen_from_int(i32 %value) {
+entry:
+  %block = call i8* @lumen_alloc(i64 20)
+  %text = getelementptr inbounds i8, i8* %block, i64 8
+  %written = call i32 (i8*, i8*, ...) @sprintf(i8* %text, i8* <.int_read_fmt>, i32 %value)
+  %length = sext i32 %written to i64
+  %header = bitcast i8* %block to i64*
+  store i64 %length, i64* %header
+  ret i8* %text
+}
+""", ("lumen_alloc", "sprintf")),
+    "lumen_input_fill": ("""; Entrada do PERGUNTAR: a entrada padrão é lida em blocos para um buffer que cresce quando a
+; linha atual não cabe, e cada PERGUNTAR lê uma linha inteira, como o input() do interpretador.
+@lumen.input = internal global i8* null
+@lumen.input.capacity = internal global i64 0
+@lumen.input.start = internal global i64 0
+@lumen.input.end = internal global i64 0
+@lumen.input.eof = internal global i1 false
+
+; Leva os bytes ainda não lidos para o início do buffer e lê mais um bloco depois deles
+define internal void @lumen_input_fill() {
+entry:
+  %buffer = load i8*, i8** @lumen.input
+  %capacity = load i64, i64* @lumen.input.capacity
+  %start = load i64, i64* @lumen.input.start
+  %end = load i64, i64* @lumen.input.end
+  %pending = sub i64 %end, %start
+  %allocated = icmp ne i8* %buffer, null
+  br i1 %allocated, label %compact, label %check
+compact:
+  %unread = getelementptr inbounds i8, i8* %buffer, i64 %start
+  call void @llvm.memmove.p0i8.p0i8.i64(i8* %buffer, i8* %unread, i64 %pending, i1 false)
+  br label %check
+check:
+  store i64 0, i64* @lumen.input.start
+  store i64 %pending, i64* @lumen.input.end
+  %room = sub i64 %capacity, %pending
+  %full = icmp ult i64 %room, 65536
+  br i1 %full, label %grow, label %read
+grow:
+  %double = shl i64 %capacity, 1
+  %need = add i64 %pending, 65536
+  %larger = icmp ugt i64 %need, %double
+  %new_capacity = select i1 %larger, i64 %need, i64 %double
+  %new_buffer = call i8* @realloc(i8* %buffer, i64 %new_capacity)
+  store i8* %new_buffer, i8** @lumen.input
+  store i64 %new_capacity, i64* @lumen.input.capacity
+  br label %read
+read:
+  %current = phi i8* [ %buffer, %check ], [ %new_buffer, %grow ]
+  %current_capacity = phi i64 [ %capacity, %check ], [ %new_capacity, %grow ]
+  %target = getelementptr inbounds i8, i8* %current, i64 %pending
+  %free = sub i64 %current_capacity, %pending
+  %count = call i64 @read(i32 0, i8* %target, i64 %free)
+  %received = icmp sgt i64 %count, 0
+  br i1 %received, label %advance, label %finished
+advance:
+  %new_end = add i64 %pending, %count
+  store i64 %new_end, i64* @lumen.input.end
+  ret void
+finished:
+  store i1 true, i1* @lumen.input.eof
+  ret void
+}
+""", ("realloc", "read", "llvm.memmove.p0i8.p0i8.i64")),
+    "lumen_read_line": ("""; Próxima linha da entrada, sem o \\n, como texto na arena; no fim da entrada, o que restou
+define internal i8* @lumen_read_line() {
+entry:
+  br label %scan
+scan:
+  %buffer = load i8*, i8** @lumen.input
+  %start = load i64, i64* @lumen.input.start
+  %end = load i64, i64* @lumen.input.end
+  %available = sub i64 %end, %start
+  %from = getelementptr inbounds i8, i8* %buffer, i64 %start
+  %empty = icmp eq i64 %available, 0
+  br i1 %empty, label %more, label %search
+search:
+  %newline = call i8* @memchr(i8* %from, i32 10, i64 %available)
+  %found = icmp ne i8* %newline, null
+  br i1 %found, label %line, label %more
+more:
+  %eof = load i1, i1* @lumen.input.eof
+  br i1 %eof, label %last, label %fill
+fill:
+  call void @lumen_input_fill()
+  br label %scan
+line:
+  %newline_address = ptrtoint i8* %newline to i64
+  %from_address = ptrtoint i8* %from to i64
+  %length = sub i64 %newline_address, %from_address
+  %text = call i8* @lumen_new(i64 %length)
+  call void @llvm.memcpy.p0i8.p0i8.i64(i8* %text, i8* %from, i64 %length, i1 false)
+  %consumed = add i64 %length, 1
+  %next = add i64 %start, %consumed
+  store i64 %next, i64* @lumen.input.start
+  ret i8* %text
+last:
+  %rest = call i8* @lumen_new(i64 %available)
+  call void @llvm.memcpy.p0i8.p0i8.i64(i8* %rest, i8* %from, i64 %available, i1 false)
+  store i64 %end, i64* @lumen.input.start
+  ret i8* %rest
+}
+""", ("lumen_input_fill", "lumen_new", "memchr", "llvm.memcpy.p0i8.p0i8.i64")),
+    "lumen_read_int": ("""; Linha lida como número pelo strtol; uma linha que não começa com um número vale 0
+define internal i32 @lumen_read_int() {
+entry:
+  %line = call i8* @lumen_read_line()
+  %value = call i64 @strtol(i8* %line, i8** null, i32 10)
+  %number = trunc i64 %value to i32
+  ret i32 %number
+}
+""", ("lumen_read_line", "strtol")),
+    "lumen_assign": ("""; Copia o texto para o buffer da variável e devolve o buffer, que só é trocado (com folga
+; para os próximos valores) quando o texto não cabe. O texto pode ser o próprio buffer.
+define internal i8* @lumen_assign(i8* %buffer, i8* %text) {
+entry:
+  %length = call i64 @lumen_length(i8* %text)
+  %empty = icmp eq i8* %buffer, null
+  br i1 %empty, label %grow, label %check
+check:
+  %header = getelementptr inbounds i8, i8* %buffer, i64 -16
+  %capacity_pointer = bitcast i8* %header to i64*
+  %capacity = load i64, i64* %capacity_pointer
+  %fits = icmp ule i64 %length, %capacity
+  br i1 %fits, label %copy, label %release
+release:
+  call void @free(i8* %header)
+  br label %grow
+grow:
+  %double = shl i64 %length, 1
+  %new_capacity = add i64 %double, 16
+  %size = add i64 %new_capacity, 17
+  %block = call i8* @malloc(i64 %size)
+  %new_capacity_pointer = bitcast i8* %block to i64*
+  store i64 %new_capacity, i64* %new_capacity_pointer
+  %new_buffer = getelementptr inbounds i8, i8* %block, i64 16
+  br label %copy
+copy:
+  %target = phi i8* [ %buffer, %check ], [ %new_buffer, %grow ]
+  %length_header = getelementptr inbounds i8, i8* %target, i64 -8
+  %length_pointer = bitcast i8* %length_header to i64*
+  store i64 %length, i64* %length_pointer
+  %bytes = add i64 %length, 1
+  call void @llvm.memmove.p0i8.p0i8.i64(i8* %target, i8* %text, i64 %bytes, i1 false)
+  ret i8* %target
+}
+""", ("lumen_length", "malloc", "free", "llvm.memmove.p0i8.p0i8.i64")),
+    "lumen_speech_open": ("""@lumen.speech = internal global i8* null
+@lumen.speech.pipe = internal global i1 false
+
+; Abre a saída de fala no primeiro FALAR: um arquivo (LUMEN_FALA_ARQUIVO), outro comando
+; (LUMEN_FALA_COMANDO) ou o espeak, que fica lendo uma fala por linha até o fim do programa.
+; Um processo que terminou antes não derruba o programa com SIGPIPE.
+define internal i8* @lumen_speech_open() {
+entry:
+  %file_name = call i8* @getenv(i8* <.speech_file_env>)
+  %to_file = icmp ne i8* %file_name, null
+  br i1 %to_file, label %file, label %pipe
+file:
+  %file_stream = call i8* @fopen(i8* %file_name, i8* <.append_mode>)
+  br label %done
+pipe:
+  %previous = call i8* @signal(i32 13, i8* inttoptr (i64 1 to i8*))
+  %custom = call i8* @getenv(i8* <.speech_command_env>)
+  %has_custom = icmp ne i8* %custom, null
+  %command = select i1 %has_custom, i8* %custom, i8* <.speech_command>
+  %pipe_stream = call i8* @popen(i8* %command, i8* <.write_mode>)
+  store i1 true, i1* @lumen.speech.pipe
+  br label %done
+done:
+  %stream = phi i8* [ %file_stream, %file ], [ %pipe_stream, %pipe ]
+  store i8* %stream, i8** @lumen.speech
+  ret i8* %stream
+}
+""", ("getenv", "fopen", "signal", "popen")),
+    "lumen_speech_close": ("""; Chamada no fim do main: fecha a saída de fala, esperando o processo terminar as falas na fila
+define internal void @lumen_speech_close() {
+entry:
+  %stream = load i8*, i8** @lumen.speech
+  %closed = icmp eq i8* %stream, null
+  br i1 %closed, label %done, label %close
+close:
+  store i8* null, i8** @lumen.speech
+  %pipe = load i1, i1* @lumen.speech.pipe
+  br i1 %pipe, label %wait, label %file
+wait:
+  %status = call i32 @pclose(i8* %stream)
+  br label %done
+file:
+  %result = call i32 @fclose(i8* %stream)
+  br label %done
+done:
+  ret void
+}
+""", ("lumen_speech_open", "pclose", "fclose")),
+    "lumen_speak": ("""; Envia a fala como uma linha para a saída aberta, sem esperar que ela seja reproduzida
+define internal void @lumen_speak(i8* %text) {
+entry:
+  %current = load i8*, i8** @lumen.speech
+  %unopened = icmp eq i8* %current, null
+  br i1 %unopened, label %open, label %write
+open:
+  %opened = call i8* @lumen_speech_open()
+  br label %write
+write:
+  %stream = phi i8* [ %current, %entry ], [ %opened, %open ]
+  %missing = icmp eq i8* %stream, null
+  br i1 %missing, label %done, label %send
+send:
+  %length = call i64 @lumen_length(i8* %text)
+  %written = call i64 @fwrite(i8* %text, i64 1, i64 %length, i8* %stream)
+  %newline = call i32 @fputc(i32 10, i8* %stream)
+  %flushed = call i32 @fflush(i8* %stream)
+  br label %done
+done:
+  ret void
+}
+""", ("lumen_speech_open", "lumen_length", "fwrite", "fputc", "fflush")),
+    "lumen_write_all": ("""; write(2) até o fim, já que ele pode escrever só parte dos bytes
+define internal void @lumen_write_all(i8* %data, i64 %length) {
+entry:
+  br label %loop
+loop:
+  %written = phi i64 [ 0, %entry ], [ %next, %advance ]
+  %remaining = sub i64 %length, %written
+  %finished = icmp sle i64 %remaining, 0
+  br i1 %finished, label %done, label %write
+write:
+  %start = getelementptr inbounds i8, i8* %data, i64 %written
+  %result = call i64 @write(i32 1, i8* %start, i64 %remaining)
+  %failed = icmp sle i64 %result, 0
+  br i1 %failed, label %done, label %advance
+advance:
+  %next = add i64 %written, %result
+  br label %loop
+done:
+  ret void
+}
+""", ("write",)),
+    "lumen_output": ("""; Buffer da saída do EXIBIR. A política vem do compilador (0 = linha, 1 = bloco, 2 = fim) ou, com
+; -1, é decidida na primeira linha: por linha no terminal e por bloco quando redirecionada. Com
+; o buffer de tamanho fixo, a política fim também escreve quando ele enche.
+@lumen.output = internal global [<output_size> x i8] zeroinitializer
+@lumen.output.used = internal global i64 0
+@lumen.output.policy = internal global i32 <output_policy>
+
+define internal void @lumen_output(i8* %text, i64 %length) {
+entry:
+  %used = load i64, i64* @lumen.output.used
+  %end = add i64 %used, %length
+  %fits = icmp ule i64 %end, <output_size>
+  br i1 %fits, label %copy, label %flush
+flush:
+  call void @lumen_flush()
+  %small = icmp ule i64 %length, <output_size>
+  br i1 %small, label %copy, label %direct
+direct:
+  call void @lumen_write_all(i8* %text, i64 %length)
+  ret void
+copy:
+  %offset = phi i64 [ %used, %entry ], [ 0, %flush ]
+  %target = getelementptr inbounds [<output_size> x i8], [<output_size> x i8]* @lumen.output, i64 0, i64 %offset
+  call void @llvm.memcpy.p0i8.p0i8.i64(i8* %target, i8* %text, i64 %length, i1 false)
+  %new_used = add i64 %offset, %length
+  store i64 %new_used, i64* @lumen.output.used
+  ret void
+}
+""", ("lumen_flush", "lumen_write_all", "llvm.memcpy.p0i8.p0i8.i64")),
+    "lumen_flush": ("""; Escreve o buffer da saída; chamada antes de PERGUNTAR e FALAR e no fim do main
+define internal void @lumen_flush() {
+entry:
+  %used = load i64, i64* @lumen.output.used
+  %empty = icmp eq i64 %used, 0
+  br i1 %empty, label %done, label %write
+write:
+  %start = getelementptr inbounds [<output_size> x i8], [<output_size> x i8]* @lumen.output, i64 0, i64 0
+  call void @lumen_write_all(i8* %start, i64 %used)
+  store i64 0, i64* @lumen.output.used
+  br label %done
+done:
+  ret void
+}
+""", ("lumen_output", "lumen_write_all")),
+    "lumen_line": ("""; Fim de uma linha do EXIBIR: na política por linha, o buffer é escrito a cada linha
+define internal void @lumen_line() {
+entry:
+  call void @lumen_output(i8* <.newline>, i64 1)
+  %policy = load i32, i32* @lumen.output.policy
+  %unknown = icmp slt i32 %policy, 0
+  br i1 %unknown, label %detect, label %check
+detect:
+  %terminal = call i32 @isatty(i32 1)
+  %interactive = icmp ne i32 %terminal, 0
+  %detected = select i1 %interactive, i32 0, i32 1
+  store i32 %detected, i32* @lumen.output.policy
+  br label %check
+check:
+  %current = phi i32 [ %policy, %entry ], [ %detected, %detect ]
+  %by_line = icmp eq i32 %current, 0
+  br i1 %by_line, label %flush, label %done
+flush:
+  call void @lumen_flush()
+  br label %done
+done:
+  ret void
+}
+""", ("lumen_output", "lumen_flush", "isatty")),
+    "lumen_print": ("""define internal void @lumen_print(i8* %text) {
+entry:
+  %length = call i64 @lumen_length(i8* %text)
+  call void @lumen_output(i8* %text, i64 %length)
+  call void @lumen_line()
+  ret void
+}
+""", ("lumen_length", "lumen_output", "lumen_line")),
+    "lumen_print_int": ("""; Escreve os dígitos de trás para frente em um buffer local, sem passar pelo printf
+define internal void @lumen_print_int(i32 %value) {
+entry:
+  %digits = alloca [11 x i8]
+  %negative = icmp slt i32 %value, 0
+  %wide = sext i32 %value to i64
+  %opposite = sub i64 0, %wide
+  %magnitude = select i1 %negative, i64 %opposite, i64 %wide
+  br label %loop
+loop:
+  %rest = phi i64 [ %magnitude, %entry ], [ %quotient, %loop ]
+  %position = phi i64 [ 11, %entry ], [ %index, %loop ]
+  %index = sub i64 %position, 1
+  %quotient = udiv i64 %rest, 10
+  %digit = urem i64 %rest, 10
+  %code = add i64 %digit, 48
+  %character = trunc i64 %code to i8
+  %slot = getelementptr inbounds [11 x i8], [11 x i8]* %digits, i64 0, i64 %index
+  store i8 %character, i8* %slot
+  %more = icmp ne i64 %quotient, 0
+  br i1 %more, label %loop, label %sign
+sign:
+  br i1 %negative, label %minus, label %emit
+minus:
+  %minus_index = sub i64 %index, 1
+  %minus_slot = getelementptr inbounds [11 x i8], [11 x i8]* %digits, i64 0, i64 %minus_index
+  store i8 45, i8* %minus_slot
+  br label %emit
+emit:
+  %start = phi i64 [ %index, %sign ], [ %minus_index, %minus ]
+  %first = getelementptr inbounds [11 x i8], [11 x i8]* %digits, i64 0, i64 %start
+  %length = sub i64 11, %start
+  call void @lumen_output(i8* %first, i64 %length)
+  call void @lumen_line()
+  ret void
+}
+""", ("lumen_output", "lumen_line")),
+}
+
+RUNTIME_FINALIZERS = {"lumen_output": "lumen_flush", "lumen_speak": "lumen_speech_close"}
+
+RUNTIME_PLACEHOLDER = re.compile(r"<(\.?\w+)>")
+
+# Políticas de escrita da saída do EXIBIR, com o valor usado pelo runtime do código gerado
+OUTPUT_POLICIES = {"linha": 0, "bloco": 1, "fim": 2}
+
+LLVM_TYPES = {"NUMERO": "i32", "BOOLEANO": "i1", "TEXTO": "i8*"}
+LLVM_ZEROS = {"NUMERO": "0", "BOOLEANO": "false", "TEXTO": "null"}
+LLVM_NAME_REGEX = re.compile(r"[-a-zA-Z$._][-a-zA-Z$._0-9]*")
+
+
+def llvmString(text):
+    # Tipo e inicializador de uma constante de texto: o tamanho seguido dos bytes terminados em zero
+    data = text.encode("utf-8") + b"\0"
+    escaped = "".join(chr(byte) if 32 <= byte < 127 and byte not in (34, 92) else f"\\{byte:02X}" for byte in data)
+    array_type = f"[{len(data)} x i8]"
+    return f"{{ i64, {array_type} }}", f"{{ i64 {len(data) - 1}, {array_type} c\"{escaped}\" }}"
+
+
+def constantPointer(name, text):
+    string_type = llvmString(text)[0]
+    return f"getelementptr inbounds ({string_type}, {string_type}* @{name}, i32 0, i32 1, i32 0)"
+
+
+def variablePointer(name):
+    # Nomes com acentos não são identificadores LLVM válidos e precisam de aspas
+    name = f"{name}.addr"
+    return f"%{name}" if LLVM_NAME_REGEX.fullmatch(name) else f"%\"{name}\""
+
+
+def generatedType(node, symbol_table):
+    if node.result_type is not None:
+        return node.result_type
+    elif isinstance(node, Identifier):
+        return symbol_table.get_type(node.value)
+    elif isinstance(node, Read):
+        return symbol_table.expecting_type or "TEXTO"
+
+    return node.Evaluate(None)[1]
+
+
+def textOperand(code, value, value_type, name):
+    # Converte o operando para texto do runtime, com a mesma formatação do Evaluate
+    if value_type == "NUMERO":
+        code.append(f"%{name} = call i8* {code.allocate('lumen_from_int')}(i32 {value})")
+        return f"%{name}"
+    elif value_type == "BOOLEANO":
+        code.append(f"%{name} = select i1 {value}, i8* {code.runtime('.true_str')}, i8* {code.runtime('.false_str')}")
+        return f"%{name}"
+
+    return value
+
+
+def evaluateInto(node, target_type, symbol_table):
+    # PERGUNTAR() atribuído direto a uma variável é lido já no tipo dela
+    if type(node) is Read:
+        return node.read(target_type)
+
+    return node.Evaluate(symbol_table)
+
+
+def storeValue(code, value, value_type, pointer, name):
+    # Textos são copiados para o buffer da variável, já que a arena é liberada no fim do comando
+    llvm_type = LLVM_TYPES[value_type]
+
+    if value_type == "TEXTO":
+        code.append(f"%{name}_old = load i8*, i8** {pointer}")
+        code.append(f"%{name} = call i8* {code.function('lumen_assign')}(i8* %{name}_old, i8* {value})")
+        value = f"%{name}"
+
+    code.append(f"store {llvm_type} {value}, {llvm_type}* {pointer}")
 
-            for instr in self.instructions:
-                f.write("  " + instr + "\n")
-
-            f.write("  ret i32 0\n")
-            f.write("}\n")
 
 class SymbolTable:
     def __init__(self):
@@ -83,6 +775,12 @@ class SymbolTable:
         
         self.table[name] = value
 
+    def get_type(self, name):
+        if name not in self.table:
+            raise Exception(f"Variable '{name}' not declared.")
+
+        return self.table[name][1]
+
     def get(self, name):
         if name not in self.table:
             raise Exception(f"Variable '{name}' not declared.")
@@ -95,7 +793,75 @@ class SymbolTable:
         return self.table[name]  # (value, type)
 
 
+# BinOp e UnOp percorrem a subárvore da expressão com uma pilha explícita, em pós-ordem e da
+# esquerda para a direita (a ordem importa para o PERGUNTAR()), para que cadeias longas como
+# X MAIS X MAIS ... não dependam do limite de recursão do Python
+def evaluateExpression(root, symbol_table):
+    values = []
+    stack = [root]
+    push = stack.append
+    pop = stack.pop
+
+    # Um nó dentro de uma tupla já teve os filhos avaliados e só falta combiná-los
+    while stack:
+        node = pop()
+        kind = type(node)
+
+        if kind is tuple:
+            node = node[0]
+
+            if type(node) is BinOp:
+                right = values.pop()
+                values[-1] = node.combine(values[-1], right)
+            else:
+                values[-1] = node.combine(values[-1])
+        elif kind is BinOp:
+            push((node,))
+            push(node.children[1])
+            push(node.children[0])
+        elif kind is UnOp:
+            push((node,))
+            push(node.children[0])
+        else:
+            values.append(node.Evaluate(symbol_table))
+
+    return values[0]
+
+
+def generateExpression(root, symbol_table, code):
+    # Cada quadro guarda o próximo filho a gerar, o tipo esperado a restaurar no fim e os tipos
+    # gerados pelos filhos anteriores
+    stack = [(root, 0, symbol_table.expecting_type, [])]
+
+    while stack:
+        node, index, expecting_type, types = stack.pop()
+        children = node.children
+
+        if index and type(node) is BinOp:
+            types.append(generatedType(children[index - 1], symbol_table))
+
+        if index == len(children):
+            symbol_table.expecting_type = expecting_type
+            node.emit(code, types)
+            continue
+
+        child = children[index]
+        symbol_table.expecting_type = node.expecting(index, symbol_table)
+        stack.append((node, index + 1, expecting_type, types))
+
+        if type(child) in EXPRESSION_NODES:
+            stack.append((child, 0, symbol_table.expecting_type, []))
+        else:
+            child.Generate(symbol_table, code)
+
+
+# Folhas compartilham uma tupla vazia em vez de alocar uma lista de filhos por nó
+NO_CHILDREN = ()
+
+
 class Node(ABC):
+    # line e column são a posição do token que começa o nó no .lumen (0 em nós criados pelos otimizadores)
+    __slots__ = ("value", "children", "_id", "result_type", "line", "column")
     current_id = 0
 
     @staticmethod
@@ -106,25 +872,69 @@ class Node(ABC):
     def __init__(self, value, children: list):
         self.value = value
         self.children = children
-        self.id = Node.newId()
+        self._id = 0
+        self.result_type = None
+        self.line = 0
+        self.column = 0
+
+    # Copia a posição de um token ou de outro nó
+    def locate(self, origin):
+        self.line = origin.line
+        self.column = origin.column
+        return self
+
+    # O id só é usado para nomear registradores e rótulos no Generate, então é atribuído sob demanda
+    @property
+    def id(self):
+        if not self._id:
+            self._id = Node.newId()
+
+        return self._id
+
+    @classmethod
+    def fromParts(cls, value, children):
+        node = cls.__new__(cls)
+        Node.__init__(node, value, children)
+        return node
 
     @abstractmethod
     def Evaluate(self, symbol_table):
         pass
 
     @abstractmethod
-    def Generate(self, symbol_table):
+    def Generate(self, symbol_table, code):
         pass
 
+    # Operando LLVM com o valor do nó, válido depois do Generate
+    def operand(self):
+        return f"%temp_{self.id}"
+
 
 class BinOp(Node):
+    __slots__ = ()
+
     def __init__(self, value, left, right):
         super().__init__(value, [left, right])
 
 
     def Evaluate(self, symbol_table):
-        left_value, left_type = self.children[0].Evaluate(symbol_table)
-        right_value, right_type = self.children[1].Evaluate(symbol_table)
+        return self.evaluate(symbol_table, 0)
+
+    # Os primeiros níveis usam a recursão, mais barata; abaixo de EVALUATE_DEPTH, a pilha explícita
+    def evaluate(self, symbol_table, depth):
+        if depth == EVALUATE_DEPTH:
+            return evaluateExpression(self, symbol_table)
+
+        left, right = self.children
+        depth += 1
+        left = left.evaluate(symbol_table, depth) if type(left) in EXPRESSION_NODES else left.Evaluate(symbol_table)
+        right = right.evaluate(symbol_table, depth) if type(right) in EXPRESSION_NODES else right.Evaluate(symbol_table)
+        return self.combine(left, right)
+
+    # Combina os valores já avaliados dos dois filhos
+    def combine(self, left, right):
+        left_value, left_type = left
+        right_value, right_type = right
 
         if self.value in {"MAIS", "MENOS", "VEZES", "DIVIDIDO"}:
             if left_type != "NUMERO" or right_type != "NUMERO":
@@ -175,17 +985,27 @@ class BinOp(Node):
         else:
             raise ValueError(f"Operador binário desconhecido: {self.value}")
         
-    def Generate(self, symbol_table):
-        code = []
+    def Generate(self, symbol_table, code):
+        generateExpression(self, symbol_table, code)
+
+    # Tipo esperado pelo filho index, usado pelo PERGUNTAR() que estiver nele
+    def expecting(self, index, symbol_table):
+        other = self.children[1 - index]
 
-        right_code = self.children[1].Generate(symbol_table)
-        left_code = self.children[0].Generate(symbol_table)
+        if self.value in {"MAIS", "MENOS", "VEZES", "DIVIDIDO"}:
+            return "NUMERO"
+        elif self.value in {"E", "OU"}:
+            return "BOOLEANO"
+        elif self.value == "CONCATENA" or isinstance(other, Read):
+            return "TEXTO"
 
-        code += right_code
-        code += left_code
+        return generatedType(other, symbol_table)
 
-        left_result = f"%temp_{self.children[0].id}" if not isinstance(self.children[0], Identifier) else f"%{self.children[0].id}"
-        right_result = f"%temp_{self.children[1].id}" if not isinstance(self.children[1], Identifier) else f"%{self.children[1].id}"
+    # Emite a instrução do nó depois dos dois filhos, com os tipos que eles geraram
+    def emit(self, code, types):
+        left_result = self.children[0].operand()
+        right_result = self.children[1].operand()
+        left_type, right_type = types
 
         result_var = f"%temp_{self.id}"
 
@@ -197,39 +1017,48 @@ class BinOp(Node):
             code.append(f"{result_var} = mul i32 {left_result}, {right_result}")
         elif self.value == "DIVIDIDO":
             code.append(f"{result_var} = sdiv i32 {left_result}, {right_result}")
-        elif self.value == "IGUAL":
-            code.append(f"{result_var} = icmp eq i32 {left_result}, {right_result}")
-        elif self.value == "MAIOR":
-            code.append(f"{result_var} = icmp sgt i32 {left_result}, {right_result}")
-        elif self.value == "MENOR":
-            code.append(f"{result_var} = icmp slt i32 {left_result}, {right_result}")
+        elif self.value in {"IGUAL", "MAIOR", "MENOR"}:
+            operand_type = LLVM_TYPES[left_type]
+
+            # Textos são comparados pelo conteúdo e booleanos sem sinal (VERDADEIRO MAIOR FALSO)
+            if left_type == "TEXTO":
+                code.append(f"%strcmp_{self.id} = call i32 {code.function('strcmp')}(i8* {left_result}, i8* {right_result})")
+                left_result, right_result, operand_type = f"%strcmp_{self.id}", "0", "i32"
+
+            signed = left_type != "BOOLEANO"
+            condition = {"IGUAL": "eq", "MAIOR": "sgt" if signed else "ugt", "MENOR": "slt" if signed else "ult"}[self.value]
+            code.append(f"{result_var} = icmp {condition} {operand_type} {left_result}, {right_result}")
         elif self.value == "E":
             code.append(f"{result_var} = and i1 {left_result}, {right_result}")
         elif self.value == "OU":
             code.append(f"{result_var} = or i1 {left_result}, {right_result}")
         elif self.value == "CONCATENA":
-            malloc_size = 256
-            malloc_var = f"%malloc_{self.id}"
-            strcat_1 = f"%strcat1_{self.id}"
-            strcat_2 = f"%strcat2_{self.id}"
-
-            code.append(f"{malloc_var} = call i8* @malloc(i64 {malloc_size})")
-            code.append(f"{strcat_1} = call i8* @strcat(i8* {malloc_var}, i8* {left_result})")
-            code.append(f"{strcat_2} = call i8* @strcat(i8* {strcat_1}, i8* {right_result})")
-            code.append(f"{result_var} = bitcast i8* {strcat_2} to i8*")
+            left_result = textOperand(code, left_result, left_type, f"left_{self.id}")
+            right_result = textOperand(code, right_result, right_type, f"right_{self.id}")
+            code.append(f"{result_var} = call i8* {code.allocate('lumen_concat')}(i8* {left_result}, i8* {right_result})")
         else:
             raise Exception(f"Operador binário desconhecido: {self.value}")
 
-        return code
-
 
 class UnOp(Node):
+    __slots__ = ()
+
     def __init__(self, value, child):
         super().__init__(value, [child])
 
 
     def Evaluate(self, symbol_table):
-        value, val_type = self.children[0].Evaluate(symbol_table)
+        return self.evaluate(symbol_table, 0)
+
+    def evaluate(self, symbol_table, depth):
+        if depth == EVALUATE_DEPTH:
+            return evaluateExpression(self, symbol_table)
+
+        child = self.children[0]
+        return self.combine(child.evaluate(symbol_table, depth + 1) if type(child) in EXPRESSION_NODES else child.Evaluate(symbol_table))
+
+    def combine(self, operand):
+        value, val_type = operand
 
         if self.value in {"MAIS", "MENOS"}:
             if val_type != "NUMERO":
@@ -246,88 +1075,106 @@ class UnOp(Node):
         else:
             raise ValueError(f"Operador unário desconhecido: {self.value}")
     
-    def Generate(self, symbol_table):
-        code = []
+    def Generate(self, symbol_table, code):
+        generateExpression(self, symbol_table, code)
 
-        child_code = self.children[0].Generate(symbol_table)
-        code += child_code
+    def expecting(self, index, symbol_table):
+        return "BOOLEANO" if self.value == "NAO" else "NUMERO"
 
-        child_result = f"%temp_{self.children[0].id}" if not isinstance(self.children[0], Identifier) else f"%{self.children[0].id}"
+    def emit(self, code, types):
+        child_result = self.children[0].operand()
         result_var = f"%temp_{self.id}"
 
         if self.value == "NAO":
             code.append(f"{result_var} = xor i1 {child_result}, true")
         elif self.value == "MENOS":
             code.append(f"{result_var} = sub i32 0, {child_result}")
-        elif self.value == "MAIS":
-            code.append(f"{result_var} = add i32 0, {child_result}")
-        else:
+        elif self.value != "MAIS":
             raise Exception(f"Operador unário desconhecido: {self.value}")
 
-        return code
+    def operand(self):
+        # MAIS não muda o valor, então reaproveita o operando do filho
+        return self.children[0].operand() if self.value == "MAIS" else super().operand()
+
+
+# Nós percorridos pela pilha do evaluateExpression e do generateExpression
+EXPRESSION_NODES = {BinOp, UnOp}
+EVALUATE_DEPTH = 64
 
 
 class IntVal(Node):
+    __slots__ = ()
+
     def __init__(self, value):
-        super().__init__(value, [])
+        super().__init__(value, NO_CHILDREN)
 
 
     def Evaluate(self, symbol_table):
          return (self.value, "NUMERO")
     
-    def Generate(self, symbol_table):
-        temp_var = f"temp_{self.id}"
-        code = [f"%{temp_var} = add i32 0, {self.value}"]
-        return code
-    
+    def Generate(self, symbol_table, code):
+        pass
+
+    def operand(self):
+        return str(self.value)
+
 
 class BoolVal(Node):
+    __slots__ = ()
+
     def __init__(self, value):
-        super().__init__(value, [])
+        super().__init__(value, NO_CHILDREN)
 
     def Evaluate(self, symbol_table):
         return (1 if self.value == "true" else 0, "BOOLEANO")
     
-    def Generate(self, symbol_table):
-        temp_var = f"temp_{self.id}"
-        val = "1" if self.value == "VERDADEIRO" else "0"
-        code = [f"%{temp_var} = icmp eq i1 {val}, 1"]
-        return code
+    def Generate(self, symbol_table, code):
+        pass
+
+    def operand(self):
+        return "true" if self.value in ("VERDADEIRO", "true") else "false"
 
 
 class StrVal(Node):
+    __slots__ = ("pointer",)
+
     def __init__(self, value):
-        super().__init__(value, [])
+        super().__init__(value, NO_CHILDREN)
 
     def Evaluate(self, symbol_table):
         return (self.value, "TEXTO")
     
-    def Generate(self, symbol_table):
-        temp_var = f"temp_{self.id}"
-        string_constant = f"c\"{self.value}\\00\""
-        code = [f"@{self.id} = private constant [{len(self.value) + 1} x i8] {string_constant}"]
-        code.append(f"%{temp_var} = getelementptr inbounds [{len(self.value) + 1} x i8], [{len(self.value) + 1} x i8]* @{self.id}, i32 0, i32 0")
-        return code
+    def Generate(self, symbol_table, code):
+        self.pointer = code.string(self.value)
+
+    def operand(self):
+        return self.pointer
 
 
 class Identifier(Node):
+    __slots__ = ("slot",)
+
     def __init__(self, value):
-        super().__init__(value, [])
+        super().__init__(value, NO_CHILDREN)
+        self.slot = -1
 
 
     def Evaluate(self, symbol_table):
         return symbol_table.get(self.value)
     
-    def Generate(self, symbol_table):
-        if symbol_table.get(self.value)[1] == "NUMERO" or symbol_table.get(self.value)[1] == "BOOLEANO":
-            return [f"%{self.id} = load i32, i32* @{self.value}"]
-        elif symbol_table.get(self.value)[1] == "TEXTO":
-            return [f"%{self.id} = load i8*, i8** @{self.value}"]
-        else:
+    def Generate(self, symbol_table, code):
+        var_type = symbol_table.get(self.value)[1]
+
+        if var_type not in LLVM_TYPES:
             raise ValueError(f"Tipo de variável desconhecido para {self.value}")
-    
+
+        llvm_type = LLVM_TYPES[var_type]
+        code.append(f"%temp_{self.id} = load {llvm_type}, {llvm_type}* {variablePointer(self.value)}")
+
 
 class VarDeC(Node):
+    __slots__ = ()
+
     def __init__(self, identifier, type, expression=None):
         super().__init__("GUARDAR", [identifier, type] + ([expression] if expression else []))
 
@@ -336,34 +1183,28 @@ class VarDeC(Node):
         symbol_table.declare(self.children[0].value, self.children[1])
 
         if len(self.children) == 3:
-            if self.children[1] != self.children[2].Evaluate(symbol_table)[1]:
+            value, type = evaluateInto(self.children[2], self.children[1], symbol_table)
+
+            if self.children[1] != type:
                 raise TypeError(f"Tipo de variável '{self.children[0].value}' não corresponde ao tipo da expressão.")
             
-            value, type = self.children[2].Evaluate(symbol_table)
             symbol_table.set(self.children[0].value, (value, type))
             return (value, type)
         
         return (None, None)
     
-    def Generate(self, symbol_table):
+    def Generate(self, symbol_table, code):
         identifier = self.children[0].value
         type_ = self.children[1]  # "NUMERO", "BOOLEANO", "TEXTO"
-        code = []
-
-        llvm_type = {
-            "NUMERO": "i32",
-            "BOOLEANO": "i32",
-            "TEXTO": "i8*"
-        }.get(type_)
+        llvm_type = LLVM_TYPES.get(type_)
 
         if llvm_type is None:
             raise ValueError(f"Tipo de variável desconhecido: {type_}")
 
-        # Declara a variável globalmente (com valor neutro)
-        if type_ == "TEXTO":
-            code.append(f"@{identifier} = global {llvm_type} null")
-        else:
-            code.append(f"@{identifier} = global {llvm_type} 0")
+        # Aloca a variável no bloco de entrada do main (com valor neutro)
+        pointer = variablePointer(identifier)
+        code.allocas.append(f"{pointer} = alloca {llvm_type}")
+        code.allocas.append(f"store {llvm_type} {LLVM_ZEROS[type_]}, {llvm_type}* {pointer}")
 
         # Registra no symbol_table
         symbol_table.declare(identifier, type_)
@@ -371,62 +1212,177 @@ class VarDeC(Node):
         # Se há expressão de inicialização
         if len(self.children) == 3:
             symbol_table.expecting_type = type_
-            expr_code = self.children[2].Generate(symbol_table)
-            code += expr_code
+            self.children[2].Generate(symbol_table, code)
             symbol_table.expecting_type = None
 
-            expr_result = f"%temp_{self.children[2].id}" if not isinstance(self.children[2], Identifier) else f"%{self.children[2].id}"
-
-            if type_ == "TEXTO":
-                code.append(f"store {llvm_type} {expr_result}, {llvm_type}* @{identifier}")
-            else:
-                code.append(f"store i32 {expr_result}, i32* @{identifier}")
+            storeValue(code, self.children[2].operand(), type_, pointer, f"buffer_{self.id}")
+            code.release()
 
             symbol_table.set(identifier, ("init", type_))
 
-        return code
-
 
 class Assignment(Node):
+    __slots__ = ()
+
     def __init__(self, identifier, expression):
         super().__init__("RECEBE", [identifier, expression])
 
 
     def Evaluate(self, symbol_table):
-        value, type = self.children[1].Evaluate(symbol_table)
+        target_type = symbol_table.table.get(self.children[0].value, (None, None))[1]
+        value, type = evaluateInto(self.children[1], target_type, symbol_table)
         symbol_table.set(self.children[0].value, (value, type))
         return (value, type)
     
-    def Generate(self, symbol_table):
-        code = []
-
+    def Generate(self, symbol_table, code):
         var_name = self.children[0].value
-        var_type = symbol_table.get(var_name)[1]
+        var_type = symbol_table.get_type(var_name)
         symbol_table.expecting_type = var_type
 
         # Gera o valor da expressão do lado direito
-        expr_code = self.children[1].Generate(symbol_table)
-        code += expr_code
+        self.children[1].Generate(symbol_table, code)
 
         symbol_table.expecting_type = None
 
-        # Resultado gerado (LLVM IR variable)
-        expr_result = f"%temp_{self.children[1].id}" if not isinstance(self.children[1], Identifier) else f"%{self.children[1].id}"
-
         # Store adequado ao tipo
-        if var_type == "NUMERO" or var_type == "BOOLEANO":
-            code.append(f"store i32 {expr_result}, i32* @{var_name}")
-        elif var_type == "TEXTO":
-            code.append(f"store i8* {expr_result}, i8** @{var_name}")
-        else:
+        if var_type not in LLVM_TYPES:
             raise ValueError(f"Tipo de variável desconhecido para atribuição: {var_type}")
-        
+
+        storeValue(code, self.children[1].operand(), var_type, variablePointer(var_name), f"buffer_{self.id}")
+        code.release()
+
         symbol_table.set(var_name, ("init", var_type))
 
-        return code
+
+# Saída do EXIBIR. As linhas são juntadas em um buffer e escritas de uma vez no sys.stdout conforme
+# a política: "linha" escreve a cada EXIBIR, "bloco" quando o buffer passa de size caracteres e
+# "fim" só no fim do programa. Em todas, o buffer também é escrito antes de um PERGUNTAR e de um
+# FALAR, para que o texto apareça antes da pergunta ou da fala. Sem configure, a saída é por linha
+# no terminal e por bloco quando redirecionada, como no stdio do C.
+class Output:
+    instance = None
+    policy = None
+    size = 1 << 16
+
+    def __init__(self, policy, size):
+        if policy not in OUTPUT_POLICIES:
+            raise ValueError(f"Política de saída desconhecida: {policy}")
+
+        self.policy = policy
+        self.size = size
+        self.pending = []
+        self.pending_size = 0
+
+    @classmethod
+    def configure(cls, policy=None, size=1 << 16):
+        # Vale para a próxima saída criada; a atual escreve o que ainda está no buffer
+        cls.finish()
+        cls.instance = None
+        cls.policy = policy
+        cls.size = size
+
+    @classmethod
+    def shared(cls):
+        if cls.instance is None:
+            policy = cls.policy or ("linha" if sys.stdout.isatty() else "bloco")
+            cls.instance = cls(policy, cls.size)
+
+        return cls.instance
+
+    @classmethod
+    def finish(cls):
+        if cls.instance is not None:
+            cls.instance.flush()
+
+    def write(self, line):
+        self.pending.append(line)
+        self.pending_size += len(line) + 1
+
+        if self.policy == "linha" or (self.policy == "bloco" and self.pending_size >= self.size):
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            sys.stdout.write("\n".join(self.pending) + "\n")
+            self.pending.clear()
+            self.pending_size = 0
+
+        sys.stdout.flush()
+
+
+atexit.register(Output.finish)
+
+
+# Entrada do PERGUNTAR. No modo interativo, cada PERGUNTAR lê uma linha com input(). No modo em
+# lote, a entrada (sys.stdin ou um arquivo) é lida em blocos de block_size caracteres e quebrada
+# em linhas antes de ser pedida, e cada PERGUNTAR só tira a próxima linha da fila.
+class Input:
+    instance = None
+    batch = False
+    source = None
+    block_size = 1 << 16
+
+    def __init__(self, batch, source, block_size):
+        self.batch = batch
+        self.file = None
+        self.owned = batch and source is not None
+        self.lines = deque()
+        self.partial = ""
+        self.block_size = block_size
+
+        if batch:
+            self.file = open(source, encoding="utf-8") if self.owned else sys.stdin
+
+    @classmethod
+    def configure(cls, batch=False, source=None, block_size=1 << 16):
+        # Vale para a próxima entrada criada; linhas já lidas e não usadas são descartadas
+        cls.close()
+        cls.batch = batch
+        cls.source = source
+        cls.block_size = block_size
+
+    @classmethod
+    def shared(cls):
+        if cls.instance is None:
+            cls.instance = cls(cls.batch, cls.source, cls.block_size)
+
+        return cls.instance
+
+    @classmethod
+    def close(cls):
+        if cls.instance is not None:
+            instance, cls.instance = cls.instance, None
+
+            if instance.owned:
+                instance.file.close()
+
+    def line(self):
+        if not self.batch:
+            return input()
+
+        lines = self.lines
+
+        while not lines:
+            block = self.file.read(self.block_size)
+
+            if not block:
+                if not self.partial:
+                    raise EOFError("EOF when reading a line")
+
+                # Última linha, sem \n no fim
+                lines.append(self.partial)
+                self.partial = ""
+                break
+
+            lines.extend((self.partial + block).split("\n"))
+            self.partial = lines.pop()
+
+        return lines.popleft()
 
 
 class Print(Node):
+    __slots__ = ()
+
     def __init__(self, expression):
         super().__init__("EXIBIR", [expression])
 
@@ -434,45 +1390,335 @@ class Print(Node):
     def Evaluate(self, symbol_table):
         value = self.children[0].Evaluate(symbol_table)
         if value[1] == "BOOLEANO":
-            print("true" if value[0] else "false")
+            Output.shared().write("true" if value[0] else "false")
         else:
-            print(value[0])
+            Output.shared().write(str(value[0]))
         return (value, None)
     
-    def Generate(self, symbol_table):
-        code = self.children[0].Generate(symbol_table)
-        
-        child = self.children[0]
-        result_var = f"%temp_{child.id}" if not isinstance(child, Identifier) else f"%{child.id}"
+    def Generate(self, symbol_table, code):
+        self.children[0].Generate(symbol_table, code)
 
-        # Descobrir tipo
-        if isinstance(child, Identifier):
-            val_type = symbol_table.get(child.value)[1]
-        else:
-            _, val_type = child.Evaluate(symbol_table)
+        child = self.children[0]
+        result_var = child.operand()
+        val_type = generatedType(child, symbol_table)
 
+        # A linha vai para o buffer de saída do runtime
         if val_type == "NUMERO":
-            format_str = "@.int_print_fmt"
-            code.append(f"%call_{self.id} = call i32 (i8*, ...) @printf(i8* {format_str}, i32 {result_var})")
+            code.append(f"call void {code.function('lumen_print_int')}(i32 {result_var})")
         elif val_type == "BOOLEANO":
             # Converte booleano (i1) em string com ponteiro condicional
-            true_str = "@.true_str"
-            false_str = "@.false_str"
-            bool_ptr = f"%bool_ptr_{self.id}"
-            code.append(f"{bool_ptr} = select i1 {result_var}, i8* {true_str}, i8* {false_str}")
-            code.append(f"%call_{self.id} = call i32 (i8*, ...) @printf(i8* %bool_ptr_{self.id})")
+            bool_ptr = textOperand(code, result_var, val_type, f"bool_ptr_{self.id}")
+            code.append(f"call void {code.function('lumen_print')}(i8* {bool_ptr})")
         elif val_type == "TEXTO":
-            code.append(f"%call_{self.id} = call i32 (i8*, ...) @printf(i8* {result_var})")
+            code.append(f"call void {code.function('lumen_print')}(i8* {result_var})")
         else:
             raise Exception(f"Tipo inválido em Print: {val_type}")
-        
-        return code
+
+        code.release()
+
+
+# Backends de fala. O pyttsx3 só é importado e iniciado na primeira fala, já dentro da thread do
+# SpeechEngine; NullSpeech e RecordedSpeech deixam programas e benchmarks rodarem sem áudio.
+class Pyttsx3Speech:
+    def __init__(self, volume=0.7):
+        self.volume = volume
+        self.engine = None
+
+    def start(self):
+        if self.engine is None:
+            import pyttsx3
+
+            self.engine = pyttsx3.init()
+            self.engine.setProperty("volume", self.volume)
+
+        return self.engine
+
+    def say(self, text):
+        engine = self.start()
+        engine.say(text)
+        engine.runAndWait()
+
+    def close(self):
+        pass
+
+
+# Pyttsx3Speech com cache do áudio: cada fala nova é sintetizada uma vez com save_to_file e as
+# repetidas só tocam o áudio guardado, enviado para a entrada padrão do player
+class CachedSpeech(Pyttsx3Speech):
+    PLAYER = ("aplay", "-q", "-")
+
+    def __init__(self, cache=None, player=PLAYER, volume=0.7):
+        super().__init__(volume)
+        self.cache = cache if cache is not None else SpeechCache()
+        self.player = player
+
+    def say(self, text):
+        engine = self.start()
+        key = SpeechCache.key(text, engine.getProperty("voice"), engine.getProperty("rate"), engine.getProperty("volume"))
+        audio = self.cache.get(key)
+
+        if audio is None:
+            audio = self.synthesize(engine, text)
+            self.cache.put(key, audio)
+
+        subprocess.run(self.player, input=audio, check=True)
+
+    @staticmethod
+    def synthesize(engine, text):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fala.wav")
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+
+            with open(path, "rb") as file:
+                return file.read()
+
+
+# Cache do áudio sintetizado, com chave (texto, voz, velocidade, volume). A memória e o disco têm
+# limites próprios em bytes e descartam primeiro o áudio usado há mais tempo; no disco, a ordem de
+# uso é o horário de modificação do arquivo, atualizado a cada acerto, então vale entre execuções.
+class SpeechCache:
+    SUFFIX = ".wav"
+
+    def __init__(self, directory: str = None, memory_limit: int = 8 << 20, disk_limit: int = 64 << 20):
+        self.directory = directory or os.path.join(ParseCache.userDirectory(), "fala")
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.memory = OrderedDict()
+        self.memory_size = 0
+        self.disk_size = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def key(text, voice, rate, volume):
+        return hashlib.sha256(repr((text, voice, rate, volume)).encode()).hexdigest()
+
+    def path(self, key: str):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str):
+        audio = self.memory.get(key)
+
+        if audio is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return audio
+
+        try:
+            with open(self.path(key), "rb") as file:
+                audio = file.read()
+
+            os.utime(self.path(key))
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.disk_hits += 1
+        self.remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(audio)
+
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+        if self.disk_size is not None:
+            self.disk_size += len(audio)
+
+        self.remember(key, audio)
+        self.trim()
+
+    def remember(self, key: str, audio: bytes):
+        self.memory[key] = audio
+        self.memory_size += len(audio)
+
+        while self.memory_size > self.memory_limit and self.memory:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
+            self.memory_evictions += 1
+
+    def trim(self):
+        # O diretório só é percorrido na primeira gravação e quando o limite é ultrapassado
+        if self.disk_size is not None and self.disk_size <= self.disk_limit:
+            return
+
+        entries = []
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                status = entry.stat()
+                entries.append((status.st_mtime, status.st_size, entry.path))
+
+        entries.sort()
+        self.disk_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if self.disk_size <= self.disk_limit:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            self.disk_size -= size
+            self.disk_evictions += 1
+
+    def stats(self):
+        return {
+            "acertos": self.hits,
+            "acertos em disco": self.disk_hits,
+            "falhas": self.misses,
+            "descartes da memória": self.memory_evictions,
+            "descartes do disco": self.disk_evictions,
+        }
+
+
+class NullSpeech:
+    def say(self, text):
+        pass
+
+    def close(self):
+        pass
+
+
+# Guarda as falas em memória e, opcionalmente, uma por linha em um arquivo
+class RecordedSpeech:
+    def __init__(self, path=None):
+        self.spoken = []
+        self.file = open(path, "a", encoding="utf-8") if path else None
+
+    def say(self, text):
+        self.spoken.append(text)
+
+        if self.file is not None:
+            self.file.write(text + "\n")
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# Motor de fala único, compartilhado por todos os Falar e criado só quando o primeiro FALAR é
+# executado. As falas entram em uma fila consumida por uma thread, então o programa continua
+# enquanto o áudio toca; no modo bloqueante, cada FALAR espera a fila esvaziar. A fila é esvaziada
+# no fim do Parser.run e na saída do processo. Um erro do backend é guardado pela thread e levantado
+# no próximo FALAR ou no fim do programa. Sem configure, LUMEN_FALA_ARQUIVO grava as falas em um
+# arquivo em vez de usar o pyttsx3, como no código compilado; com o aplay instalado, o pyttsx3 usa
+# o cache de áudio.
+class SpeechEngine:
+    instance = None
+    backend = None
+    blocking = False
+
+    def __init__(self, backend, blocking=False):
+        self.speech = backend
+        self.blocking = blocking
+        self.queue = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(target=self.work, name="lumen-falar", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def configure(cls, backend=None, blocking=False):
+        # Vale para o próximo motor criado; o atual termina as falas pendentes e é fechado
+        cls.shutdown()
+        cls.backend = backend
+        cls.blocking = blocking
+
+    @classmethod
+    def shared(cls):
+        if cls.instance is None:
+            backend = cls.backend
+
+            if backend is None:
+                path = os.environ.get("LUMEN_FALA_ARQUIVO")
+
+                if path:
+                    backend = RecordedSpeech(path)
+                elif shutil.which(CachedSpeech.PLAYER[0]):
+                    backend = CachedSpeech()
+                else:
+                    backend = Pyttsx3Speech()
+
+            cls.instance = cls(backend, cls.blocking)
+
+        return cls.instance
+
+    @classmethod
+    def finish(cls):
+        if cls.instance is not None:
+            cls.instance.drain()
+
+    @classmethod
+    def shutdown(cls):
+        if cls.instance is not None:
+            instance, cls.instance = cls.instance, None
+            instance.close()
+
+    def speak(self, text):
+        self.check()
+        self.queue.put(text)
+
+        if self.blocking:
+            self.drain()
+
+    def drain(self):
+        self.queue.join()
+        self.check()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.speech.close()
+        self.check()
+
+    def check(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def work(self):
+        while True:
+            text = self.queue.get()
+
+            try:
+                if text is None:
+                    return
+
+                # Depois de um erro, as falas seguintes são descartadas até ele ser levantado
+                if self.error is None:
+                    self.speech.say(text)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+
+atexit.register(SpeechEngine.shutdown)
+
 
 class Falar(Node):
+    __slots__ = ()
+
     def __init__(self, expression):
         super().__init__("FALAR", [expression])
-        self.engine = pyttsx3.init()
-        self.engine.setProperty("volume", 0.7)
 
     def Evaluate(self, symbol_table):
         value = self.children[0].Evaluate(symbol_table)
@@ -480,44 +1726,31 @@ class Falar(Node):
         if isinstance(value, tuple):
             value = value[0]
 
-        self.engine.say(str(value))
-        self.engine.runAndWait()
+        self.speak(value)
         
         return (value, None)
 
-    def Generate(self, symbol_table):
-        code = []
-
-        expr_code = self.children[0].Generate(symbol_table)
-        code += expr_code
-
-        value_ptr = f"%temp_{self.children[0].id}" if not isinstance(self.children[0], Identifier) else f"%{self.children[0].id}"
-        casted_ptr = f"%cast_{self.id}"
-        cmd_ptr = f"%cmd_{self.id}"
-        cmd_concat = f"%cmd_concat_{self.id}"
-        system_call = f"%system_call_{self.id}"
+    @staticmethod
+    def speak(value):
+        Output.finish()
+        SpeechEngine.shared().speak(str(value))
 
-        # Alocar string "espeak \""
-        prefix = f"@.espeak_prefix = private unnamed_addr constant [9 x i8] c\"espeak \\22\\00\""
-        suffix = f"@.espeak_suffix = private unnamed_addr constant [2 x i8] c\"\\22\\00\""
+    def Generate(self, symbol_table, code):
+        self.children[0].Generate(symbol_table, code)
 
-        # Note: essas constantes devem estar no cabeçalho do programa
+        value_type = generatedType(self.children[0], symbol_table)
+        value_ptr = textOperand(code, self.children[0].operand(), value_type, f"text_{self.id}")
 
-        code.append(f"{casted_ptr} = bitcast i8* {value_ptr} to i8*")
-        
-        # Aloca um buffer para montar o comando: "espeak \"<mensagem>\""
-        code.append(f"{cmd_ptr} = call i8* @malloc(i64 256)")
-        code.append(f"%tmp1_{self.id} = call i8* @strcpy(i8* {cmd_ptr}, i8* getelementptr inbounds ([9 x i8], [9 x i8]* @.espeak_prefix, i32 0, i32 0))")
-        code.append(f"%tmp2_{self.id} = call i8* @strcat(i8* %tmp1_{self.id}, i8* {casted_ptr})")
-        code.append(f"%tmp3_{self.id} = call i8* @strcat(i8* %tmp2_{self.id}, i8* getelementptr inbounds ([2 x i8], [2 x i8]* @.espeak_suffix, i32 0, i32 0))")
+        # A fala vai para um único processo de fala, aberto no primeiro FALAR do programa, depois
+        # do que já foi exibido
+        code.append(f"call void {code.function('lumen_flush')}()")
+        code.append(f"call void {code.function('lumen_speak')}(i8* {value_ptr})")
+        code.release()
 
-        # system(cmd)
-        code.append(f"{system_call} = call i32 @system(i8* {cmd_ptr})")
 
-        return code
-    
-    
 class If(Node):
+    __slots__ = ()
+
     def __init__(self, condition, then_branch, else_branch=None):
         super().__init__("QUANDO", [condition, then_branch] + ([else_branch] if else_branch else []))
 
@@ -532,13 +1765,11 @@ class If(Node):
         elif len(self.children) > 2:
             return self.children[2].Evaluate(symbol_table)
         
-    def Generate(self, symbol_table):
-        code = []
+    def Generate(self, symbol_table, code):
+        self.children[0].Generate(symbol_table, code)
+        code.release()
 
-        cond_code = self.children[0].Generate(symbol_table)
-        code += cond_code
-
-        cond_result = f"%temp_{self.children[0].id}"
+        cond_result = self.children[0].operand()
         then_label = f"then_{self.id}"
         else_label = f"else_{self.id}"
         end_label = f"endif_{self.id}"
@@ -549,31 +1780,28 @@ class If(Node):
 
             # THEN branch
             code.append(f"{then_label}:")
-            then_code = self.children[1].Generate(symbol_table)
-            code += then_code
+            self.children[1].Generate(symbol_table, code)
             code.append(f"br label %{end_label}")
 
             # ELSE branch
             code.append(f"{else_label}:")
-            else_code = self.children[2].Generate(symbol_table)
-            code += else_code
+            self.children[2].Generate(symbol_table, code)
             code.append(f"br label %{end_label}")
         else:
             code.append(f"br i1 {cond_result}, label %{then_label}, label %{end_label}")
 
             # THEN only
             code.append(f"{then_label}:")
-            then_code = self.children[1].Generate(symbol_table)
-            code += then_code
+            self.children[1].Generate(symbol_table, code)
             code.append(f"br label %{end_label}")
 
         # Fim
         code.append(f"{end_label}:")
 
-        return code
-    
 
 class While(Node):
+    __slots__ = ()
+
     def __init__(self, condition, block):
         super().__init__("ENQUANTO", [condition, block])
 
@@ -591,9 +1819,7 @@ class While(Node):
 
         return result
     
-    def Generate(self, symbol_table):
-        code = []
-
+    def Generate(self, symbol_table, code):
         loop_id = self.id
         cond_label = f"loop_cond_{loop_id}"
         body_label = f"loop_body_{loop_id}"
@@ -604,24 +1830,23 @@ class While(Node):
 
         # Bloco da condição
         code.append(f"{cond_label}:")
-        cond_code = self.children[0].Generate(symbol_table)
-        code += cond_code
-        cond_result = f"%temp_{self.children[0].id}"
+        self.children[0].Generate(symbol_table, code)
+        code.release()
+        cond_result = self.children[0].operand()
         code.append(f"br i1 {cond_result}, label %{body_label}, label %{end_label}")
 
         # Bloco do corpo do laço
         code.append(f"{body_label}:")
-        body_code = self.children[1].Generate(symbol_table)
-        code += body_code
+        self.children[1].Generate(symbol_table, code)
         code.append(f"br label %{cond_label}")  # volta para verificar a condição
 
         # Fim do laço
         code.append(f"{end_label}:")
 
-        return code
-
 
 class Block(Node):
+    __slots__ = ()
+
     def __init__(self, statements):
         super().__init__("block", statements)
 
@@ -632,156 +1857,2375 @@ class Block(Node):
 
         return (None, None)
     
-    def Generate(self, symbol_table):
-        code = []
-
+    def Generate(self, symbol_table, code):
         for stmt in self.children:
-            code += stmt.Generate(symbol_table)
-
-        return code
+            stmt.Generate(symbol_table, code)
 
 
 class Read(Node):
+    __slots__ = ()
+
     def __init__(self):
-        super().__init__("PERGUNTAR", [])
+        super().__init__("PERGUNTAR", NO_CHILDREN)
 
     def Evaluate(self, symbol_table):
-        value = input()
+        return self.read(None)
+
+    @staticmethod
+    def read(expected_type):
+        # Lido direto para uma variável, o valor é convertido para o tipo dela; sem tipo, é
+        # número quando só tem dígitos
+        Output.finish()
+        value = Input.shared().line()
+
+        if expected_type is None or expected_type == "BOOLEANO":
+            expected_type = "NUMERO" if value.isdigit() else "TEXTO"
 
         try:
-            if value.isdigit():
+            if expected_type == "NUMERO":
                 return (int(value), "NUMERO")
             else:
                 return (value, "TEXTO")
         except ValueError:
             raise ValueError(f"Entrada inválida: {value}. Esperado um número inteiro.")
         
-    def Generate(self, symbol_table):
-        code = []
+    def Generate(self, symbol_table, code):
         temp_var = f"%temp_{self.id}"
 
-        # Buffer para leitura de string (estático, tamanho fixo para simplificação)
-        buffer_name = f"%buf_{self.id}"
-        str_format = "@.str_read_fmt"   # definido no cabeçalho como: `@.str_read_fmt = private constant [3 x i8] c\"%s\\00\"`
-        int_format = "@.int_read_fmt"   # definido no cabeçalho como: `@.int_read_fmt = private constant [3 x i8] c\"%d\\00\"`
+        # O tipo lido vem do contexto (declaração, atribuição ou operador); sozinho, é texto
+        read_type = symbol_table.expecting_type or "TEXTO"
 
-        # Tentativa de inferência de tipo, como no Evaluate (assumiremos sempre texto se for usado de forma independente)
-        read_type = symbol_table.expecting_type if hasattr(symbol_table, "expecting_type") else "TEXTO"
+        # O que foi exibido antes da pergunta aparece antes de ler
+        code.append(f"call void {code.function('lumen_flush')}()")
 
         if read_type == "NUMERO":
-            code.append(f"{temp_var}_ptr = alloca i32")
-            code.append(f"%call_scanf_{self.id} = call i32 (i8*, ...) @scanf(i8* {int_format}, i32* {temp_var}_ptr)")
-            code.append(f"{temp_var} = load i32, i32* {temp_var}_ptr")
+            code.append(f"{temp_var} = call i32 {code.allocate('lumen_read_int')}()")
         elif read_type == "TEXTO":
-            code.append(f"{buffer_name} = alloca [256 x i8]")
-            code.append(f"%gep_{self.id} = getelementptr inbounds [256 x i8], [256 x i8]* {buffer_name}, i32 0, i32 0")
-            code.append(f"%call_scanf_{self.id} = call i32 (i8*, ...) @scanf(i8* {str_format}, i8* %gep_{self.id})")
-            code.append(f"{temp_var} = add i8* %gep_{self.id}, 0")  # só alias para retorno
+            code.append(f"{temp_var} = call i8* {code.allocate('lumen_read_line')}()")
         else:
             raise Exception("Tipo de leitura não suportado")
 
-        return code
-
 
 class NoOp(Node):
+    __slots__ = ()
+
     def __init__(self):
-        super().__init__(None, [])
+        super().__init__(None, NO_CHILDREN)
 
 
     def Evaluate(self, symbol_table):
         return (None, None)
     
-    def Generate(self, symbol_table):
-        return []
+    def Generate(self, symbol_table, code):
+        pass
 
 
-class PrePro:
-    @staticmethod
-    def filter(code: str):
-        return re.sub(r'INFORME:.*', '', code).strip()
+NODE_TYPES = (Block, VarDeC, Assignment, Print, Falar, If, While, NoOp, BinOp, UnOp, IntVal, BoolVal, StrVal, Identifier, Read)
+NODE_OPCODES = {node_type: opcode for opcode, node_type in enumerate(NODE_TYPES)}
 
 
-class Token:
-    def __init__(self, type: str, value):
-        self.type = type
-        self.value = value
+# Codificação plana da árvore em arrays paralelos: opcode, operando, primeiro filho e número de filhos.
+# Os nós são numerados em largura, então os filhos de um nó ocupam índices consecutivos.
+class FlatAST:
+    def __init__(self, root: Node):
+        self.opcodes = array("B")
+        self.operands = []
+        self.first_child = array("I")
+        self.child_count = array("I")
+        self.lines = array("I")
+        self.columns = array("I")
+        self.encode(root)
 
+    def __len__(self):
+        return len(self.opcodes)
 
-class Tokenizer:
-    def __init__(self, source: str, position: int, next: Token):
-        self.source = source
-        self.position = position
-        self.next = next
-        self.keywords = {
-            "INICIO": "INICIO", "FIM": "FIM", "RECEBE": "RECEBE", "EXIBIR": "EXIBIR", "FALAR": "FALAR", 
-            "GUARDAR": "GUARDAR","COMO": "COMO", "COM": "COM", "QUANDO": "QUANDO", "SENAO": "SENAO",
-            "ENQUANTO": "ENQUANTO", "OU": "OU", "E": "E", "IGUAL": "IGUAL", "MAIOR": "MAIOR", "MENOR": "MENOR",
-            "MAIS": "MAIS", "MENOS": "MENOS", "CONCATENA": "CONCATENA", "VEZES": "VEZES", "DIVIDIDO": "DIVIDIDO",
-            "NAO": "NAO", "PERGUNTAR": "PERGUNTAR", "VERDADEIRO": "BOOL", "FALSO": "BOOL", "NUMERO": "TYPE_NUMERO",
-            "BOOLEANO": "TYPE_BOOL", "TEXTO": "TYPE_TEXTO"
-            }
-    
-    def selectNext(self):
-        while self.position < len(self.source) and self.source[self.position] in {' ', '\n', '\r', '\t'}:
-            self.position += 1
+    def encode(self, root: Node):
+        queue = [root]
 
-        if self.position < len(self.source):
-            char = self.source[self.position]
+        for node in queue:
+            node_type = type(node)
+            self.opcodes.append(NODE_OPCODES[node_type])
+            self.lines.append(node.line)
+            self.columns.append(node.column)
 
-            if char.isdigit():
-                num = ''
-                
-                while self.position < len(self.source) and self.source[self.position].isdigit():
-                    num += self.source[self.position]
-                    self.position += 1
-                
-                if self.position < len(self.source) and self.source[self.position].isalpha():
-                    raise ValueError(f"Erro de sintaxe: número seguido de letra sem separação: {num}{self.source[self.position]}")
+            if node_type is VarDeC:
+                # O tipo declarado é o único filho que não é nó
+                self.operands.append(node.children[1])
+                children = [node.children[0]] + node.children[2:]
+            else:
+                self.operands.append(node.value)
+                children = node.children
+
+            self.first_child.append(len(queue))
+            self.child_count.append(len(children))
+            queue.extend(children)
+
+    def node(self, index: int):
+        # Reconstrói a subárvore de baixo para cima, sem recursão. Como os filhos sempre têm
+        # índices maiores que o pai, basta percorrer os índices da subárvore em ordem decrescente.
+        order = [index]
+
+        for current in order:
+            first = self.first_child[current]
+            order.extend(range(first, first + self.child_count[current]))
+
+        order.sort(reverse=True)
+        built = {}
+        opcodes = self.opcodes
+        operands = self.operands
+        first_child = self.first_child
+        child_count = self.child_count
+        lines = self.lines
+        columns = self.columns
+
+        for current in order:
+            count = child_count[current]
+
+            if count:
+                first = first_child[current]
+                children = [built.pop(child) for child in range(first, first + count)]
+            else:
+                children = NO_CHILDREN
 
-                self.next = Token("NUMERO", int(num))
-                return
-            elif char.isalpha():
-                ident = ''
+            node_type = NODE_TYPES[opcodes[current]]
+            value = operands[current]
 
-                while self.position < len(self.source) and (self.source[self.position].isalnum() or self.source[self.position] == '_'):
-                    ident += self.source[self.position]
-                    self.position += 1
+            if node_type is VarDeC:
+                children.insert(1, value)
+                value = "GUARDAR"
 
-                token_type = self.keywords.get(ident, "IDENTIFICADOR")
-                
-                self.next = Token(token_type, ident)
-                return
-            elif char == '"':
-                self.position += 1
-                string_val = ''
+            node = node_type.__new__(node_type)
+            node.value = value
+            node.children = children
+            node._id = 0
+            node.result_type = None
+            node.line = lines[current]
+            node.column = columns[current]
 
-                while self.position < len(self.source) and self.source[self.position] != '"':
-                    string_val += self.source[self.position]
-                    self.position += 1
+            if node_type is Identifier:
+                node.slot = -1
 
-                if self.position >= len(self.source) or self.source[self.position] != '"':
-                    raise ValueError("String não fechada corretamente com aspas.")
+            built[current] = node
 
-                self.position += 1
-                self.next = Token("TEXTO", string_val)
-                return
-            elif char == '(': 
-                self.next = Token("ABREPAR", char)
-            elif char == ')':
-                self.next = Token("FECHAPAR", char)
-            elif char == ';': 
-                self.next = Token("PONTOVIRG", char)
-            else:
-                raise ValueError("Caractere inválido")
-            
-            self.position += 1
-        else:
-            self.next = Token("EOF", None)
+        return built[index]
 
+    def statements(self):
+        first = self.first_child[0]
+        return range(first, first + self.child_count[0])
 
-class Parser:
-    def __init__(self, tokenizer: Tokenizer):
-        self.tokenizer = tokenizer
+    # O programa é lido um comando por vez, então só o comando atual existe como árvore de nós
+    def Evaluate(self, symbol_table):
+        for index in self.statements():
+            self.node(index).Evaluate(symbol_table)
+
+        return (None, None)
+
+    def Generate(self, symbol_table, code):
+        for index in self.statements():
+            self.node(index).Generate(symbol_table, code)
+
+
+# Verificação estática de tipos, feita uma vez depois do parseBlock. Como toda variável tem tipo
+# declarado, quase todas as regras de BinOp, UnOp, QUANDO, ENQUANTO e RECEBE podem ser decididas
+# antes da execução. Cada expressão recebe seu tipo em result_type; None significa tipo dinâmico
+# (PERGUNTAR(), variáveis nunca declaradas ou declaradas com tipos diferentes), e só essas
+# expressões continuam verificadas em tempo de execução.
+class TypeChecker:
+    ARITHMETIC = {"MAIS", "MENOS", "VEZES", "DIVIDIDO"}
+    LOGIC = {"E", "OU"}
+    COMPARISON = {"IGUAL", "MAIOR", "MENOR"}
+
+    def __init__(self):
+        self.declared = {}
+        self.errors = []
+
+    def declare(self, name, var_type):
+        if self.declared.get(name, var_type) != var_type:
+            var_type = None
+
+        self.declared[name] = var_type
+
+    def collect(self, root):
+        # Os tipos declarados valem para o programa inteiro, mesmo antes do GUARDAR correspondente
+        if isinstance(root, FlatAST):
+            var_dec = NODE_OPCODES[VarDeC]
+
+            for index, opcode in enumerate(root.opcodes):
+                if opcode == var_dec:
+                    self.declare(root.operands[root.first_child[index]], root.operands[index])
+        else:
+            pending = [root]
+
+            while pending:
+                node = pending.pop()
+
+                if type(node) is VarDeC:
+                    self.declare(node.children[0].value, node.children[1])
+
+                pending.extend(child for child in node.children if isinstance(child, Node))
+
+    def check(self, root):
+        self.collect(root)
+
+        if isinstance(root, FlatAST):
+            for index in root.statements():
+                self.statement(root.node(index))
+        else:
+            self.statement(root)
+
+        self.report()
+        return root
+
+    def report(self):
+        if self.errors:
+            raise TypeError("\n".join(self.errors))
+
+    def statement(self, node):
+        node_type = type(node)
+
+        if node_type is Assignment:
+            name = node.children[0].value
+            expected = self.declared.get(name)
+            actual = self.expression(node.children[1])
+            node.children[0].result_type = expected
+
+            if expected is not None and actual is not None and expected != actual:
+                self.errors.append(f"Type mismatch in assignment to '{name}'. Expected '{expected}', got '{actual}'.")
+        elif node_type is VarDeC:
+            node.children[0].result_type = self.declared.get(node.children[0].value)
+
+            if len(node.children) == 3:
+                actual = self.expression(node.children[2])
+
+                if actual is not None and actual != node.children[1]:
+                    self.errors.append(f"Tipo de variável '{node.children[0].value}' não corresponde ao tipo da expressão.")
+        elif node_type is If or node_type is While:
+            condition = self.expression(node.children[0])
+
+            if condition is not None and condition != "BOOLEANO":
+                keyword = "QUANDO" if node_type is If else "ENQUANTO"
+                self.errors.append(f"Condição do '{keyword}' deve ser do tipo 'BOOLEANO', mas recebeu '{condition}'")
+
+            for child in node.children[1:]:
+                self.statement(child)
+        elif node_type is Block:
+            for child in node.children:
+                self.statement(child)
+        elif node_type is Print or node_type is Falar:
+            self.expression(node.children[0])
+
+    def expression(self, root):
+        # Pós-ordem com pilha explícita, já que o parser aceita expressões muito profundas
+        pending = [(root, False)]
+
+        while pending:
+            node, ready = pending.pop()
+            node_type = type(node)
+
+            if node_type is BinOp or node_type is UnOp:
+                if not ready:
+                    pending.append((node, True))
+                    pending.extend((child, False) for child in reversed(node.children))
+                    continue
+
+                node.result_type = self.operation(node)
+            elif node_type is Identifier:
+                node.result_type = self.declared.get(node.value)
+            elif node_type is Read:
+                node.result_type = None
+            else:
+                node.result_type = node.Evaluate(None)[1]
+
+        return root.result_type
+
+    def operation(self, node):
+        operator_name = node.value
+        types = [child.result_type for child in node.children]
+        known = None not in types
+
+        if type(node) is UnOp:
+            if operator_name == "NAO":
+                if known and types[0] != "BOOLEANO":
+                    self.errors.append(f"Operador unário '!' requer tipo 'bool', mas recebeu '{types[0]}'")
+
+                return "BOOLEANO"
+
+            if known and types[0] != "NUMERO":
+                self.errors.append(f"Operador unário '{operator_name}' requer tipo 'i32', mas recebeu '{types[0]}'")
+
+            return "NUMERO"
+
+        left, right = types
+
+        if operator_name in self.ARITHMETIC:
+            if known and (left != "NUMERO" or right != "NUMERO"):
+                self.errors.append(f"Operação aritmética requer operandos 'i32', mas recebeu '{left}' e '{right}'")
+
+            return "NUMERO"
+        elif operator_name in self.LOGIC:
+            if known and (left != "BOOLEANO" or right != "BOOLEANO"):
+                self.errors.append(f"Operação lógica requer operandos 'bool', mas recebeu '{left}' e '{right}'")
+
+            return "BOOLEANO"
+        elif operator_name in self.COMPARISON:
+            if known and left != right:
+                self.errors.append(f"Comparação requer operandos do mesmo tipo, mas recebeu '{left}' e '{right}'")
+
+            return "BOOLEANO"
+
+        return "TEXTO"
+
+
+# Otimização -O1, feita entre o parseBlock e a execução ou geração de código: subexpressões só com
+# literais viram um único literal (inclusive CONCATENA) e QUANDO/ENQUANTO com condição constante
+# perdem o ramo que nunca executa. Blocos aninhados são achatados e os NoOp descartados.
+class ConstantFolder:
+    I32_MIN = -2 ** 31
+    I32_MAX = 2 ** 31 - 1
+
+    def __init__(self):
+        self.removed = 0
+
+    @staticmethod
+    def count(root):
+        total = 0
+        pending = [root]
+
+        while pending:
+            node = pending.pop()
+            total += 1
+            pending.extend(child for child in node.children if isinstance(child, Node))
+
+        return total
+
+    @staticmethod
+    def isConstant(node):
+        # VERDADEIRO vale 0 no Evaluate e 1 no Generate; enquanto os dois divergirem, não é dobrado
+        node_type = type(node)
+        return node_type is IntVal or node_type is StrVal or (node_type is BoolVal and node.value != "VERDADEIRO")
+
+    def fold(self, root):
+        if isinstance(root, FlatAST):
+            return FlatAST(self.fold(root.node(0)))
+
+        before = self.count(root)
+        replaced = {}
+        pending = [(root, False)]
+
+        # Pós-ordem com pilha explícita: os filhos já estão simplificados quando o pai é visitado
+        while pending:
+            node, ready = pending.pop()
+
+            if not ready:
+                pending.append((node, True))
+                pending.extend((child, False) for child in node.children if isinstance(child, Node))
+                continue
+
+            if node.children:
+                node.children = [replaced.pop(id(child), child) if isinstance(child, Node) else child for child in node.children]
+
+            simplified = self.simplify(node)
+
+            if simplified is not node:
+                replaced[id(node)] = simplified
+
+        root = replaced.pop(id(root), root)
+        self.removed += before - self.count(root)
+        return root
+
+    def simplify(self, node):
+        node_type = type(node)
+
+        if node_type is BinOp or node_type is UnOp:
+            return self.constant(node)
+        elif node_type is If:
+            condition = node.children[0]
+
+            if type(condition) is not BoolVal or not self.isConstant(condition):
+                return node
+
+            if condition.Evaluate(None)[0]:
+                return node.children[1]
+
+            return node.children[2] if len(node.children) > 2 else NoOp().locate(node)
+        elif node_type is While:
+            condition = node.children[0]
+
+            if type(condition) is BoolVal and self.isConstant(condition) and not condition.Evaluate(None)[0]:
+                return NoOp().locate(node)
+        elif node_type is Block:
+            statements = []
+
+            for statement in node.children:
+                if type(statement) is Block:
+                    statements.extend(statement.children)
+                elif type(statement) is not NoOp:
+                    statements.append(statement)
+
+            node.children = statements
+
+        return node
+
+    def constant(self, node):
+        if not all(self.isConstant(child) for child in node.children):
+            return node
+
+        # Erros (tipos incompatíveis, divisão por zero) continuam acontecendo em tempo de execução
+        try:
+            value, value_type = node.Evaluate(None)
+        except (TypeError, ValueError, ZeroDivisionError):
+            return node
+
+        if value_type == "NUMERO":
+            # O Generate opera em i32 com overflow e o sdiv arredonda para zero, não para baixo
+            if not self.I32_MIN <= value <= self.I32_MAX:
+                return node
+
+            if node.value == "DIVIDIDO":
+                left, right = (child.value for child in node.children)
+
+                if left % right and (left < 0) != (right < 0):
+                    return node
+
+            return IntVal(value).locate(node)
+        elif value_type == "TEXTO":
+            return StrVal(value).locate(node)
+
+        return BoolVal("true" if value else "false").locate(node)
+
+
+# Otimização -O2 dos laços ENQUANTO, feita depois da ConstantFolder. Subexpressões que não dependem
+# de nenhuma variável atribuída no laço são calculadas uma vez antes dele, em variáveis temporárias
+# declaradas no início do programa (nomes começando com "_", que o tokenizer nunca produz). Depois,
+# produtos I VEZES K de uma variável de indução (I RECEBE I MAIS c) por um invariante K viram uma
+# soma acumulada, atualizada logo após o incremento.
+# Só é movido o que não pode falhar nem ter efeito colateral: sem PERGUNTAR(), com tipos estáticos
+# compatíveis, sem DIVIDIDO por algo que não seja uma constante diferente de zero e lendo apenas
+# variáveis certamente atribuídas antes do laço. Assim, calcular a expressão antes do laço (mesmo
+# que ele não execute nenhuma vez) não muda a saída nem os erros do programa.
+class LoopOptimizer:
+    def __init__(self):
+        self.checker = TypeChecker()
+        self.declarations = []
+        self.hoisted = 0
+        self.reduced = 0
+
+    def optimize(self, root):
+        if isinstance(root, FlatAST):
+            return FlatAST(self.optimize(root.node(0)))
+
+        self.checker.collect(root)
+        self.block(root, set())
+        root.children[0:0] = self.declarations
+        return root
+
+    def temporary(self, var_type):
+        # Inicializada já na declaração, para que o Generate aceite o RECEBE antes do laço
+        name = f"_t{len(self.declarations)}"
+        initial = {"NUMERO": IntVal(0), "BOOLEANO": BoolVal("FALSO"), "TEXTO": StrVal("")}[var_type]
+        self.declarations.append(VarDeC(Identifier(name), var_type, initial))
+        self.checker.declared[name] = var_type
+        return name
+
+    def identifier(self, name):
+        node = Identifier(name)
+        node.result_type = self.checker.declared[name]
+        return node
+
+    def block(self, block, assigned):
+        # Percorre os comandos em ordem, acumulando as variáveis certamente atribuídas até cada ponto
+        statements = []
+
+        for statement in block.children:
+            statements.extend(self.statement(statement, assigned))
+
+        block.children = statements
+        return assigned
+
+    def statement(self, node, assigned):
+        node_type = type(node)
+
+        if node_type is Assignment or (node_type is VarDeC and len(node.children) == 3):
+            assigned.add(node.children[0].value)
+        elif node_type is If:
+            then_assigned = self.block(node.children[1], set(assigned))
+
+            if len(node.children) > 2:
+                assigned |= then_assigned & self.block(node.children[2], set(assigned))
+        elif node_type is While:
+            counts = self.assignments(node)
+            available = {name for name in assigned if name not in counts}
+            before = self.hoist(node, available)
+            assigned.update(statement.children[0].value for statement in before)
+            available.update(statement.children[0].value for statement in before)
+            before += self.reduce(node, assigned, available, counts)
+            assigned.update(statement.children[0].value for statement in before)
+
+            # O que sai do laço fica na linha do ENQUANTO
+            for statement in before:
+                statement.locate(node)
+
+            # O corpo pode não executar, então o que ele atribui não conta depois do laço
+            self.block(node.children[1], set(assigned))
+            return before + [node]
+
+        return [node]
+
+    @staticmethod
+    def assignments(loop):
+        counts = {}
+        pending = [loop]
+
+        while pending:
+            node = pending.pop()
+            node_type = type(node)
+
+            if node_type is Assignment or node_type is VarDeC:
+                name = node.children[0].value
+                counts[name] = counts.get(name, 0) + 1
+            elif node_type is Block or node_type is If or node_type is While:
+                pending.extend(node.children)
+
+        return counts
+
+    @staticmethod
+    def expressions(loop):
+        # (nó dono, índice da expressão em children, se está dentro de um laço interno)
+        pending = [(loop, False)]
+
+        while pending:
+            node, nested = pending.pop()
+            node_type = type(node)
+
+            if node_type is Block:
+                pending.extend((child, nested) for child in reversed(node.children))
+            elif node_type is If or node_type is While:
+                inner = nested or (node_type is While and node is not loop)
+                yield node, 0, inner
+                pending.extend((child, inner) for child in reversed(node.children[1:]))
+            elif node_type is Assignment:
+                yield node, 1, nested
+            elif node_type is VarDeC:
+                if len(node.children) == 3:
+                    yield node, 2, nested
+            elif node_type is Print or node_type is Falar:
+                yield node, 0, nested
+
+    def hoist(self, loop, available):
+        statements = []
+
+        for parent, index, _ in self.expressions(loop):
+            self.checker.expression(parent.children[index])
+            invariant = self.invariants(parent.children[index], available)
+            pending = [(parent, index)]
+
+            # De cima para baixo, para mover só as maiores subexpressões invariantes
+            while pending:
+                owner, position = pending.pop()
+                node = owner.children[position]
+
+                if node.children and id(node) in invariant:
+                    name = self.temporary(node.result_type)
+                    statements.append(Assignment(self.identifier(name), node))
+                    owner.children[position] = self.identifier(name)
+                    self.hoisted += 1
+                else:
+                    pending.extend((node, child) for child in range(len(node.children)))
+
+        return statements
+
+    def invariants(self, expression, available):
+        invariant = set()
+        pending = [(expression, False)]
+
+        while pending:
+            node, ready = pending.pop()
+            node_type = type(node)
+
+            if node_type is BinOp or node_type is UnOp:
+                if not ready:
+                    pending.append((node, True))
+                    pending.extend((child, False) for child in node.children)
+                    continue
+
+                if all(id(child) in invariant for child in node.children) and self.safe(node):
+                    invariant.add(id(node))
+            elif node_type is Identifier:
+                if node.value in available and node.result_type is not None:
+                    invariant.add(id(node))
+            elif node_type is not Read:
+                invariant.add(id(node))
+
+        return invariant
+
+    @staticmethod
+    def safe(node):
+        types = [child.result_type for child in node.children]
+
+        if type(node) is UnOp:
+            return types[0] == ("BOOLEANO" if node.value == "NAO" else "NUMERO")
+
+        left, right = types
+
+        if node.value in TypeChecker.ARITHMETIC:
+            if left != "NUMERO" or right != "NUMERO":
+                return False
+
+            divisor = node.children[1]
+            return node.value != "DIVIDIDO" or (type(divisor) is IntVal and divisor.value != 0)
+        elif node.value in TypeChecker.LOGIC:
+            return left == "BOOLEANO" and right == "BOOLEANO"
+        elif node.value in TypeChecker.COMPARISON:
+            return left is not None and left == right
+
+        return left is not None and right is not None
+
+    @staticmethod
+    def induction(statement):
+        # Passo c de I RECEBE I MAIS c, I RECEBE c MAIS I ou I RECEBE I MENOS c
+        if type(statement) is not Assignment or type(statement.children[1]) is not BinOp:
+            return None
+
+        name = statement.children[0].value
+        expression = statement.children[1]
+        left, right = expression.children
+
+        if expression.value == "MAIS":
+            if type(right) is Identifier and type(left) is IntVal:
+                left, right = right, left
+
+            if type(left) is Identifier and left.value == name and type(right) is IntVal:
+                return right.value
+        elif expression.value == "MENOS":
+            if type(left) is Identifier and left.value == name and type(right) is IntVal:
+                return -right.value
+
+        return None
+
+    def reduce(self, loop, assigned, available, counts):
+        body = loop.children[1]
+        steps = {}
+
+        for position, statement in enumerate(body.children):
+            step = self.induction(statement)
+            name = statement.children[0].value if step is not None else None
+
+            if step is not None and counts[name] == 1 and name in assigned and self.checker.declared.get(name) == "NUMERO":
+                steps[name] = (position, step)
+
+        if not steps:
+            return []
+
+        # Produtos agrupados por (variável de indução, fator); cada um guarda onde aparece
+        products = {}
+
+        for parent, index, nested in self.expressions(loop):
+            pending = [(parent, index)]
+
+            while pending:
+                owner, position = pending.pop()
+                node = owner.children[position]
+
+                if type(node) is BinOp and node.value == "VEZES":
+                    left, right = node.children
+
+                    if type(right) is Identifier and right.value in steps:
+                        left, right = right, left
+
+                    if type(left) is Identifier and left.value in steps:
+                        if type(right) is IntVal:
+                            factor = (left.value, "constante", right.value)
+                        elif type(right) is Identifier and right.value in available and right.result_type == "NUMERO":
+                            factor = (left.value, "variavel", right.value)
+                        else:
+                            factor = None
+
+                        if factor is not None:
+                            uses = products.setdefault(factor, [])
+                            uses.append((owner, position, nested))
+                            continue
+
+                pending.extend((node, child) for child in range(len(node.children)))
+
+        before = []
+        updates = {}
+
+        for (name, kind, factor), uses in products.items():
+            # Trocar uma multiplicação por uma soma a cada iteração só compensa se o produto é
+            # usado mais de uma vez por incremento
+            if len(uses) < 2 and not any(nested for _, _, nested in uses):
+                continue
+
+            position, step = steps[name]
+            total = self.temporary("NUMERO")
+
+            if kind == "constante":
+                initial = BinOp("VEZES", self.identifier(name), IntVal(factor))
+                increment = IntVal(step * factor)
+            else:
+                initial = BinOp("VEZES", self.identifier(name), self.identifier(factor))
+
+                if step == 1:
+                    increment = self.identifier(factor)
+                else:
+                    scaled = self.temporary("NUMERO")
+                    before.append(Assignment(self.identifier(scaled), BinOp("VEZES", self.identifier(factor), IntVal(step))))
+                    increment = self.identifier(scaled)
+
+            before.append(Assignment(self.identifier(total), initial))
+            update = Assignment(self.identifier(total), BinOp("MAIS", self.identifier(total), increment))
+            updates.setdefault(position, []).append(update.locate(body.children[position]))
+
+            for owner, index, _ in uses:
+                owner.children[index] = self.identifier(total)
+
+            self.reduced += 1
+
+        if updates:
+            statements = []
+
+            for position, statement in enumerate(body.children):
+                statements.append(statement)
+                statements.extend(updates.get(position, ()))
+
+            body.children = statements
+
+        return before
+
+
+# Instruções da VM usada por Parser.run: uma lista plana de tuplas (opcode, a, b), com saltos para o
+# índice absoluto da instrução de destino. As expressões de cada instrução são pré-compiladas em
+# funções especializadas pelo operador e pela forma dos operandos, então nada é decidido de novo
+# a cada execução.
+(OP_STORE, OP_LOOP, OP_BRANCH, OP_QUANDO, OP_ENQUANTO, OP_JUMP, OP_PRINT, OP_DECLARE, OP_INIT, OP_SPEAK) = range(10)
+
+# Na VM os valores não carregam o tipo junto: BOOLEANO é bool, NUMERO é int e TEXTO é str
+VALUE_TYPES = {bool: "BOOLEANO", int: "NUMERO", str: "TEXTO"}
+PYTHON_TYPES = {"BOOLEANO": bool, "NUMERO": int, "TEXTO": str}
+
+
+def divide(left, right):
+    if right == 0:
+        raise ZeroDivisionError("Erro: divisão por zero.")
+
+    return left // right
+
+
+def concatenate(left, right):
+    return VM.text(left) + VM.text(right)
+
+
+# Operador -> (grupo de verificação de tipos, função que calcula o resultado); None dispensa verificação
+VM_OPERATORS = {
+    "MAIS": ("aritmetica", operator.add), "MENOS": ("aritmetica", operator.sub),
+    "VEZES": ("aritmetica", operator.mul), "DIVIDIDO": ("aritmetica", divide),
+    "E": ("logica", operator.and_), "OU": ("logica", operator.or_),
+    "IGUAL": ("comparacao", operator.eq), "MAIOR": ("comparacao", operator.gt), "MENOR": ("comparacao", operator.lt),
+    "CONCATENA": (None, concatenate),
+}
+
+
+def arithmeticError(left, right):
+    return TypeError(f"Operação aritmética requer operandos 'i32', mas recebeu '{VALUE_TYPES[type(left)]}' e '{VALUE_TYPES[type(right)]}'")
+
+
+def logicError(left, right):
+    return TypeError(f"Operação lógica requer operandos 'bool', mas recebeu '{VALUE_TYPES[type(left)]}' e '{VALUE_TYPES[type(right)]}'")
+
+
+def comparisonError(left, right):
+    return TypeError(f"Comparação requer operandos do mesmo tipo, mas recebeu '{VALUE_TYPES[type(left)]}' e '{VALUE_TYPES[type(right)]}'")
+
+
+# Resolução de nomes em tempo de compilação: cada variável recebe um índice fixo (slot) e todo
+# Identifier, inclusive os de GUARDAR e RECEBE, passa a apontar para ele. A tabela de símbolos é
+# global, então um mesmo nome sempre usa o mesmo slot; nomes nunca declarados também recebem um,
+# que simplesmente nunca é declarado em tempo de execução.
+class SlotResolver:
+    def __init__(self):
+        self.slots = {}
+        self.names = []
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+
+        return slot
+
+    def resolve(self, root: Node):
+        pending = [root]
+
+        while pending:
+            node = pending.pop()
+
+            if type(node) is Identifier:
+                node.slot = self.slot(node.value)
+            else:
+                pending.extend(child for child in node.children if isinstance(child, Node))
+
+        return root
+
+
+# Expressões cujos operandos têm tipo estático conhecido usam versões sem verificação de tipo;
+# as demais (tipo dinâmico) mantêm as verificações feitas pelo Evaluate.
+class BytecodeCompiler:
+    CLOSURE_DEPTH = 64
+
+    def __init__(self, vm):
+        self.vm = vm
+        self.resolver = SlotResolver()
+        self.checker = TypeChecker()
+        self.instructions = []
+
+    def compile(self, root):
+        # Todos os erros de tipo são reportados antes de qualquer instrução executar
+        self.checker.collect(root)
+
+        if isinstance(root, FlatAST):
+            statements = (root.node(index) for index in root.statements())
+        else:
+            statements = root.children
+
+        for statement in statements:
+            self.resolver.resolve(statement)
+            self.checker.statement(statement)
+            self.statement(statement)
+
+        self.checker.report()
+        self.vm.allocate(self.resolver.names)
+        return self.instructions
+
+    def statement(self, node):
+        emit = self.instructions.append
+        node_type = type(node)
+
+        if node_type is Assignment:
+            target_type = self.checker.declared.get(node.children[0].value)
+            emit((OP_STORE, node.children[0].slot, self.target(node.children[1], target_type)))
+        elif node_type is Print:
+            emit((OP_PRINT, self.expression(node.children[0]), None))
+        elif node_type is VarDeC:
+            slot, var_type = node.children[0].slot, PYTHON_TYPES[node.children[1]]
+            emit((OP_DECLARE, slot, var_type))
+
+            if len(node.children) == 3:
+                emit((OP_INIT, (slot, var_type), self.target(node.children[2], node.children[1])))
+        elif node_type is If:
+            condition = self.expression(node.children[0])
+            branch = len(self.instructions)
+            emit(None)
+            self.statement(node.children[1])
+
+            if len(node.children) > 2:
+                jump = len(self.instructions)
+                emit(None)
+                self.instructions[branch] = (self.branch(node, OP_QUANDO), condition, len(self.instructions))
+                self.statement(node.children[2])
+                self.instructions[jump] = (OP_JUMP, len(self.instructions), None)
+            else:
+                self.instructions[branch] = (self.branch(node, OP_QUANDO), condition, len(self.instructions))
+        elif node_type is While:
+            # O tipo da condição só é verificado na primeira avaliação, como em While.Evaluate
+            condition = self.expression(node.children[0])
+            branch = len(self.instructions)
+            emit(None)
+            body = len(self.instructions)
+            self.statement(node.children[1])
+            emit((OP_LOOP, condition, body))
+            self.instructions[branch] = (self.branch(node, OP_ENQUANTO), condition, len(self.instructions))
+        elif node_type is Block:
+            for statement in node.children:
+                self.statement(statement)
+        elif node_type is Falar:
+            emit((OP_SPEAK, node, self.expression(node.children[0])))
+        elif node_type is NoOp:
+            pass
+        else:
+            raise ValueError(f"Comando desconhecido: {node_type.__name__}")
+
+    @staticmethod
+    def branch(node, checked_opcode):
+        return OP_BRANCH if node.children[0].result_type == "BOOLEANO" else checked_opcode
+
+    def target(self, node, target_type):
+        if type(node) is Read:
+            return lambda: node.read(target_type)[0]
+
+        return self.expression(node)
+
+    def load(self, slot):
+        values = self.vm.values
+        missing = self.vm.missing
+
+        def load():
+            value = values[slot]
+
+            if value is None:
+                raise missing(slot)
+
+            return value
+
+        return load
+
+    @staticmethod
+    def depth(node):
+        deepest = 0
+        pending = [(node, 1)]
+
+        while pending:
+            current, level = pending.pop()
+            deepest = max(deepest, level)
+
+            if type(current) is BinOp or type(current) is UnOp:
+                pending.extend((child, level + 1) for child in current.children)
+
+        return deepest
+
+    def expression(self, node):
+        # Cada nível de closure aninhada custa um quadro da pilha do Python ao executar; expressões
+        # mais fundas que CLOSURE_DEPTH viram uma lista pós-fixa avaliada com uma pilha de valores
+        if self.depth(node) > self.CLOSURE_DEPTH:
+            return self.postfix(node)
+
+        # Pós-ordem com pilha explícita: na segunda visita de um operador, os closures dos
+        # operandos já estão no topo de built, o da esquerda abaixo do da direita
+        built = []
+        pending = [(node, False)]
+
+        while pending:
+            current, visited = pending.pop()
+            node_type = type(current)
+
+            if node_type is not BinOp and node_type is not UnOp:
+                built.append(self.leaf(current))
+            elif not visited:
+                pending.append((current, True))
+                pending.extend((child, False) for child in reversed(current.children))
+            elif node_type is BinOp:
+                right = built.pop()
+                built[-1] = self.binary(current, built[-1], right)
+            else:
+                built[-1] = self.unary(current, built[-1])
+
+        return built[0]
+
+    def leaf(self, node):
+        node_type = type(node)
+
+        if node_type is Identifier:
+            return self.load(node.slot)
+        elif node_type is Read:
+            return lambda: node.Evaluate(None)[0]
+
+        value, value_type = node.Evaluate(None)
+        constant = bool(value) if value_type == "BOOLEANO" else value
+        return lambda: constant
+
+    def postfix(self, node):
+        # (função, aridade): folhas empilham um valor, operadores trocam os operandos do topo pelo
+        # resultado; as verificações de tipo são as mesmas dos closures, pelas funções checked*
+        code = []
+        pending = [(node, False)]
+
+        while pending:
+            current, visited = pending.pop()
+            node_type = type(current)
+
+            if node_type is not BinOp and node_type is not UnOp:
+                code.append((self.leaf(current), 0))
+            elif not visited:
+                pending.append((current, True))
+                pending.extend((child, False) for child in reversed(current.children))
+            elif node_type is BinOp:
+                group, apply = VM_OPERATORS[current.value]
+
+                if group is not None and (current.children[0].result_type is None or current.children[1].result_type is None):
+                    apply = partial(VM_CHECKS[group], apply)
+
+                code.append((apply, 2))
+            elif current.value == "NAO":
+                code.append((operator.not_ if current.children[0].result_type is not None else checkedNot, 1))
+            elif current.children[0].result_type is None:
+                code.append((partial(checkedSign, current.value), 1))
+            elif current.value == "MENOS":
+                code.append((operator.neg, 1))
+
+        def evaluate():
+            stack = []
+            push = stack.append
+            pop = stack.pop
+
+            for function, arity in code:
+                if arity == 0:
+                    push(function())
+                elif arity == 1:
+                    stack[-1] = function(stack[-1])
+                else:
+                    right = pop()
+                    stack[-1] = function(stack[-1], right)
+
+            return stack[0]
+
+        return evaluate
+
+    def binary(self, node, left, right):
+        group, apply = VM_OPERATORS[node.value]
+        left_node, right_node = node.children
+
+        if left_node.result_type is not None and right_node.result_type is not None:
+            # Tipos já garantidos pelo TypeChecker
+            group = None
+
+        if type(left_node) is Identifier and type(right_node) in (IntVal, BoolVal, StrVal):
+            # Forma mais comum em laços (I MAIS 1, I MENOR 10): lê a variável e usa a constante direto
+            return self.variableConstant(group, apply, left_node.slot, right())
+
+        if group == "aritmetica":
+            def binary():
+                left_value = left()
+                right_value = right()
+
+                if type(left_value) is not int or type(right_value) is not int:
+                    raise arithmeticError(left_value, right_value)
+
+                return apply(left_value, right_value)
+        elif group == "comparacao":
+            def binary():
+                left_value = left()
+                right_value = right()
+
+                if type(left_value) is not type(right_value):
+                    raise comparisonError(left_value, right_value)
+
+                return apply(left_value, right_value)
+        elif group == "logica":
+            def binary():
+                left_value = left()
+                right_value = right()
+
+                if type(left_value) is not bool or type(right_value) is not bool:
+                    raise logicError(left_value, right_value)
+
+                return apply(left_value, right_value)
+        else:
+            def binary():
+                return apply(left(), right())
+
+        return binary
+
+    def variableConstant(self, group, apply, slot, constant):
+        values = self.vm.values
+        missing = self.vm.missing
+        constant_type = type(constant)
+
+        if group == "aritmetica":
+            def binary():
+                value = values[slot]
+
+                if value is None:
+                    raise missing(slot)
+
+                if type(value) is not int or constant_type is not int:
+                    raise arithmeticError(value, constant)
+
+                return apply(value, constant)
+        elif group == "comparacao":
+            def binary():
+                value = values[slot]
+
+                if value is None:
+                    raise missing(slot)
+
+                if type(value) is not constant_type:
+                    raise comparisonError(value, constant)
+
+                return apply(value, constant)
+        elif group == "logica":
+            def binary():
+                value = values[slot]
+
+                if value is None:
+                    raise missing(slot)
+
+                if type(value) is not bool or constant_type is not bool:
+                    raise logicError(value, constant)
+
+                return apply(value, constant)
+        else:
+            def binary():
+                value = values[slot]
+
+                if value is None:
+                    raise missing(slot)
+
+                return apply(value, constant)
+
+        return binary
+
+    def unary(self, node, operand):
+        operator_name = node.value
+
+        if node.children[0].result_type is not None:
+            if operator_name == "NAO":
+                return lambda: not operand()
+            elif operator_name == "MENOS":
+                return lambda: -operand()
+
+            return operand
+
+        if operator_name == "NAO":
+            def unary():
+                value = operand()
+
+                if type(value) is not bool:
+                    raise TypeError(f"Operador unário '!' requer tipo 'bool', mas recebeu '{VALUE_TYPES[type(value)]}'")
+
+                return not value
+        else:
+            negate = operator_name == "MENOS"
+
+            def unary():
+                value = operand()
+
+                if type(value) is not int:
+                    raise TypeError(f"Operador unário '{operator_name}' requer tipo 'i32', mas recebeu '{VALUE_TYPES[type(value)]}'")
+
+                return -value if negate else value
+
+        return unary
+
+
+# Variáveis ficam em listas indexadas pelo slot resolvido na compilação. Em values, None marca
+# tanto "não declarada" quanto "declarada sem valor"; types (None enquanto não declarada) desfaz a dúvida.
+class VM:
+    def __init__(self):
+        self.names = []
+        self.values = []
+        self.types = []
+
+    def allocate(self, names):
+        self.names = names
+        missing = len(names) - len(self.values)
+        self.values.extend([None] * missing)
+        self.types.extend([None] * missing)
+
+    @staticmethod
+    def text(value):
+        if type(value) is bool:
+            return "true" if value else "false"
+
+        return str(value)
+
+    def missing(self, slot):
+        if self.types[slot] is not None:
+            return Exception(f"Variable '{self.names[slot]}' used before assignment.")
+
+        return Exception(f"Variable '{self.names[slot]}' not declared.")
+
+    def run(self, code):
+        values = self.values
+        types = self.types
+        names = self.names
+        output = Output.shared()
+        pc = 0
+        end = len(code)
+
+        while pc < end:
+            op, a, b = code[pc]
+            pc += 1
+
+            if op == OP_STORE:
+                value = b()
+                expected = types[a]
+
+                if type(value) is not expected:
+                    if expected is None:
+                        raise Exception(f"Variable '{names[a]}' not declared.")
+
+                    raise TypeError(f"Type mismatch in assignment to '{names[a]}'. Expected '{VALUE_TYPES[expected]}', got '{VALUE_TYPES[type(value)]}'.")
+
+                values[a] = value
+            elif op == OP_LOOP:
+                if a():
+                    pc = b
+            elif op == OP_BRANCH:
+                if not a():
+                    pc = b
+            elif op == OP_QUANDO or op == OP_ENQUANTO:
+                value = a()
+
+                if type(value) is not bool:
+                    keyword = "QUANDO" if op == OP_QUANDO else "ENQUANTO"
+                    raise TypeError(f"Condição do '{keyword}' deve ser do tipo 'BOOLEANO', mas recebeu '{VALUE_TYPES[type(value)]}'")
+
+                if not value:
+                    pc = b
+            elif op == OP_PRINT:
+                value = a()
+
+                if type(value) is bool:
+                    output.write("true" if value else "false")
+                else:
+                    output.write(str(value))
+            elif op == OP_JUMP:
+                pc = a
+            elif op == OP_DECLARE:
+                if types[a] is not None:
+                    raise Exception(f"Variable '{names[a]}' already declared.")
+
+                types[a] = b
+            elif op == OP_INIT:
+                slot, expected = a
+                value = b()
+
+                if type(value) is not expected:
+                    raise TypeError(f"Tipo de variável '{names[slot]}' não corresponde ao tipo da expressão.")
+
+                values[slot] = value
+            elif op == OP_SPEAK:
+                value = b()
+                a.speak(int(value) if type(value) is bool else value)
+            else:
+                raise ValueError(f"Instrução desconhecida: {op}")
+
+
+# Verificações de tipo usadas pelo código Python gerado quando o tipo de um operando só é conhecido
+# na execução; as mensagens são as mesmas do Evaluate e da VM.
+def checkedArithmetic(apply, left, right):
+    if type(left) is not int or type(right) is not int:
+        raise arithmeticError(left, right)
+
+    return apply(left, right)
+
+
+def checkedLogic(apply, left, right):
+    if type(left) is not bool or type(right) is not bool:
+        raise logicError(left, right)
+
+    return apply(left, right)
+
+
+def checkedComparison(apply, left, right):
+    if type(left) is not type(right):
+        raise comparisonError(left, right)
+
+    return apply(left, right)
+
+
+def checkedCondition(value, keyword):
+    if type(value) is not bool:
+        raise TypeError(f"Condição do '{keyword}' deve ser do tipo 'BOOLEANO', mas recebeu '{VALUE_TYPES[type(value)]}'")
+
+    return value
+
+
+def checkedNot(value):
+    if type(value) is not bool:
+        raise TypeError(f"Operador unário '!' requer tipo 'bool', mas recebeu '{VALUE_TYPES[type(value)]}'")
+
+    return not value
+
+
+def checkedSign(operator_name, value):
+    if type(value) is not int:
+        raise TypeError(f"Operador unário '{operator_name}' requer tipo 'i32', mas recebeu '{VALUE_TYPES[type(value)]}'")
+
+    return -value if operator_name == "MENOS" else value
+
+
+# Grupo de verificação do VM_OPERATORS -> função que confere os operandos antes de aplicar o operador
+VM_CHECKS = {"aritmetica": checkedArithmetic, "logica": checkedLogic, "comparacao": checkedComparison}
+
+
+# Chamada no lugar do valor de uma variável sem valor, então lança em vez de retornar o erro
+def missingVariable(name, declared):
+    if declared is not None:
+        raise Exception(f"Variable '{name}' used before assignment.")
+
+    raise Exception(f"Variable '{name}' not declared.")
+
+
+def storeError(name, expected, value):
+    if expected is None:
+        return Exception(f"Variable '{name}' not declared.")
+
+    return TypeError(f"Type mismatch in assignment to '{name}'. Expected '{VALUE_TYPES[expected]}', got '{VALUE_TYPES[type(value)]}'.")
+
+
+def speakValue(value):
+    Falar.speak(int(value) if type(value) is bool else value)
+
+
+# Backend que traduz a árvore para uma função Python e deixa o compile() do Python gerar o bytecode.
+# Cada variável vira duas variáveis locais da função: v<slot> com o valor e t<slot> com o tipo
+# declarado (None enquanto não declarada), com a mesma semântica das listas values e types da VM.
+# Como no BytecodeCompiler, operandos com tipo estático conhecido viram operadores Python diretos e
+# os demais passam pelas funções checked*.
+class PythonTranspiler:
+    OPERATORS = {
+        "MAIS": "+", "MENOS": "-", "VEZES": "*", "E": "&", "OU": "|",
+        "IGUAL": "==", "MAIOR": ">", "MENOR": "<",
+    }
+    CHECKS = {"aritmetica": "checkedArithmetic", "logica": "checkedLogic", "comparacao": "checkedComparison"}
+    TEXT = {"NUMERO": "str({})", "TEXTO": "{}", "BOOLEANO": "('true' if {} else 'false')"}
+
+    # Cada nível de expressão vira um par de parênteses, e o parser do Python recusa mais de 200
+    EXPRESSION_DEPTH = 150
+
+    def __init__(self):
+        self.resolver = SlotResolver()
+        self.checker = TypeChecker()
+        self.lines = []
+        self.depth = 1
+
+    def source(self, root):
+        # Todos os erros de tipo são reportados antes de qualquer instrução executar
+        self.checker.collect(root)
+
+        if isinstance(root, FlatAST):
+            statements = (root.node(index) for index in root.statements())
+        else:
+            statements = root.children
+
+        for statement in statements:
+            self.resolver.resolve(statement)
+            self.checker.statement(statement)
+            self.statement(statement)
+
+        self.checker.report()
+
+        slots = range(len(self.resolver.names))
+        header = ["def programa():"]
+
+        if slots:
+            header.append("    " + " = ".join([f"v{slot}" for slot in slots] + [f"t{slot}" for slot in slots]) + " = None")
+
+        return "\n".join(header + (self.lines or ["    pass"])) + "\n"
+
+    @staticmethod
+    def namespace():
+        names = {
+            name: globals()[name] for name in (
+                "checkedArithmetic", "checkedLogic", "checkedComparison", "checkedCondition", "checkedNot",
+                "checkedSign", "missingVariable", "storeError", "speakValue", "divide", "concatenate",
+            )
+        }
+        names.update({f"op_{name}": apply for name, (group, apply) in VM_OPERATORS.items()})
+        names.update({"_write": Output.shared().write, "_read": Read.read, "_text": VM.text})
+        return names
+
+    def run(self, root):
+        try:
+            program = compile(self.source(root), "<lumen>", "exec")
+        except (SyntaxError, RecursionError, MemoryError):
+            # Aninhamento além dos limites do compilador do Python (mais de 20 blocos ou expressões
+            # mais fundas que EXPRESSION_DEPTH, por exemplo): o programa roda na VM, que não usa
+            # recursão para as expressões
+            vm = VM()
+            vm.run(BytecodeCompiler(vm).compile(root))
+            return
+
+        namespace = self.namespace()
+        exec(program, namespace)
+        namespace["programa"]()
+
+    def emit(self, line):
+        self.lines.append("    " * self.depth + line)
+
+    def body(self, node):
+        start = len(self.lines)
+        self.depth += 1
+        self.statement(node)
+        self.depth -= 1
+
+        if len(self.lines) == start:
+            self.emit("    pass")
+
+    def variable(self, node):
+        return repr(node.value), f"v{node.slot}", f"t{node.slot}"
+
+    def store(self, node, expected, check):
+        name, value, declared = self.variable(node.children[0])
+        self.emit(f"_value = {self.target(node.children[-1], expected)}")
+        self.emit(f"if type(_value) is not {declared}:")
+        self.emit(f"    raise {check.format(name=name, declared=declared)}")
+        self.emit(f"{value} = _value")
+
+    def statement(self, node):
+        emit = self.emit
+        node_type = type(node)
+
+        if node_type is Assignment:
+            expected = self.checker.declared.get(node.children[0].value)
+            self.store(node, expected, "storeError({name}, {declared}, _value)")
+        elif node_type is Print:
+            emit(f"_write({self.text(node.children[0])})")
+        elif node_type is VarDeC:
+            name, value, declared = self.variable(node.children[0])
+            emit(f"if {declared} is not None:")
+            emit(f"    raise Exception(\"Variable '{node.children[0].value}' already declared.\")")
+            emit(f"{declared} = {PYTHON_TYPES[node.children[1]].__name__}")
+
+            if len(node.children) == 3:
+                if node.children[2].result_type == node.children[1]:
+                    emit(f"{value} = {self.target(node.children[2], node.children[1])}")
+                else:
+                    message = repr(f"Tipo de variável '{node.children[0].value}' não corresponde ao tipo da expressão.")
+                    self.store(node, node.children[1], f"TypeError({message})")
+        elif node_type is If:
+            emit(f"if {self.condition(node.children[0], 'QUANDO')}:")
+            self.body(node.children[1])
+
+            if len(node.children) > 2:
+                emit("else:")
+                self.body(node.children[2])
+        elif node_type is While:
+            condition = node.children[0]
+
+            if condition.result_type == "BOOLEANO":
+                emit(f"while {self.expression(condition)}:")
+                self.body(node.children[1])
+            else:
+                # O tipo da condição só é verificado na primeira avaliação, como em While.Evaluate
+                emit(f"_loop = {self.condition(condition, 'ENQUANTO')}")
+                emit("while _loop:")
+                self.body(node.children[1])
+                emit(f"    _loop = {self.expression(condition)}")
+        elif node_type is Block:
+            for statement in node.children:
+                self.statement(statement)
+        elif node_type is Falar:
+            emit(f"speakValue({self.expression(node.children[0])})")
+        elif node_type is NoOp:
+            pass
+        else:
+            raise ValueError(f"Comando desconhecido: {node_type.__name__}")
+
+    def condition(self, node, keyword):
+        if node.result_type == "BOOLEANO":
+            return self.expression(node)
+
+        return f"checkedCondition({self.expression(node)}, {keyword!r})"
+
+    def target(self, node, target_type):
+        if type(node) is Read:
+            return f"_read({target_type!r})[0]"
+
+        return self.expression(node)
+
+    def text(self, node, operand=None):
+        template = self.TEXT.get(node.result_type, "_text({})")
+        return template.format(self.expression(node) if operand is None else operand)
+
+    def expression(self, node):
+        if BytecodeCompiler.depth(node) > self.EXPRESSION_DEPTH:
+            raise RecursionError(f"Expressão com mais de {self.EXPRESSION_DEPTH} níveis")
+
+        # Pós-ordem com pilha explícita, como no BytecodeCompiler: na segunda visita de um
+        # operador, o código dos operandos já está no topo de built
+        built = []
+        pending = [(node, False)]
+
+        while pending:
+            current, visited = pending.pop()
+            node_type = type(current)
+
+            if node_type is not BinOp and node_type is not UnOp:
+                built.append(self.leaf(current))
+            elif not visited:
+                pending.append((current, True))
+                pending.extend((child, False) for child in reversed(current.children))
+            elif node_type is BinOp:
+                right = built.pop()
+                built[-1] = self.binary(current, built[-1], right)
+            else:
+                built[-1] = self.unary(current, built[-1])
+
+        return built[0]
+
+    def leaf(self, node):
+        node_type = type(node)
+
+        if node_type is Identifier:
+            name, value, declared = self.variable(node)
+            return f"({value} if {value} is not None else missingVariable({name}, {declared}))"
+        elif node_type is Read:
+            return "_read(None)[0]"
+
+        value, value_type = node.Evaluate(None)
+        return repr(bool(value) if value_type == "BOOLEANO" else value)
+
+    def binary(self, node, left, right):
+        group, apply = VM_OPERATORS[node.value]
+        left_node, right_node = node.children
+
+        if left_node.result_type is None or right_node.result_type is None:
+            if group is None:
+                return f"concatenate({left}, {right})"
+
+            return f"{self.CHECKS[group]}(op_{node.value}, {left}, {right})"
+
+        # Tipos já garantidos pelo TypeChecker
+        if node.value == "CONCATENA":
+            return f"({self.text(left_node, left)} + {self.text(right_node, right)})"
+        elif node.value == "DIVIDIDO":
+            if type(right_node) is IntVal and right_node.Evaluate(None)[0] != 0:
+                return f"({left} // {right})"
+
+            return f"divide({left}, {right})"
+
+        return f"({left} {self.OPERATORS[node.value]} {right})"
+
+    def unary(self, node, operand):
+        if node.children[0].result_type is None:
+            if node.value == "NAO":
+                return f"checkedNot({operand})"
+
+            return f"checkedSign({node.value!r}, {operand})"
+
+        if node.value == "NAO":
+            return f"(not {operand})"
+        elif node.value == "MENOS":
+            return f"(-{operand})"
+
+        return operand
+
+
+# Perfil do interpretador (--profile). Cada comando dos blocos é trocado por um ProfiledStatement
+# que conta execuções e soma o tempo do Evaluate do nó original; o corpo de cada ENQUANTO ganha um
+# ProfiledIterations que conta as voltas. Sem perfil, a árvore não é tocada e nada disso roda.
+class ProfiledStatement(Node):
+    __slots__ = ("node", "count", "time", "iterations", "nested")
+
+    def __init__(self, node):
+        super().__init__(node.value, node.children)
+        self.locate(node)
+        self.node = node
+        self.count = 0
+        self.time = 0.0
+        self.iterations = 0
+        self.nested = []
+
+    def Evaluate(self, symbol_table):
+        start = time.perf_counter()
+
+        try:
+            return self.node.Evaluate(symbol_table)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+
+    def Generate(self, symbol_table, code):
+        self.node.Generate(symbol_table, code)
+
+    # Tempo fora dos comandos aninhados (corpo do ENQUANTO, ramos do QUANDO)
+    def own(self):
+        return self.time - sum(statement.time for statement in self.nested)
+
+
+class ProfiledIterations(Node):
+    __slots__ = ("block", "loop")
+
+    def __init__(self, block, loop):
+        super().__init__(block.value, [block])
+        self.locate(block)
+        self.block = block
+        self.loop = loop
+
+    def Evaluate(self, symbol_table):
+        self.loop.iterations += 1
+        return self.block.Evaluate(symbol_table)
+
+    def Generate(self, symbol_table, code):
+        self.block.Generate(symbol_table, code)
+
+
+class Profiler:
+    def __init__(self):
+        self.statements = []
+        self.total = 0.0
+
+    def instrument(self, root):
+        if isinstance(root, FlatAST):
+            root = root.node(0)
+
+        pending = [(root, None)]
+
+        while pending:
+            block, parent = pending.pop()
+            statements = []
+
+            for statement in block.children:
+                node_type = type(statement)
+
+                if node_type is NoOp:
+                    statements.append(statement)
+                    continue
+                elif node_type is Block:
+                    # Bloco solto (sobra de um QUANDO dobrado): os comandos dele contam para o pai
+                    pending.append((statement, parent))
+                    statements.append(statement)
+                    continue
+
+                profiled = ProfiledStatement(statement)
+                self.statements.append(profiled)
+
+                if parent is not None:
+                    parent.nested.append(profiled)
+
+                if node_type is If:
+                    pending.extend((branch, profiled) for branch in statement.children[1:])
+                elif node_type is While:
+                    pending.append((statement.children[1], profiled))
+                    statement.children[1] = ProfiledIterations(statement.children[1], profiled)
+
+                statements.append(profiled)
+
+            block.children = statements
+
+        return root
+
+    def run(self, root):
+        root = self.instrument(root)
+        start = time.perf_counter()
+
+        try:
+            root.Evaluate(SymbolTable())
+        finally:
+            self.total += time.perf_counter() - start
+
+    def entries(self):
+        # Mais caros primeiro, pelo tempo próprio de cada comando
+        entries = []
+
+        for statement in sorted(self.statements, key=lambda statement: statement.own(), reverse=True):
+            entry = {
+                "linha": statement.line,
+                "coluna": statement.column,
+                "comando": statement.value,
+                "execucoes": statement.count,
+                "tempo_total": statement.time,
+                "tempo_proprio": statement.own(),
+            }
+
+            if type(statement.node) is While:
+                entry["iteracoes"] = statement.iterations
+
+            entries.append(entry)
+
+        return entries
+
+    def export(self, filename):
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump({"tempo_total": self.total, "comandos": self.entries()}, file, ensure_ascii=False, indent=2)
+
+    def report(self, source=None, limit=20):
+        lines = source.splitlines() if source is not None else []
+        total = self.total or 1.0
+        rows = [f"{'posição':>9} {'comando':9} {'execuções':>10} {'iterações':>10} {'total ms':>10} {'próprio ms':>10} {'%':>6}  código"]
+
+        for entry in self.entries()[:limit]:
+            line = entry["linha"]
+            text = lines[line - 1].strip() if 0 < line <= len(lines) else ""
+            position = f"{line}:{entry['coluna']}" if line else "-"
+            iterations = entry.get("iteracoes", "")
+            rows.append(
+                f"{position:>9} {entry['comando']:9} {entry['execucoes']:>10} {iterations:>10} "
+                f"{entry['tempo_total'] * 1000:10.2f} {entry['tempo_proprio'] * 1000:10.2f} "
+                f"{entry['tempo_proprio'] / total * 100:5.1f}%  {text[:60]}"
+            )
+
+        rows.append(f"tempo total: {self.total * 1000:.2f} ms em {len(self.statements)} comandos")
+        return "\n".join(rows)
+
+
+# Telemetria das fases do compilador (--stats): tempo de parede, pico de memória alocada durante a
+# fase (tracemalloc), opcionalmente o pico de RSS do processo, e contadores (tokens, nós, linhas de
+# IR), em texto, JSON ou OpenMetrics.
+# O tempo de uma fase não inclui o das fases medidas dentro dela; no modo streaming, o léxico
+# roda dentro do sintático, uma linha por vez, e só o tempo dele é separado.
+class Telemetry:
+    enabled = True
+    COUNTERS = {
+        "tokens": "Tokens lidos pelo analisador léxico.",
+        "nos": "Nós da árvore sintática, antes das otimizações.",
+        "linhas_ir": "Linhas do .ll gerado.",
+        "tokens_por_segundo": "Tokens por segundo de análise léxica.",
+    }
+
+    def __init__(self, label=None, memory=True, rss=False):
+        self.label = label
+        self.memory = memory
+        self.rss = rss
+        self.phases = {}
+        self.counters = {}
+        self.inner = []
+        self.tracing = memory and not tracemalloc.is_tracing()
+
+        if self.tracing:
+            tracemalloc.start()
+
+    def close(self):
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def record(self, name, seconds, peak=None, rss=None):
+        phase = self.phases.setdefault(name, {"tempo": 0.0, "memoria_pico": None, "rss_pico": None, "chamadas": 0})
+        phase["tempo"] += seconds
+        phase["chamadas"] += 1
+
+        if peak is not None:
+            phase["memoria_pico"] = max(phase["memoria_pico"] or 0, peak)
+
+        if rss is not None:
+            phase["rss_pico"] = max(phase["rss_pico"] or 0, rss)
+
+    @staticmethod
+    def resetPeakRss():
+        # Zera o pico de RSS (VmHWM) do processo, no Linux 4.0 ou mais novo; sem isso, o pico
+        # medido é o do processo inteiro até o fim da fase
+        try:
+            with open("/proc/self/clear_refs", "w") as file:
+                file.write("5")
+        except OSError:
+            pass
+
+    @staticmethod
+    def peakRss():
+        try:
+            with open("/proc/self/status") as file:
+                for line in file:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def count(self, name, total):
+        self.counters[name] = self.counters.get(name, 0) + total
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        if self.rss:
+            self.resetPeakRss()
+
+        self.inner.append(0.0)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self.inner.pop()
+
+            if self.inner:
+                self.inner[-1] += elapsed
+
+            peak = tracemalloc.get_traced_memory()[1] - base if self.memory else None
+            self.record(name, elapsed - inner, peak, self.peakRss() if self.rss else None)
+
+    def timed(self, name, function):
+        # Para trechos curtos e frequentes dentro de outra fase: só o tempo
+        def timed(*args):
+            start = time.perf_counter()
+
+            try:
+                return function(*args)
+            finally:
+                elapsed = time.perf_counter() - start
+
+                if self.inner:
+                    self.inner[-1] += elapsed
+
+                self.record(name, elapsed)
+
+        return timed
+
+    def watch(self, tokenizer):
+        if isinstance(tokenizer, PreLexTokenizer):
+            self.count("tokens", len(tokenizer.tokens) - 1)
+        elif isinstance(tokenizer, StreamTokenizer):
+            fill = self.timed("lexico", tokenizer.fill)
+
+            def counted():
+                filled = fill()
+                self.count("tokens", len(tokenizer.pending))
+                return filled
+
+            tokenizer.fill = counted
+
+    def summary(self):
+        total = sum(phase["tempo"] for phase in self.phases.values())
+        lexing = self.phases.get("lexico", {}).get("tempo")
+        tokens = self.counters.get("tokens")
+        summary = {"arquivo": self.label, "tempo_total": total, "fases": self.phases, "contadores": dict(self.counters)}
+
+        if lexing and tokens is not None:
+            summary["contadores"]["tokens_por_segundo"] = tokens / lexing
+
+        return summary
+
+    def report(self):
+        summary = self.summary()
+        total = summary["tempo_total"] or 1.0
+        rows = [f"{'fase':14} {'tempo ms':>10} {'%':>6} {'pico de memória':>16}" + (f" {'pico de RSS':>12}" if self.rss else "")]
+
+        for name, phase in summary["fases"].items():
+            memory = "-" if phase["memoria_pico"] is None else f"{phase['memoria_pico'] / 1024:.1f} kB"
+            row = f"{name:14} {phase['tempo'] * 1000:10.2f} {phase['tempo'] / total * 100:5.1f}% {memory:>16}"
+
+            if self.rss:
+                rss = "-" if phase["rss_pico"] is None else f"{phase['rss_pico'] / (1 << 20):.1f} MB"
+                row += f" {rss:>12}"
+
+            rows.append(row)
+
+        rows.append(f"{'total':14} {summary['tempo_total'] * 1000:10.2f}")
+        rows.append(", ".join(f"{name.replace('_', ' ')}: {value:.0f}" for name, value in summary["contadores"].items()))
+        return "\n".join(rows)
+
+    def export(self, filename):
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def labels(**labels):
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+        return "{" + ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + "}"
+
+    def openMetrics(self):
+        summary = self.summary()
+        source = {"arquivo": self.label} if self.label is not None else {}
+        lines = []
+
+        def family(name, unit, description, samples):
+            lines.append(f"# TYPE {name} gauge")
+
+            if unit:
+                lines.append(f"# UNIT {name} {unit}")
+
+            lines.append(f"# HELP {name} {description}")
+            lines.extend(f"{name}{self.labels(**source, **labels)} {value}" for labels, value in samples)
+
+        family("lumen_fase_tempo_seconds", "seconds", "Tempo de parede de cada fase do compilador.",
+               [({"fase": name}, phase["tempo"]) for name, phase in summary["fases"].items()])
+        family("lumen_fase_memoria_pico_bytes", "bytes", "Pico de memória alocada durante a fase (tracemalloc).",
+               [({"fase": name}, phase["memoria_pico"]) for name, phase in summary["fases"].items() if phase["memoria_pico"] is not None])
+
+        if self.rss:
+            family("lumen_fase_rss_pico_bytes", "bytes", "Pico de RSS do processo durante a fase.",
+                   [({"fase": name}, phase["rss_pico"]) for name, phase in summary["fases"].items() if phase["rss_pico"] is not None])
+
+        for name, value in summary["contadores"].items():
+            family(f"lumen_{name}", None, self.COUNTERS[name], [({}, value)])
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def exportOpenMetrics(self, filename):
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(self.openMetrics())
+
+
+# Telemetria desligada: as fases não medem nada
+class NullTelemetry:
+    enabled = False
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def count(self, name, total):
+        pass
+
+    def watch(self, tokenizer):
+        pass
+
+
+# Cache em disco da árvore já analisada, na pasta de cache do usuário ($XDG_CACHE_HOME/lumen,
+# ~/.cache/lumen ou %LOCALAPPDATA%\lumen), e não ao lado dos fontes: as entradas são lidas com
+# pickle, então só vale uma pasta do próprio usuário que outros não possam escrever. A chave
+# combina o conteúdo do código, a versão do compilador, o próprio código do compilador e a versão
+# do Python; o cabeçalho de cada entrada repete essa marca e o hash do conteúdo, e os dois são
+# conferidos antes do pickle.load, então uma entrada velha ou corrompida nunca é desserializada.
+class ParseCache:
+    MAGIC = b"LUMENAST"
+    SUFFIX = ".ast"
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or self.userDirectory()
+
+        with open(os.path.abspath(__file__), "rb") as compiler:
+            compiler_hash = hashlib.sha256(compiler.read()).hexdigest()[:16]
+
+        self.tag = f"{COMPILER_VERSION}-{compiler_hash}-{sys.implementation.cache_tag}"
+
+    @staticmethod
+    def userDirectory():
+        base = os.environ.get("LOCALAPPDATA") if os.name == "nt" else os.environ.get("XDG_CACHE_HOME")
+        return os.path.join(base or os.path.join(os.path.expanduser("~"), ".cache"), "lumen")
+
+    @staticmethod
+    def private(status):
+        # Em sistemas POSIX: do usuário atual e sem escrita para o grupo e os outros
+        return not hasattr(os, "getuid") or (status.st_uid == os.getuid() and not status.st_mode & 0o022)
+
+    def trusted(self):
+        try:
+            return self.private(os.stat(self.directory))
+        except OSError:
+            return False
+
+    def key(self, code):
+        digest = hashlib.sha256(self.tag.encode())
+
+        if isinstance(code, str):
+            digest.update(code.encode())
+        else:
+            # Arquivo aberto: lê em blocos e volta ao início para o tokenizer
+            start = code.tell()
+
+            for chunk in iter(lambda: code.read(1 << 16), ""):
+                digest.update(chunk.encode())
+
+            code.seek(start)
+
+        return digest.hexdigest()
+
+    def path(self, key: str):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def header(self, payload: bytes):
+        return self.MAGIC + f"{self.tag}\n{hashlib.sha256(payload).hexdigest()}\n".encode()
+
+    def load(self, key: str):
+        if not self.trusted():
+            return None
+
+        try:
+            with open(self.path(key), "rb") as file:
+                if not self.private(os.fstat(file.fileno())):
+                    return None
+
+                if file.read(len(self.MAGIC)) != self.MAGIC:
+                    raise ValueError("Cabeçalho inválido")
+
+                tag = file.readline()
+                digest = file.readline()
+                payload = file.read()
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self.discard(key)
+            return None
+
+        if self.MAGIC + tag + digest != self.header(payload):
+            # Entrada de outra versão, incompleta ou alterada: descarta sem desserializar
+            self.discard(key)
+            return None
+
+        try:
+            program = pickle.loads(payload)
+        except Exception:
+            self.discard(key)
+            return None
+
+        if not isinstance(program, FlatAST):
+            self.discard(key)
+            return None
+
+        return program
+
+    def store(self, key: str, program):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+        if not self.trusted():
+            return
+
+        payload = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(self.header(payload))
+                file.write(payload)
+
+            # Escrita atômica: outro processo nunca vê uma entrada pela metade
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    def discard(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        # Só as árvores: o áudio do FALAR fica em uma subpasta do mesmo diretório
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith((self.SUFFIX, ".tmp")):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+
+KEYWORDS = {
+    "INICIO": "INICIO", "FIM": "FIM", "RECEBE": "RECEBE", "EXIBIR": "EXIBIR", "FALAR": "FALAR", 
+    "GUARDAR": "GUARDAR","COMO": "COMO", "COM": "COM", "QUANDO": "QUANDO", "SENAO": "SENAO",
+    "ENQUANTO": "ENQUANTO", "OU": "OU", "E": "E", "IGUAL": "IGUAL", "MAIOR": "MAIOR", "MENOR": "MENOR",
+    "MAIS": "MAIS", "MENOS": "MENOS", "CONCATENA": "CONCATENA", "VEZES": "VEZES", "DIVIDIDO": "DIVIDIDO",
+    "NAO": "NAO", "PERGUNTAR": "PERGUNTAR", "VERDADEIRO": "BOOL", "FALSO": "BOOL", "NUMERO": "TYPE_NUMERO",
+    "BOOLEANO": "TYPE_BOOL", "TEXTO": "TYPE_TEXTO"
+    }
+
+# Códigos numéricos dos tipos de token, usados no armazenamento compacto (TokenArray)
+TOKEN_TYPES = ("EOF", "NUMERO", "IDENTIFICADOR", "TEXTO", "ABREPAR", "FECHAPAR", "PONTOVIRG") + tuple(dict.fromkeys(KEYWORDS.values()))
+TOKEN_CODES = {token_type: code for code, token_type in enumerate(TOKEN_TYPES)}
+KEYWORD_CODES = {word: TOKEN_CODES[token_type] for word, token_type in KEYWORDS.items()}
+
+# Espaços em branco e comentários INFORME: (até o fim da linha) são consumidos como prefixo de
+# cada token; o grupo casado identifica a categoria
+TOKEN_REGEX = re.compile(r"""
+    [ \n\r\t]*
+    (?:INFORME:[^\n]*[ \n\r\t]*)*
+    (?:
+        (\d+)                   # 1: número
+      | ([^\W\d_]\w*)           # 2: palavra-chave ou identificador
+      | "([^"]*)"               # 3: texto
+      | ([();])                 # 4: pontuação
+      | ([^ \n\r\t])            # 5: caractere inválido
+      | (\Z)                    # 6: fim do código depois de espaços ou de um comentário
+    )
+""", re.VERBOSE | re.DOTALL)
+
+PUNCTUATION_CODES = {"(": TOKEN_CODES["ABREPAR"], ")": TOKEN_CODES["FECHAPAR"], ";": TOKEN_CODES["PONTOVIRG"]}
+
+
+class Token:
+    __slots__ = ("type", "value", "line", "column")
+
+    def __init__(self, type: str, value, line: int = 0, column: int = 0):
+        self.type = type
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+# Tokens do programa inteiro em arrays paralelos: códigos de tipo, valores e offsets de início
+class TokenArray:
+    def __init__(self, source: str, position: int = 0):
+        self.types = array("B")
+        self.values = []
+        self.offsets = array("q")
+        self.scan(source, position)
+
+    def __len__(self):
+        return len(self.types)
+
+    def scan(self, source: str, position: int = 0):
+        add_type = self.types.append
+        add_value = self.values.append
+        add_offset = self.offsets.append
+        keyword_codes = KEYWORD_CODES
+        punctuation_codes = PUNCTUATION_CODES
+        ident_code = TOKEN_CODES["IDENTIFICADOR"]
+        number_code = TOKEN_CODES["NUMERO"]
+        string_code = TOKEN_CODES["TEXTO"]
+
+        for match in TOKEN_REGEX.finditer(source, position):
+            group = match.lastindex
+
+            if group == 2:
+                word = match.group(2)
+                add_type(keyword_codes.get(word, ident_code))
+                add_value(word)
+            elif group == 4:
+                char = match.group(4)
+                add_type(punctuation_codes[char])
+                add_value(char)
+            elif group == 1:
+                end = match.end()
+
+                if end < len(source) and source[end].isalpha():
+                    raise ValueError(f"Erro de sintaxe: número seguido de letra sem separação: {match.group(1)}{source[end]}")
+
+                add_type(number_code)
+                add_value(int(match.group(1)))
+            elif group == 3:
+                add_type(string_code)
+                add_value(match.group(3))
+                add_offset(match.start(3) - 1)
+                continue
+            elif group == 6:
+                break
+            else:
+                if match.group(5) == '"':
+                    raise ValueError("String não fechada corretamente com aspas.")
+
+                raise ValueError("Caractere inválido")
+
+            add_offset(match.start(group))
+
+        self.types.append(TOKEN_CODES["EOF"])
+        self.values.append(None)
+        self.offsets.append(len(source))
+
+
+class Tokenizer:
+    def __init__(self, source: str, position: int, next: Token):
+        self.source = source
+        self.position = position
+        self.next = next
+        self.keywords = KEYWORDS
+        self.line = 1
+        self.line_start = position
+    
+    def selectNext(self):
+        while self.position < len(self.source) and self.source[self.position] in {' ', '\n', '\r', '\t'}:
+            if self.source[self.position] == '\n':
+                self.line += 1
+                self.line_start = self.position + 1
+
+            self.position += 1
+
+        line = self.line
+        column = self.position - self.line_start + 1
+
+        if self.position < len(self.source):
+            char = self.source[self.position]
+
+            if char.isdigit():
+                num = ''
+                
+                while self.position < len(self.source) and self.source[self.position].isdigit():
+                    num += self.source[self.position]
+                    self.position += 1
+                
+                if self.position < len(self.source) and self.source[self.position].isalpha():
+                    raise ValueError(f"Erro de sintaxe: número seguido de letra sem separação: {num}{self.source[self.position]}")
+
+                self.next = Token("NUMERO", int(num), line, column)
+                return
+            elif char.isalpha():
+                ident = ''
+
+                while self.position < len(self.source) and (self.source[self.position].isalnum() or self.source[self.position] == '_'):
+                    ident += self.source[self.position]
+                    self.position += 1
+
+                token_type = self.keywords.get(ident, "IDENTIFICADOR")
+                
+                self.next = Token(token_type, ident, line, column)
+                return
+            elif char == '"':
+                self.position += 1
+                string_val = ''
+
+                while self.position < len(self.source) and self.source[self.position] != '"':
+                    if self.source[self.position] == '\n':
+                        self.line += 1
+                        self.line_start = self.position + 1
+
+                    string_val += self.source[self.position]
+                    self.position += 1
+
+                if self.position >= len(self.source) or self.source[self.position] != '"':
+                    raise ValueError("String não fechada corretamente com aspas.")
+
+                self.position += 1
+                self.next = Token("TEXTO", string_val, line, column)
+                return
+            elif char == '(': 
+                self.next = Token("ABREPAR", char, line, column)
+            elif char == ')':
+                self.next = Token("FECHAPAR", char, line, column)
+            elif char == ';': 
+                self.next = Token("PONTOVIRG", char, line, column)
+            else:
+                raise ValueError("Caractere inválido")
+            
+            self.position += 1
+        else:
+            self.next = Token("EOF", None, line, column)
+
+
+# Modo de varredura única: lexa todo o código de uma vez e o Parser percorre o TokenArray por índice
+class PreLexTokenizer(Tokenizer):
+    def __init__(self, source: str, position: int, next: Token):
+        super().__init__(source, position, next)
+        self.tokens = TokenArray(source, position)
+        self.index = -1
+        self.last = len(self.tokens) - 1
+
+        # Início de cada linha a partir da segunda, com uma sentinela depois do fim do código
+        self.line_starts = [match.end() for match in re.finditer("\n", source)]
+        self.line_starts.append(len(source) + 1)
+        self.line_start = 0
+        self.next_line = self.line_starts[0]
+
+    def selectNext(self):
+        index = self.index
+
+        if index < self.last:
+            index += 1
+            self.index = index
+
+        offset = self.tokens.offsets[index]
+
+        if offset >= self.next_line:
+            # O token está em uma linha adiante: avança pelos inícios de linha até ele
+            line_starts = self.line_starts
+            line = self.line
+
+            while offset >= line_starts[line - 1]:
+                line += 1
+
+            self.line = line
+            self.line_start = line_starts[line - 2]
+            self.next_line = line_starts[line - 1]
+
+        self.position = offset
+        self.next = Token(TOKEN_TYPES[self.tokens.types[index]], self.tokens.values[index], self.line, offset - self.line_start + 1)
+
+
+# Modo streaming: lê o arquivo linha a linha e lexa sob demanda, ignorando comentários,
+# mantendo em memória apenas os tokens da linha atual
+class StreamTokenizer(Tokenizer):
+    def __init__(self, stream, position: int = 0, next: Token = None):
+        super().__init__("", position, next)
+        self.stream = stream
+        self.pending = deque()
+        self.carry = ""
+        self.carry_line = 1
+        self.carry_column = 1
+        self.line_number = 0
+        self.line_offset = position
+        self.line = 1
+        self.column = 1
+
+    def selectNext(self):
+        while not self.pending:
+            if not self.fill():
+                self.position = self.line_offset
+                self.line = self.line_number + 1
+                self.column = 1
+                self.next = Token("EOF", None, self.line, self.column)
+                return
+
+        token_type, value, self.position, self.line, self.column = self.pending.popleft()
+        self.next = Token(token_type, value, self.line, self.column)
+
+    def fill(self):
+        line = self.stream.readline()
+
+        if not line:
+            if self.carry:
+                raise ValueError(f"String não fechada corretamente com aspas. (linha {self.carry_line}, coluna {self.carry_column})")
+
+            return False
+
+        self.line_number += 1
+
+        if self.carry:
+            # Texto aberto em uma linha anterior continua nesta linha
+            chunk = self.carry + line
+            chunk_offset = self.line_offset - len(self.carry)
+            chunk_line = self.carry_line
+            chunk_column = self.carry_column
+            self.carry = ""
+        else:
+            chunk = line
+            chunk_offset = self.line_offset
+            chunk_line = self.line_number
+            chunk_column = 1
+
+        self.line_offset += len(line)
+        self.scanChunk(chunk, chunk_offset, chunk_line, chunk_column)
+        return True
+
+    def scanChunk(self, chunk, chunk_offset, chunk_line, chunk_column):
+        pending = self.pending
+        keywords = KEYWORDS
+
+        for match in TOKEN_REGEX.finditer(chunk):
+            group = match.lastindex
+            start = match.start(group)
+
+            if group == 3:
+                start -= 1
+
+            newlines = chunk.count("\n", 0, start)
+
+            if newlines:
+                line = chunk_line + newlines
+                column = start - chunk.rfind("\n", 0, start)
+            else:
+                line = chunk_line
+                column = chunk_column + start
+
+            if group == 2:
+                word = match.group(2)
+                pending.append((keywords.get(word, "IDENTIFICADOR"), word, chunk_offset + start, line, column))
+            elif group == 4:
+                char = match.group(4)
+                pending.append((TOKEN_TYPES[PUNCTUATION_CODES[char]], char, chunk_offset + start, line, column))
+            elif group == 1:
+                end = match.end()
+
+                if end < len(chunk) and chunk[end].isalpha():
+                    raise ValueError(f"Erro de sintaxe: número seguido de letra sem separação: {match.group(1)}{chunk[end]} (linha {line}, coluna {column})")
+
+                pending.append(("NUMERO", int(match.group(1)), chunk_offset + start, line, column))
+            elif group == 3:
+                pending.append(("TEXTO", match.group(3), chunk_offset + start, line, column))
+            elif group == 6:
+                return
+            elif match.group(5) == '"':
+                # Texto ainda não fechado: guarda o restante e espera a próxima linha
+                self.carry = chunk[start:]
+                self.carry_line = line
+                self.carry_column = column
+                return
+            else:
+                raise ValueError(f"Caractere inválido (linha {line}, coluna {column})")
+
+
+# Operadores binários: tipo do token -> (operador do BinOp, precedência); todos associativos à esquerda
+BINARY_OPERATORS = {
+    "OU": ("OU", 1),
+    "E": ("E", 2),
+    "IGUAL": ("IGUAL", 3), "MAIOR": ("MAIOR", 3), "MENOR": ("MENOR", 3),
+    "MAIS": ("MAIS", 4), "MENOS": ("MENOS", 4), "CONCATENA": ("CONCATENA", 4),
+    "VEZES": ("VEZES", 5), "DIVIDIDO": ("DIVIDIDO", 5),
+}
+
+UNARY_OPERATORS = {"MAIS", "MENOS", "NAO"}
+
+LITERALS = {"NUMERO": IntVal, "IDENTIFICADOR": Identifier, "TEXTO": StrVal, "BOOL": BoolVal}
+
+
+class Parser:
+    def __init__(self, tokenizer: Tokenizer, recursive: bool = False):
+        self.tokenizer = tokenizer
+        self.recursive = recursive
 
 
     def parseFactor(self):
@@ -789,25 +4233,25 @@ class Parser:
 
         if token.type == "NUMERO":
             self.tokenizer.selectNext()
-            return IntVal(token.value)
+            return IntVal(token.value).locate(token)
         elif token.type == "IDENTIFICADOR":
             self.tokenizer.selectNext()
-            return Identifier(token.value)
+            return Identifier(token.value).locate(token)
         elif token.type == "TEXTO":
             self.tokenizer.selectNext()
-            return StrVal(token.value)
+            return StrVal(token.value).locate(token)
         elif token.type == "BOOL":
             self.tokenizer.selectNext()
-            return BoolVal(token.value)
+            return BoolVal(token.value).locate(token)
         elif token.type == "MAIS":
             self.tokenizer.selectNext()
-            return UnOp("MAIS", self.parseFactor())
+            return UnOp("MAIS", self.parseFactor()).locate(token)
         elif token.type == "MENOS":
             self.tokenizer.selectNext()
-            return UnOp("MENOS", self.parseFactor())
+            return UnOp("MENOS", self.parseFactor()).locate(token)
         elif token.type == "NAO":
             self.tokenizer.selectNext()
-            return UnOp("NAO", self.parseFactor())
+            return UnOp("NAO", self.parseFactor()).locate(token)
         elif token.type == "ABREPAR":
             self.tokenizer.selectNext()
             result = self.parseOrExpression()
@@ -817,7 +4261,7 @@ class Parser:
             
             self.tokenizer.selectNext()
             return result
-        elif self.tokenizer.next.type == "PERGUNTAR":
+        elif token.type == "PERGUNTAR":
             self.tokenizer.selectNext()
             
             if self.tokenizer.next.type != "ABREPAR":
@@ -829,7 +4273,7 @@ class Parser:
                 raise ValueError("Parênteses de fechamento esperados após 'reader()'")
             
             self.tokenizer.selectNext()
-            return Read()
+            return Read().locate(token)
         else:
             raise ValueError(f"Token inesperado: {token.type}")
 
@@ -844,9 +4288,9 @@ class Parser:
             right = self.parseFactor()
 
             if operador == "VEZES":
-                left = BinOp("VEZES", left, right)
+                left = BinOp("VEZES", left, right).locate(left)
             elif operador == "DIVIDIDO":
-                left = BinOp("DIVIDIDO", left, right)
+                left = BinOp("DIVIDIDO", left, right).locate(left)
 
         return left  
 
@@ -861,11 +4305,11 @@ class Parser:
             right = self.parseTerm()
 
             if operador == "MAIS":
-                left = BinOp("MAIS", left, right)
+                left = BinOp("MAIS", left, right).locate(left)
             elif operador == "MENOS":
-                left = BinOp("MENOS", left, right)
+                left = BinOp("MENOS", left, right).locate(left)
             elif operador == "CONCATENA":
-                left = BinOp("CONCATENA", left, right)
+                left = BinOp("CONCATENA", left, right).locate(left)
 
         return left
     
@@ -880,11 +4324,11 @@ class Parser:
             right = self.parseExpression()
 
             if operador == "IGUAL":
-                left = BinOp("IGUAL", left, right)
+                left = BinOp("IGUAL", left, right).locate(left)
             elif operador == "MAIOR":
-                left = BinOp("MENOR", left, right)
+                left = BinOp("MAIOR", left, right).locate(left)
             elif operador == "MENOR":
-                left = BinOp("MENOR", left, right)
+                left = BinOp("MENOR", left, right).locate(left)
 
         return left
     
@@ -897,7 +4341,7 @@ class Parser:
 
             right = self.parseRelationalExpression()
 
-            left = BinOp("E", left, right)
+            left = BinOp("E", left, right).locate(left)
 
         return left
     
@@ -909,29 +4353,129 @@ class Parser:
             self.tokenizer.selectNext()
             right = self.parseAndExpression()
 
-            left = BinOp("OU", left, right)
+            left = BinOp("OU", left, right).locate(left)
 
         return left      
     
 
+    def parseExpressionTree(self):
+        if self.recursive:
+            return self.parseOrExpression()
+
+        return self.parsePrecedence()
+
+
+    def parsePrecedence(self):
+        # Precedence climbing com pilhas explícitas: a profundidade de parênteses e operadores
+        # é limitada pela memória, não pelo limite de recursão do Python.
+        # Entradas da pilha de operadores: (operador, precedência); unários usam precedência None
+        # e o marcador de parênteses é ("(", 0).
+        tokenizer = self.tokenizer
+        selectNext = tokenizer.selectNext
+        binary_operators = BINARY_OPERATORS
+        unary_operators = UNARY_OPERATORS
+        literals = LITERALS
+        operands = []
+        operators = []
+        depth = 0
+
+        while True:
+            # Espera um operando, possivelmente precedido de operadores unários e parênteses
+            token = tokenizer.next
+            token_type = token.type
+
+            if token_type in unary_operators:
+                selectNext()
+                operators.append((token_type, None, token))
+                continue
+            elif token_type == "ABREPAR":
+                selectNext()
+                operators.append(("(", 0))
+                depth += 1
+                continue
+            elif token_type in literals:
+                selectNext()
+                operand = literals[token_type](token.value).locate(token)
+            elif token_type == "PERGUNTAR":
+                selectNext()
+
+                if tokenizer.next.type != "ABREPAR":
+                    raise ValueError("Parênteses esperados após 'reader'")
+
+                selectNext()
+
+                if tokenizer.next.type != "FECHAPAR":
+                    raise ValueError("Parênteses de fechamento esperados após 'reader()'")
+
+                selectNext()
+                operand = Read().locate(token)
+            else:
+                raise ValueError(f"Token inesperado: {token_type}")
+
+            while True:
+                # Unários se aplicam apenas ao fator que acabou de ser lido
+                while operators and operators[-1][1] is None:
+                    operator, _, origin = operators.pop()
+                    operand = UnOp(operator, operand).locate(origin)
+
+                token_type = tokenizer.next.type
+
+                if token_type == "FECHAPAR" and depth > 0:
+                    selectNext()
+
+                    while operators[-1][0] != "(":
+                        left = operands.pop()
+                        operand = BinOp(operators.pop()[0], left, operand).locate(left)
+
+                    operators.pop()
+                    depth -= 1
+                    continue
+
+                break
+
+            binary = binary_operators.get(token_type)
+
+            if binary is None:
+                if depth > 0:
+                    raise ValueError("Parênteses desbalanceados")
+
+                while operators:
+                    left = operands.pop()
+                    operand = BinOp(operators.pop()[0], left, operand).locate(left)
+
+                return operand
+
+            selectNext()
+            operator, precedence = binary
+
+            while operators and operators[-1][1] >= precedence:
+                left = operands.pop()
+                operand = BinOp(operators.pop()[0], left, operand).locate(left)
+
+            operands.append(operand)
+            operators.append((operator, precedence))
+    
+
     def parseStatement(self):
+        token = self.tokenizer.next
+
         if self.tokenizer.next.type == "PONTOVIRG":
             self.tokenizer.selectNext() 
-            return NoOp()
+            return NoOp().locate(token)
     
         if self.tokenizer.next.type == "IDENTIFICADOR":
-            identifier = Identifier(self.tokenizer.next.value)
+            identifier = Identifier(self.tokenizer.next.value).locate(self.tokenizer.next)
             self.tokenizer.selectNext()
 
             if self.tokenizer.next.type == "RECEBE":
                 self.tokenizer.selectNext()
-                expr = self.parseOrExpression()
+                expr = self.parseExpressionTree()
 
                 if self.tokenizer.next.type != "PONTOVIRG":
                     raise ValueError("Ponto e vírgula esperado")
                 
                 self.tokenizer.selectNext()
-                return Assignment(identifier, expr)
+                return Assignment(identifier, expr).locate(identifier)
         elif self.tokenizer.next.type == "EXIBIR":
             self.tokenizer.selectNext()
             
@@ -939,7 +4483,7 @@ class Parser:
                 raise ValueError("Parênteses esperados após 'print'")
             
             self.tokenizer.selectNext()
-            expr = self.parseOrExpression()
+            expr = self.parseExpressionTree()
             
             if self.tokenizer.next.type != "FECHAPAR":
                 raise ValueError("Parênteses fechando esperados após condição de 'print'")
@@ -950,7 +4494,7 @@ class Parser:
                 raise ValueError("Ponto e vírgula esperado")
 
             self.tokenizer.selectNext()
-            return Print(expr)
+            return Print(expr).locate(token)
         elif self.tokenizer.next.type == "FALAR":
             self.tokenizer.selectNext()
             
@@ -958,7 +4502,7 @@ class Parser:
                 raise ValueError("Parênteses esperados após 'print'")
             
             self.tokenizer.selectNext()
-            expr = self.parseOrExpression()
+            expr = self.parseExpressionTree()
             
             if self.tokenizer.next.type != "FECHAPAR":
                 raise ValueError("Parênteses fechando esperados após condição de 'print'")
@@ -969,14 +4513,14 @@ class Parser:
                 raise ValueError("Ponto e vírgula esperado")
 
             self.tokenizer.selectNext()
-            return Falar(expr)
+            return Falar(expr).locate(token)
         elif self.tokenizer.next.type == "GUARDAR":
             self.tokenizer.selectNext()
 
             if self.tokenizer.next.type != "IDENTIFICADOR":
                 raise ValueError("Identificador esperado após 'var'")
             
-            identifier = Identifier(self.tokenizer.next.value)
+            identifier = Identifier(self.tokenizer.next.value).locate(self.tokenizer.next)
             self.tokenizer.selectNext()
 
             if self.tokenizer.next.type != "COMO":
@@ -993,12 +4537,12 @@ class Parser:
 
             if self.tokenizer.next.type == "COM":
                 self.tokenizer.selectNext()
-                expression = self.parseOrExpression()
+                expression = self.parseExpressionTree()
 
             if self.tokenizer.next.type != "PONTOVIRG":
                 raise ValueError("Ponto e vírgula esperado")
             
-            return VarDeC(identifier, var_type, expression)
+            return VarDeC(identifier, var_type, expression).locate(token)
         elif self.tokenizer.next.type == "QUANDO":
             self.tokenizer.selectNext()
             
@@ -1006,7 +4550,7 @@ class Parser:
                 raise ValueError("Parênteses esperados após 'if'")
             
             self.tokenizer.selectNext()
-            condition = self.parseOrExpression()
+            condition = self.parseExpressionTree()
             
             if self.tokenizer.next.type != "FECHAPAR":
                 raise ValueError("Parênteses fechando esperados após condição de 'if'")
@@ -1020,7 +4564,7 @@ class Parser:
                 self.tokenizer.selectNext()
                 else_branch = self.parseBlock()
             
-            return If(condition, then_branch, else_branch)
+            return If(condition, then_branch, else_branch).locate(token)
         elif self.tokenizer.next.type == "ENQUANTO":
             self.tokenizer.selectNext()
             
@@ -1028,7 +4572,7 @@ class Parser:
                 raise ValueError("Parênteses esperados após 'while'")
             
             self.tokenizer.selectNext()
-            condition = self.parseOrExpression()
+            condition = self.parseExpressionTree()
             
             if self.tokenizer.next.type != "FECHAPAR":
                 raise ValueError("Parênteses fechando esperados após condição de 'while'")
@@ -1036,14 +4580,15 @@ class Parser:
             self.tokenizer.selectNext()
             block = self.parseBlock()
             
-            return While(condition, block)
+            return While(condition, block).locate(token)
         else:
             raise ValueError(f"Token inesperado: {self.tokenizer.next.type}")
 
-        return NoOp()
+        return NoOp().locate(token)
     
 
     def parseBlock(self):
+        token = self.tokenizer.next
         statements = []
 
         if self.tokenizer.next.type == "INICIO":
@@ -1059,51 +4604,506 @@ class Parser:
         else:
             raise ValueError("Chave esperada para início de bloco")
 
-        return Block(statements)
+        return Block(statements).locate(token)
     
 
     @staticmethod
-    def run(code):
-        tokenizer = Tokenizer(code, 0, None)
-        tokenizer.selectNext()
-        parser = Parser(tokenizer)
-        root = parser.parseBlock()
+    def tokenize(code):
+        # Código em memória é pré-lexado; arquivos abertos são lidos em streaming
+        if isinstance(code, str):
+            return PreLexTokenizer(code, 0, None)
 
-        if tokenizer.next.type != "EOF":
-            raise ValueError("Erro: expressão não consumiu todos os tokens. Verifique a sintaxe.")
-        
-        symbol_table = SymbolTable()
-        root.Evaluate(symbol_table)
+        return StreamTokenizer(code, 0, None)
 
     @staticmethod
-    def geracodigo(code, filename):
-        tokenizer = Tokenizer(code, 0, None)
-        tokenizer.selectNext()
-        parser = Parser(tokenizer)
-        root = parser.parseBlock()
+    def parse(code, telemetry=None):
+        telemetry = telemetry or NullTelemetry()
+
+        with telemetry.phase("lexico"):
+            tokenizer = Parser.tokenize(code)
+
+        telemetry.watch(tokenizer)
+
+        with telemetry.phase("sintatico"):
+            tokenizer.selectNext()
+            parser = Parser(tokenizer)
+            root = parser.parseBlock()
 
         if tokenizer.next.type != "EOF":
             raise ValueError("Erro: expressão não consumiu todos os tokens. Verifique a sintaxe.")
 
+        if telemetry.enabled:
+            telemetry.count("nos", ConstantFolder.count(root))
+
+        return root
+
+    @staticmethod
+    def load(code, flat=False, cache=None, telemetry=None):
+        telemetry = telemetry or NullTelemetry()
+
+        if cache is None:
+            root = Parser.parse(code, telemetry)
+
+            if not flat:
+                return root
+
+            with telemetry.phase("arvore plana"):
+                return FlatAST(root)
+
+        with telemetry.phase("cache"):
+            key = cache.key(code)
+            program = cache.load(key)
+
+        if program is None:
+            root = Parser.parse(code, telemetry)
+
+            with telemetry.phase("arvore plana"):
+                program = FlatAST(root)
+
+            with telemetry.phase("cache"):
+                cache.store(key, program)
+
+        if flat:
+            return program
+
+        with telemetry.phase("arvore plana"):
+            return program.node(0)
+
+    @staticmethod
+    def optimize(root, level=1, telemetry=None):
+        # Retorna a árvore otimizada e um resumo do que cada passo fez
+        telemetry = telemetry or NullTelemetry()
+        stats = {}
+
+        with telemetry.phase("otimizacao"):
+            if level >= 1:
+                folder = ConstantFolder()
+                root = folder.fold(root)
+                stats["nós removidos"] = folder.removed
+
+            if level >= 2:
+                loops = LoopOptimizer()
+                root = loops.optimize(root)
+                stats["expressões invariantes movidas"] = loops.hoisted
+                stats["multiplicações reduzidas"] = loops.reduced
+
+        return root, stats
+
+    @staticmethod
+    def run(code, flat=False, cache=None, bytecode=True, level=1, python=False, profiler=None, output=None, buffer_size=None, input_source=None):
+        if output is not None or buffer_size is not None:
+            # Sem essas opções, vale o que foi definido antes com Output.configure
+            Output.configure(output, buffer_size or 1 << 16)
+
+        if input_source is not None:
+            # Entrada em lote: de um arquivo, ou da entrada padrão com "-"
+            Input.configure(batch=True, source=None if input_source == "-" else input_source)
+
+        root, stats = Parser.optimize(Parser.load(code, flat, cache), level)
+
+        try:
+            if profiler is not None:
+                # O perfil mede o Evaluate, comando a comando
+                profiler.run(root)
+            elif python:
+                PythonTranspiler().run(root)
+            elif bytecode:
+                vm = VM()
+                vm.run(BytecodeCompiler(vm).compile(root))
+            else:
+                symbol_table = SymbolTable()
+                root.Evaluate(symbol_table)
+        finally:
+            # O que foi exibido antes de um erro também é escrito
+            Output.finish()
+
+        # O programa só termina depois das falas que ainda estão na fila
+        SpeechEngine.finish()
+        return stats
+
+    @staticmethod
+    def transpile(code, flat=False, cache=None, level=1):
+        # Código Python que Parser.run(python=True) executa, para inspeção
+        root, stats = Parser.optimize(Parser.load(code, flat, cache), level)
+        return PythonTranspiler().source(root)
+
+    @staticmethod
+    def geracodigo(code, filename, flat=False, cache=None, level=1, stream=True, output=None, buffer_size=1 << 16, telemetry=None):
+        telemetry = telemetry or NullTelemetry()
+        root, stats = Parser.optimize(Parser.load(code, flat, cache, telemetry), level, telemetry)
         symbol_table = SymbolTable()
-        instructions = root.Generate(symbol_table)
-        code_generator = Code()
 
-        code_generator.append(instructions)
-        code_generator.dump(filename)
-    
+        # O Generate usa os tipos anotados pelo TypeChecker; na árvore plana, cada comando é
+        # verificado logo depois de reconstruído
+        checker = TypeChecker()
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        raise ValueError("Uso incorreto do programa.\nUse (exemplo): python main.py 'arquivo.zig'")
+        with telemetry.phase("tipos"):
+            checker.collect(root)
+
+        with (Code.temporary() if stream else contextlib.nullcontext()) as body:
+            code_generator = Code(body, output, buffer_size)
+
+            if isinstance(root, FlatAST):
+                for index in root.statements():
+                    with telemetry.phase("arvore plana"):
+                        statement = root.node(index)
+
+                    with telemetry.phase("tipos"):
+                        checker.statement(statement)
+
+                    with telemetry.phase("geracao"):
+                        statement.Generate(symbol_table, code_generator)
+            else:
+                with telemetry.phase("tipos"):
+                    checker.statement(root)
+
+                with telemetry.phase("geracao"):
+                    root.Generate(symbol_table, code_generator)
+
+            checker.report()
+
+            with telemetry.phase("escrita"):
+                code_generator.dump(filename)
+
+        if telemetry.enabled:
+            with open(os.path.splitext(filename)[0] + ".ll", encoding="utf-8") as f:
+                telemetry.count("linhas_ir", sum(1 for _ in f))
+
+        return stats
+
+    @staticmethod
+    def verify(filename):
+        # Confere o .ll gerado com as ferramentas do LLVM, quando instaladas
+        output_name = os.path.splitext(filename)[0] + ".ll"
+        checked = []
+
+        for command in (["llvm-as", "-o", os.devnull, output_name], ["opt", "-verify", "-o", os.devnull, output_name]):
+            if shutil.which(command[0]) is None:
+                continue
+
+            result = subprocess.run(command, capture_output=True, text=True)
+
+            if result.returncode != 0:
+                raise ValueError(f"LLVM IR inválido ({command[0]}):\n{result.stderr}")
+
+            checked.append(command[0])
+
+        return checked
+
+
+# Compilação em lote (main.py build): expande arquivos, pastas e padrões glob em arquivos .lumen e
+# compila cada um com o Parser.geracodigo em processos separados, que já trazem o compilador
+# importado. Um .ll em dia é pulado: pela data, quando é mais novo que o .lumen e que o próprio
+# compilador, ou pelo hash, quando a chave do código, do compilador e das opções bate com a
+# gravada em __lumencache__/build.json ao lado dos fontes. O erro de um arquivo é relatado e não
+# para os outros.
+class BatchBuild:
+    DIRECTORY = "__lumencache__"
+    MANIFEST = "build.json"
+    CHECKS = ("data", "hash")
+
+    def __init__(self, jobs=None, check="data", cache=True, level=1, output=None, buffer_size=1 << 16, verify=False, force=False):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.check = check
+        self.cache = cache
+        self.level = level
+        self.output = output
+        self.buffer_size = buffer_size
+        self.verify = verify
+        self.force = force
+        self.compiler_time = os.path.getmtime(os.path.abspath(__file__))
+        self.options = {"nivel": level, "saida": output, "buffer": buffer_size}
+        self.keys = ParseCache()
+        self.manifests = {}
+        self.changed = set()
+
+    @staticmethod
+    def expand(targets):
+        # Devolve os arquivos .lumen, sem repetição, e os alvos que não levaram a nenhum
+        files = []
+        missing = []
+
+        for target in targets:
+            if os.path.isdir(target) or os.path.isfile(target):
+                matches = [target]
+            else:
+                matches = sorted(glob.glob(target, recursive=True))
+
+            found = []
+
+            for match in matches:
+                if os.path.isdir(match):
+                    for directory, subdirectories, names in os.walk(match):
+                        subdirectories[:] = sorted(name for name in subdirectories if name != BatchBuild.DIRECTORY and not name.startswith("."))
+                        found.extend(os.path.join(directory, name) for name in sorted(names) if name.endswith(".lumen"))
+                elif match.endswith(".lumen") or match == target:
+                    found.append(match)
+
+            if not found:
+                missing.append(target)
+
+            files.extend(found)
+
+        return list(dict.fromkeys(os.path.normpath(file) for file in files)), missing
+
+    @staticmethod
+    def compile(source, cache, level, output, buffer_size, verify):
+        # Roda no processo de trabalho: devolve as estatísticas do -O ou a mensagem de erro
+        start = time.perf_counter()
+
+        try:
+            if not source.endswith('.lumen'):
+                raise ValueError("O arquivo deve ter a extensão '.lumen'.")
+
+            with open(source, 'r') as file:
+                stats = Parser.geracodigo(file, source, cache=ParseCache() if cache else None, level=level, output=output, buffer_size=buffer_size)
 
-    arquivo = sys.argv[1]
+            if verify:
+                Parser.verify(source)
+        except Exception as error:
+            return None, str(error) or type(error).__name__, time.perf_counter() - start
+
+        return stats, None, time.perf_counter() - start
+
+    def directory(self, source):
+        return os.path.join(os.path.dirname(os.path.abspath(source)), self.DIRECTORY)
+
+    def manifest(self, source):
+        directory = self.directory(source)
+
+        if directory not in self.manifests:
+            try:
+                with open(os.path.join(directory, self.MANIFEST), encoding="utf-8") as file:
+                    entries = json.load(file)
+            except (OSError, ValueError):
+                entries = {}
+
+            self.manifests[directory] = entries if isinstance(entries, dict) else {}
+
+        return self.manifests[directory]
+
+    def key(self, source):
+        with open(source, 'r') as file:
+            return self.keys.key(file)
+
+    def upToDate(self, source, key):
+        # O manifesto guarda as opções de cada .ll nos dois modos: um .ll gerado com outro -O,
+        # --saida ou --buffer está desatualizado mesmo com a data e o código em dia
+        target = os.path.splitext(source)[0] + ".ll"
+        entry = self.manifest(source).get(os.path.basename(source))
+
+        if self.force or not os.path.exists(target):
+            return False
+
+        if not isinstance(entry, dict) or entry.get("opcoes") != self.options:
+            return False
+
+        if self.check == "hash":
+            return entry.get("codigo") == key
+
+        return os.path.getmtime(target) >= max(os.path.getmtime(source), self.compiler_time)
+
+    def record(self, source, key):
+        entry = {"opcoes": self.options}
+
+        if key is not None:
+            entry["codigo"] = key
+
+        self.manifest(source)[os.path.basename(source)] = entry
+        self.changed.add(self.directory(source))
+
+    def save(self):
+        for directory in self.changed:
+            entries = self.manifests[directory]
+            os.makedirs(directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(entries, file, indent=1, sort_keys=True)
+
+            os.replace(temporary, os.path.join(directory, self.MANIFEST))
+
+        self.changed.clear()
+
+    def run(self, targets, report=None):
+        # Devolve {arquivo: (situação, estatísticas ou mensagem, segundos)}, na ordem dos alvos;
+        # a situação é "ok", "em dia" ou "erro", e o report recebe cada resultado assim que sai
+        report = report or (lambda source, result: None)
+        files, missing = self.expand(targets)
+        results = {target: ("erro", "nenhum arquivo .lumen encontrado", 0.0) for target in missing}
+        pending = {}
+
+        for target in missing:
+            report(target, results[target])
+
+        for source in files:
+            try:
+                key = self.key(source) if self.check == "hash" else None
+                current = self.upToDate(source, key)
+            except (OSError, ValueError) as error:
+                results[source] = ("erro", str(error), 0.0)
+                report(source, results[source])
+                continue
+
+            if current:
+                results[source] = ("em dia", None, 0.0)
+                report(source, results[source])
+            else:
+                pending[source] = key
+
+        def finish(source, result):
+            stats, error, seconds = result
+
+            if error is None:
+                self.record(source, pending[source])
+                results[source] = ("ok", stats, seconds)
+            else:
+                results[source] = ("erro", error, seconds)
+
+            report(source, results[source])
+
+        options = (self.cache, self.level, self.output, self.buffer_size, self.verify)
+
+        # Os maiores primeiro, para nenhum processo ficar com um arquivo grande no fim do lote
+        order = sorted(pending, key=lambda source: -os.path.getsize(source))
+
+        try:
+            if self.jobs == 1 or len(order) <= 1:
+                for source in order:
+                    finish(source, self.compile(source, *options))
+            else:
+                with concurrent.futures.ProcessPoolExecutor(min(self.jobs, len(order))) as pool:
+                    futures = {pool.submit(self.compile, source, *options): source for source in order}
+
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            result = future.result()
+                        except concurrent.futures.BrokenExecutor:
+                            result = None, "o processo de compilação terminou de forma anormal", 0.0
+
+                        finish(futures[future], result)
+        finally:
+            self.save()
+
+        return {target: results[target] for target in missing + files}
+
+
+def build(argv):
+    argumentos = argparse.ArgumentParser(prog="main.py build", description="Compila vários arquivos .lumen em paralelo, pulando os que já têm o .ll em dia")
+    argumentos.add_argument("alvos", nargs="+", help="arquivos .lumen, pastas (procuradas recursivamente) ou padrões glob, como 'exercicios/**/*.lumen'")
+    argumentos.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="processos de compilação (padrão: um por CPU)")
+    argumentos.add_argument("--checagem", choices=BatchBuild.CHECKS, default="data", help=f"como decidir que um .ll está em dia: pela data dos arquivos ou pelo hash do código; nos dois casos, as opções -O, --saida e --buffer de cada .ll ficam em {BatchBuild.DIRECTORY}/{BatchBuild.MANIFEST} e mudá-las recompila (padrão: data)")
+    argumentos.add_argument("--forcar", action="store_true", help="compila todos os arquivos, mesmo os que estão em dia")
+    argumentos.add_argument("--no-cache", action="store_true", help=f"não lê nem grava a árvore no cache do usuário ({ParseCache.userDirectory()})")
+    argumentos.add_argument("--verificar", action="store_true", help="valida cada .ll gerado com llvm-as e opt -verify, se estiverem instalados")
+    argumentos.add_argument("-O", dest="nivel", type=int, choices=(0, 1, 2), default=1, help="nível de otimização, como na compilação de um arquivo (padrão: -O1)")
+    argumentos.add_argument("--saida", choices=tuple(OUTPUT_POLICIES), help="política de saída dos programas gerados, como na compilação de um arquivo")
+    argumentos.add_argument("--buffer", type=int, default=1 << 16, help="tamanho em bytes do buffer de saída dos programas gerados (padrão: 65536)")
+    opcoes = argumentos.parse_args(argv)
+
+    if opcoes.jobs < 1:
+        argumentos.error("--jobs precisa ser pelo menos 1")
+
+    lote = BatchBuild(opcoes.jobs, opcoes.checagem, not opcoes.no_cache, opcoes.nivel, opcoes.saida, opcoes.buffer, opcoes.verificar, opcoes.forcar)
+
+    def relatar(arquivo, resultado):
+        situacao, detalhe, segundos = resultado
+
+        if situacao == "ok":
+            print(f"ok    {arquivo} ({segundos * 1000:.0f} ms)", file=sys.stderr, flush=True)
+        elif situacao == "erro":
+            print(f"ERRO  {arquivo}: {detalhe}", file=sys.stderr, flush=True)
+
+    inicio = time.perf_counter()
+    resultados = lote.run(opcoes.alvos, relatar)
+    totais = {situacao: sum(1 for resultado in resultados.values() if resultado[0] == situacao) for situacao in ("ok", "em dia", "erro")}
+    resumo = {}
+
+    for situacao, detalhe, _ in resultados.values():
+        if situacao == "ok":
+            for descricao, total in (detalhe or {}).items():
+                resumo[descricao] = resumo.get(descricao, 0) + total
+
+    if resumo:
+        print(f"-O{opcoes.nivel}: " + ", ".join(f"{total} {descricao}" for descricao, total in resumo.items()), file=sys.stderr)
+
+    print(f"{totais['ok']} compilados, {totais['em dia']} em dia, {totais['erro']} com erro em {time.perf_counter() - inicio:.2f} s ({opcoes.jobs} processos)", file=sys.stderr)
+    return 1 if totais["erro"] else 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["build"]:
+        sys.exit(build(sys.argv[2:]))
+
+    argumentos = argparse.ArgumentParser(description="Compilador LumenScript: gera LLVM IR (.ll) a partir de um arquivo .lumen; use 'main.py build' para compilar vários de uma vez")
+    argumentos.add_argument("arquivo", help="arquivo .lumen de entrada")
+    argumentos.add_argument("--no-cache", action="store_true", help=f"não lê nem grava a árvore no cache do usuário ({ParseCache.userDirectory()})")
+    argumentos.add_argument("--clear-cache", action="store_true", help="apaga as árvores guardadas no cache do usuário antes de compilar")
+    argumentos.add_argument("--verificar", action="store_true", help="valida o .ll gerado com llvm-as e opt -verify, se estiverem instalados")
+    argumentos.add_argument("-O", dest="nivel", type=int, choices=(0, 1, 2), default=1, help="-O0 desliga as otimizações, -O1 dobra constantes e remove ramos mortos e -O2 também otimiza os laços (padrão: -O1)")
+    argumentos.add_argument("--saida", choices=tuple(OUTPUT_POLICIES), help="quando a saída do EXIBIR é escrita, no programa gerado ou no interpretador: a cada linha, quando o buffer enche ou no fim (padrão: por linha no terminal, por bloco redirecionada)")
+    argumentos.add_argument("--buffer", type=int, default=1 << 16, help="tamanho em bytes do buffer de saída, no programa gerado ou no interpretador (padrão: 65536)")
+    argumentos.add_argument("--executar", action="store_true", help="executa o programa no interpretador em vez de gerar o .ll")
+    argumentos.add_argument("--entrada", metavar="ARQUIVO", help="com --executar ou --profile, lê as respostas do PERGUNTAR em lote, uma por linha, do arquivo ou da entrada padrão com '-'")
+    argumentos.add_argument("--stats", action="store_true", help="mostra o tempo, o pico de memória e os contadores de cada fase da compilação")
+    argumentos.add_argument("--stats-json", metavar="ARQUIVO", help="grava as medidas das fases em JSON")
+    argumentos.add_argument("--stats-openmetrics", metavar="ARQUIVO", help="grava as medidas das fases no formato texto do OpenMetrics")
+    argumentos.add_argument("--stats-sem-memoria", action="store_true", help="não mede o pico de memória; o tracemalloc deixa todas as fases várias vezes mais lentas")
+    argumentos.add_argument("--profile", action="store_true", help="executa o programa no interpretador em vez de gerar o .ll e mostra os comandos mais demorados")
+    argumentos.add_argument("--profile-json", metavar="ARQUIVO", help="com --profile, grava o perfil completo em JSON")
+    opcoes = argumentos.parse_args()
+
+    arquivo = opcoes.arquivo
 
     if not arquivo.endswith('.lumen'):
         raise ValueError("O arquivo deve ter a extensão '.lumen'.")
 
+    cache = None if opcoes.no_cache else ParseCache()
+
+    if opcoes.clear_cache:
+        ParseCache().clear()
+
+    if opcoes.profile:
+        perfil = Profiler()
+
+        with open(arquivo, 'r') as file:
+            Parser.run(file, cache=cache, bytecode=False, level=opcoes.nivel, profiler=perfil, output=opcoes.saida, buffer_size=opcoes.buffer, input_source=opcoes.entrada)
+
+        with open(arquivo, 'r') as file:
+            print(perfil.report(file.read()), file=sys.stderr)
+
+        if opcoes.profile_json:
+            perfil.export(opcoes.profile_json)
+
+        sys.exit(0)
+
+    if opcoes.executar:
+        with open(arquivo, 'r') as file:
+            Parser.run(file, cache=cache, level=opcoes.nivel, output=opcoes.saida, buffer_size=opcoes.buffer, input_source=opcoes.entrada)
+
+        sys.exit(0)
+
+    medir = opcoes.stats or opcoes.stats_json or opcoes.stats_openmetrics
+    telemetria = Telemetry(arquivo, memory=not opcoes.stats_sem_memoria) if medir else None
+
     with open(arquivo, 'r') as file:
-        expressao = file.read()
+        resumo = Parser.geracodigo(file, arquivo, cache=cache, level=opcoes.nivel, output=opcoes.saida, buffer_size=opcoes.buffer, telemetry=telemetria)
+
+    if telemetria is not None:
+        telemetria.close()
+
+        if opcoes.stats:
+            print(telemetria.report(), file=sys.stderr)
+
+        if opcoes.stats_json:
+            telemetria.export(opcoes.stats_json)
+
+        if opcoes.stats_openmetrics:
+            telemetria.exportOpenMetrics(opcoes.stats_openmetrics)
+
+    if opcoes.verificar:
+        ferramentas = Parser.verify(arquivo)
+        print(f"LLVM IR válido ({', '.join(ferramentas)})" if ferramentas else "llvm-as e opt não encontrados; .ll não verificado", file=sys.stderr)
 
-    expressao = PrePro.filter(expressao)
-    Parser.geracodigo(expressao, arquivo)
\ No newline at end of file
+    if resumo:
+        print(f"-O{opcoes.nivel}: " + ", ".join(f"{total} {descricao}" for descricao, total in resumo.items()), file=sys.stderr)
@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import BatchBuild
+
+PROGRAMA = "INICIO GUARDAR X COMO NUMERO COM 1 MAIS 2 ; EXIBIR(X) ; FIM"
+
+
+def compilar(alvos, **opcoes):
+    resultados = BatchBuild(jobs=1, cache=False, **opcoes).run([str(alvo) for alvo in alvos])
+    return {os.path.basename(arquivo): situacao for arquivo, (situacao, _, _) in resultados.items()}
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    (tmp_path / "a.lumen").write_text(PROGRAMA)
+    (tmp_path / "b.lumen").write_text(PROGRAMA.replace("2", "3"))
+    return tmp_path
+
+
+@pytest.mark.parametrize("checagem", BatchBuild.CHECKS)
+def test_arquivos_em_dia_sao_pulados(pasta, checagem):
+    assert compilar([pasta], check=checagem) == {"a.lumen": "ok", "b.lumen": "ok"}
+    assert compilar([pasta], check=checagem) == {"a.lumen": "em dia", "b.lumen": "em dia"}
+    assert compilar([pasta], check=checagem, force=True) == {"a.lumen": "ok", "b.lumen": "ok"}
+
+
+@pytest.mark.parametrize("checagem", BatchBuild.CHECKS)
+@pytest.mark.parametrize("opcoes", [{"level": 2}, {"output": "fim"}, {"buffer_size": 128}])
+def test_mudar_as_opcoes_desatualiza_o_ll(pasta, checagem, opcoes):
+    compilar([pasta], check=checagem)
+    assert compilar([pasta], check=checagem, **opcoes) == {"a.lumen": "ok", "b.lumen": "ok"}
+    assert compilar([pasta], check=checagem, **opcoes) == {"a.lumen": "em dia", "b.lumen": "em dia"}
+    assert compilar([pasta], check=checagem) == {"a.lumen": "ok", "b.lumen": "ok"}
+
+
+def test_manifesto_grava_as_opcoes(pasta):
+    compilar([pasta / "a.lumen"], check="hash", level=0, output="bloco", buffer_size=256)
+    compilar([pasta / "b.lumen"])
+
+    with open(pasta / BatchBuild.DIRECTORY / BatchBuild.MANIFEST, encoding="utf-8") as arquivo:
+        manifesto = json.load(arquivo)
+
+    assert manifesto["a.lumen"]["opcoes"] == {"nivel": 0, "saida": "bloco", "buffer": 256}
+    assert manifesto["a.lumen"]["codigo"]
+    assert manifesto["b.lumen"] == {"opcoes": {"nivel": 1, "saida": None, "buffer": 1 << 16}}
+
+
+def test_hash_percebe_mudanca_no_codigo(pasta):
+    compilar([pasta], check="hash")
+    (pasta / "a.lumen").write_text(PROGRAMA.replace("1 MAIS", "5 MAIS"))
+    os.utime(pasta / "a.lumen", (0, 0))
+
+    assert compilar([pasta], check="hash") == {"a.lumen": "ok", "b.lumen": "em dia"}
+
+
+def test_ll_sem_registro_no_manifesto_e_recompilado(pasta):
+    compilar([pasta])
+    os.remove(pasta / BatchBuild.DIRECTORY / BatchBuild.MANIFEST)
+
+    assert compilar([pasta]) == {"a.lumen": "ok", "b.lumen": "ok"}
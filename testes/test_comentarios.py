@@ -0,0 +1,46 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Output, Parser
+
+
+PROGRAMA = """INICIO INFORME: comentário depois de um token
+    INFORME: linha só de comentário, com "aspas" e ( ;
+    GUARDAR T COMO TEXTO COM "INFORME: dentro do texto" ; INFORME: fim
+    EXIBIR(T) ;
+FIM INFORME: último comentário, sem nada depois"""
+
+
+def tokens(codigo):
+    tokenizer = Parser.tokenize(codigo)
+    lidos = []
+
+    while True:
+        tokenizer.selectNext()
+        lidos.append((tokenizer.next.type, tokenizer.next.value, tokenizer.next.line, tokenizer.next.column))
+
+        if tokenizer.next.type == "EOF":
+            return lidos[:-1]
+
+
+def test_comentarios_sao_ignorados_nos_dois_tokenizers():
+    memoria = tokens(PROGRAMA)
+
+    assert memoria == tokens(io.StringIO(PROGRAMA))
+    assert [tipo for tipo, _, _, _ in memoria] == [
+        "INICIO", "GUARDAR", "IDENTIFICADOR", "COMO", "TYPE_TEXTO", "COM", "TEXTO", "PONTOVIRG",
+        "EXIBIR", "ABREPAR", "IDENTIFICADOR", "FECHAPAR", "PONTOVIRG", "FIM",
+    ]
+    assert memoria[6][1:] == ("INFORME: dentro do texto", 3, 30)
+
+
+def test_programa_com_comentarios_executa(capsys):
+    Output.configure("linha")
+
+    for codigo in (PROGRAMA, io.StringIO(PROGRAMA)):
+        Parser.run(codigo)
+
+    assert capsys.readouterr().out == "INFORME: dentro do texto\n" * 2
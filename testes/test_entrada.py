@@ -0,0 +1,96 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from main import Input, Output, Parser
+
+BACKENDS = [{"bytecode": True}, {"python": True}, {"bytecode": False}]
+
+
+def executar(capsys, monkeypatch, comandos, entrada, **opcoes):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(entrada))
+    Input.configure()
+    Output.configure("linha")
+    Parser.run(f"INICIO {comandos} FIM", **opcoes)
+    return capsys.readouterr().out
+
+
+# PERGUNTAR() sozinho do lado direito de GUARDAR ou RECEBE lê no tipo da variável
+@pytest.mark.parametrize("opcoes", BACKENDS)
+@pytest.mark.parametrize("comandos, entrada, saida", [
+    ("GUARDAR N COMO NUMERO COM PERGUNTAR() ; EXIBIR(N MAIS 1) ;", "-30\n", "-29\n"),
+    ("GUARDAR N COMO NUMERO ; N RECEBE PERGUNTAR() ; EXIBIR(N VEZES 2) ;", "21\n", "42\n"),
+    ("GUARDAR T COMO TEXTO COM PERGUNTAR() ; EXIBIR(T CONCATENA \"!\") ;", "007\n", "007!\n"),
+    ("GUARDAR T COMO TEXTO ; T RECEBE PERGUNTAR() ; EXIBIR(T IGUAL \"12\") ;", "12\n", "true\n"),
+])
+def test_pergunta_le_no_tipo_da_variavel(capsys, monkeypatch, comandos, entrada, saida, opcoes):
+    assert executar(capsys, monkeypatch, comandos, entrada, **opcoes) == saida
+
+
+@pytest.mark.parametrize("opcoes", BACKENDS)
+def test_texto_para_variavel_numero_e_entrada_invalida(capsys, monkeypatch, opcoes):
+    with pytest.raises(ValueError, match="Entrada inválida: abc. Esperado um número inteiro."):
+        executar(capsys, monkeypatch, "GUARDAR N COMO NUMERO ; N RECEBE PERGUNTAR() ;", "abc\n", **opcoes)
+
+
+# Fora desse contexto, continua valendo a regra antiga: só dígitos é número, o resto é texto
+@pytest.mark.parametrize("opcoes", BACKENDS)
+def test_pergunta_sem_contexto_adivinha_o_tipo(capsys, monkeypatch, opcoes):
+    assert executar(capsys, monkeypatch, "EXIBIR(PERGUNTAR() MAIS 1) ;", "5\n", **opcoes) == "6\n"
+
+    with pytest.raises(TypeError, match="recebeu 'TEXTO' e 'NUMERO'"):
+        executar(capsys, monkeypatch, "EXIBIR(PERGUNTAR() MAIS 1) ;", "-5\n", **opcoes)
+
+
+def test_ll_le_no_tipo_do_contexto(tmp_path):
+    arquivo = tmp_path / "entrada.lumen"
+    Parser.geracodigo("INICIO GUARDAR N COMO NUMERO COM PERGUNTAR() ; FIM", str(arquivo))
+    numero = (tmp_path / "entrada.ll").read_text()
+    Parser.geracodigo("INICIO GUARDAR T COMO TEXTO COM PERGUNTAR() ; FIM", str(arquivo))
+    texto = (tmp_path / "entrada.ll").read_text()
+
+    assert "call i32 @lumen_read_int()" in numero
+    assert "call i8* @lumen_read_line()" in texto and "lumen_read_int" not in texto
+
+
+PROGRAMA = """
+INICIO
+    GUARDAR NOME COMO TEXTO COM PERGUNTAR() ;
+    GUARDAR SOMA COMO NUMERO COM 0 ;
+    GUARDAR I COMO NUMERO COM 0 ;
+    GUARDAR NOTA COMO NUMERO ;
+    ENQUANTO (I MENOR 3) INICIO NOTA RECEBE PERGUNTAR() ; SOMA RECEBE SOMA MAIS NOTA ; I RECEBE I MAIS 1 ; FIM
+    EXIBIR(NOME CONCATENA ": " CONCATENA SOMA) ;
+FIM
+"""
+
+
+def test_entrada_em_lote_de_arquivo(tmp_path, capsys):
+    # A última linha não tem \n no fim
+    respostas = tmp_path / "respostas.txt"
+    respostas.write_text("Ana\n7\n-2\n10")
+    Output.configure("linha")
+
+    try:
+        Parser.run(PROGRAMA, input_source=str(respostas))
+    finally:
+        Input.configure()
+
+    assert capsys.readouterr().out == "Ana: 15\n"
+
+
+def test_entrada_em_lote_pela_linha_de_comando(tmp_path):
+    arquivo = tmp_path / "notas.lumen"
+    arquivo.write_text(PROGRAMA)
+    comando = [sys.executable, os.path.join(RAIZ, "main.py"), str(arquivo), "--executar", "--no-cache", "--entrada"]
+
+    de_arquivo = tmp_path / "respostas.txt"
+    de_arquivo.write_text("Ana\n7\n-2\n10\n")
+    assert subprocess.run(comando + [str(de_arquivo)], capture_output=True, text=True, check=True).stdout == "Ana: 15\n"
+    assert subprocess.run(comando + ["-"], input="Bia\n1\n2\n3\n", capture_output=True, text=True, check=True).stdout == "Bia: 6\n"
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Parser
+
+OPERANDOS = 6000
+
+
+# Cadeias de milhares de operandos, como as de programas gerados por máquina, passam do limite
+# de recursão do Python se o Generate descer um nível por chamada
+@pytest.mark.parametrize("nivel", (0, 1, 2))
+def test_cadeia_longa_gera_ir(tmp_path, nivel):
+    arquivo = tmp_path / "cadeia.lumen"
+    soma = " MAIS ".join(["X"] * OPERANDOS)
+    conjuncao = "NAO " * OPERANDOS + "(" + " E ".join(["(X MAIOR 1)"] * OPERANDOS) + ")"
+    Parser.geracodigo(
+        f"""
+        INICIO
+            GUARDAR X COMO NUMERO COM PERGUNTAR() ;
+            GUARDAR Y COMO NUMERO COM {soma} ;
+            GUARDAR B COMO BOOLEANO COM {conjuncao} ;
+            EXIBIR(Y CONCATENA B) ;
+        FIM
+        """,
+        str(arquivo),
+        level=nivel,
+    )
+    codigo = (tmp_path / "cadeia.ll").read_text()
+
+    assert codigo.count(" = add i32 ") == OPERANDOS - 1
+    assert codigo.count(" = and i1 ") == OPERANDOS - 1
+    assert codigo.count(" = xor i1 ") == OPERANDOS
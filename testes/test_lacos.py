@@ -0,0 +1,106 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Input, Output, Parser
+
+# Nome -> (programa, entrada, saída esperada); o -O2 passa pelo LoopOptimizer, o -O0 não
+PROGRAMAS = {
+    "prefixo": ("""
+    INICIO
+        GUARDAR NOME COMO TEXTO COM PERGUNTAR() ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR 3)
+        INICIO
+            EXIBIR(NOME CONCATENA ", item " CONCATENA I) ;
+            I RECEBE I MAIS 1 ;
+        FIM
+    FIM
+    """, "Ana\n", "Ana, item 0\nAna, item 1\nAna, item 2\n"),
+    "inducao": ("""
+    INICIO
+        GUARDAR K COMO NUMERO COM PERGUNTAR() ;
+        GUARDAR I COMO NUMERO COM 1 ;
+        GUARDAR SOMA COMO NUMERO COM 0 ;
+        ENQUANTO (I MENOR 8)
+        INICIO
+            SOMA RECEBE SOMA MAIS I VEZES K ;
+            EXIBIR(I VEZES K MENOS I VEZES 3) ;
+            I RECEBE I MAIS 2 ;
+        FIM
+        EXIBIR(SOMA) ;
+    FIM
+    """, "5\n", "2\n6\n10\n14\n80\n"),
+    "pergunta": ("""
+    INICIO
+        GUARDAR K COMO NUMERO COM 10 ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR N COMO NUMERO ;
+        ENQUANTO (I MENOR 3)
+        INICIO
+            N RECEBE PERGUNTAR() ;
+            EXIBIR(N VEZES K MAIS I VEZES K MAIS I VEZES K CONCATENA " " CONCATENA K VEZES 2 CONCATENA PERGUNTAR()) ;
+            I RECEBE I MAIS 1 ;
+        FIM
+    FIM
+    """, "1\na\n2\nb\n3\nc\n", "10 20a\n40 20b\n70 20c\n"),
+    "divisao": ("""
+    INICIO
+        GUARDAR ZERO COMO NUMERO COM 0 ;
+        GUARDAR I COMO NUMERO COM 0 ;
+        GUARDAR X COMO NUMERO COM 7 ;
+        ENQUANTO (I MAIOR 0)
+        INICIO
+            X RECEBE 10 DIVIDIDO ZERO MAIS 1 DIVIDIDO 0 ;
+            I RECEBE I MENOS 1 ;
+        FIM
+        EXIBIR(X) ;
+    FIM
+    """, "", "7\n"),
+}
+
+BACKENDS = [{"bytecode": True}, {"python": True}, {"bytecode": False}]
+
+
+def executar(capsys, monkeypatch, codigo, entrada, **opcoes):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(entrada))
+    Input.configure()
+    Output.configure("linha")
+    Parser.run(codigo, **opcoes)
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize("opcoes", BACKENDS)
+@pytest.mark.parametrize("nome", sorted(PROGRAMAS))
+def test_run_da_a_mesma_saida_em_O0_e_O2(capsys, monkeypatch, nome, opcoes):
+    codigo, entrada, saida = PROGRAMAS[nome]
+
+    assert executar(capsys, monkeypatch, codigo, entrada, level=0, **opcoes) == saida
+    assert executar(capsys, monkeypatch, codigo, entrada, level=2, **opcoes) == saida
+
+
+# Sem isso, os testes acima passariam mesmo com o LoopOptimizer desligado
+@pytest.mark.parametrize("nome, movidas, reduzidas", [("prefixo", 1, 0), ("inducao", 0, 1), ("pergunta", 1, 1), ("divisao", 0, 0)])
+def test_o2_otimiza_os_lacos(nome, movidas, reduzidas):
+    _, stats = Parser.optimize(Parser.parse(PROGRAMAS[nome][0]), 2)
+
+    assert stats["expressões invariantes movidas"] == movidas
+    assert stats["multiplicações reduzidas"] == reduzidas
+
+
+@pytest.mark.skipif(shutil.which("lli") is None, reason="lli não está instalado")
+@pytest.mark.parametrize("nome", sorted(PROGRAMAS))
+def test_ll_da_a_mesma_saida_em_O0_e_O2(tmp_path, nome):
+    codigo, entrada, saida = PROGRAMAS[nome]
+    arquivo = tmp_path / "laco.lumen"
+
+    for nivel in (0, 2):
+        Parser.geracodigo(codigo, str(arquivo), level=nivel)
+        processo = subprocess.run(["lli", str(tmp_path / "laco.ll")], input=entrada, capture_output=True, text=True, check=True)
+        assert processo.stdout == saida, f"-O{nivel}"
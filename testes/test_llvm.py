@@ -0,0 +1,85 @@
+import glob
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+from cargas import CARGAS
+from gerador import gerar
+from main import OUTPUT_POLICIES, Parser
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("llvm-as") is None or shutil.which("opt") is None,
+    reason="llvm-as e opt não estão instalados",
+)
+
+EXEMPLOS = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.lumen")))
+
+
+# Aceita o código em memória ou um arquivo aberto, que passa pelo tokenizer em streaming
+def compilar(codigo, arquivo, **opcoes):
+    Parser.geracodigo(codigo, str(arquivo), **opcoes)
+    assert Parser.verify(str(arquivo)) == ["llvm-as", "opt"]
+
+
+@pytest.mark.parametrize("nivel", (0, 1, 2))
+@pytest.mark.parametrize("exemplo", EXEMPLOS, ids=os.path.basename)
+def test_exemplos_geram_ir_valido(tmp_path, exemplo, nivel):
+    with open(exemplo) as fonte:
+        compilar(fonte, tmp_path / "exemplo.lumen", level=nivel)
+
+
+@pytest.mark.parametrize("nivel", (0, 1, 2))
+@pytest.mark.parametrize("carga", sorted(CARGAS))
+def test_cargas_geram_ir_valido(tmp_path, carga, nivel):
+    gerador, tamanho = CARGAS[carga]
+    compilar(gerador(max(1, tamanho // 50)), tmp_path / "carga.lumen", level=nivel)
+
+
+@pytest.mark.parametrize("semente", range(5))
+def test_programas_gerados_geram_ir_valido(tmp_path, semente):
+    arquivo = tmp_path / "gerado.lumen"
+    gerar(str(arquivo), 300, profundidade=4, semente=semente)
+
+    with open(arquivo) as fonte:
+        compilar(fonte, arquivo, level=semente % 3)
+
+
+@pytest.mark.parametrize("politica", sorted(OUTPUT_POLICIES))
+def test_politicas_de_saida_geram_ir_valido(tmp_path, politica):
+    with open(EXEMPLOS[0]) as fonte:
+        compilar(fonte, tmp_path / "exemplo.lumen", output=politica, buffer_size=128)
+
+
+def test_entrada_fala_e_textos_geram_ir_valido(tmp_path):
+    codigo = """
+    INICIO
+        GUARDAR N COMO NUMERO COM PERGUNTAR() ;
+        GUARDAR T COMO TEXTO COM PERGUNTAR() ;
+        GUARDAR B COMO BOOLEANO COM N MAIOR 3 ;
+        T RECEBE T CONCATENA " " CONCATENA N CONCATENA " " CONCATENA B ;
+        QUANDO (B OU NAO (T IGUAL "")) INICIO FALAR(T) ; FIM
+        ENQUANTO (N MENOR 10) INICIO N RECEBE N MAIS 1 ; EXIBIR(N VEZES 2 DIVIDIDO 3) ; FIM
+        FALAR(N) ;
+    FIM
+    """
+    compilar(codigo, tmp_path / "misto.lumen")
+
+
+# O mesmo caso do benchmarks/estresse.py --operandos 3000: expressões longas pelo tokenizer em streaming
+def test_programa_gerado_com_expressoes_longas_gera_ir_valido(tmp_path):
+    arquivo = tmp_path / "longo.lumen"
+    gerar(str(arquivo), 20, profundidade=2, operandos=3000, semente=1)
+
+    with open(arquivo) as fonte:
+        compilar(fonte, arquivo)
+
+
+def test_cadeia_longa_gera_ir_valido(tmp_path):
+    cadeia = " MAIS ".join(["X"] * 6000)
+    compilar(f"INICIO GUARDAR X COMO NUMERO COM PERGUNTAR() ; EXIBIR(MENOS {cadeia} CONCATENA \"!\") ; FIM", tmp_path / "cadeia.lumen")
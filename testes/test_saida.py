@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+
+from main import Output, Parser
+
+PROGRAMA = """
+INICIO
+    GUARDAR I COMO NUMERO COM 0 ;
+    ENQUANTO (I MENOR 3) INICIO EXIBIR(I) ; I RECEBE I MAIS 1 ; FIM
+    EXIBIR(10 DIVIDIDO (I MENOS 3)) ;
+FIM
+"""
+
+
+@pytest.mark.parametrize("politica", ("linha", "bloco", "fim"))
+def test_run_configura_a_saida_e_escreve_o_que_veio_antes_do_erro(capsys, politica):
+    with pytest.raises(ZeroDivisionError):
+        Parser.run(PROGRAMA, output=politica, buffer_size=4)
+
+    assert (Output.instance.policy, Output.instance.size) == (politica, 4)
+    assert capsys.readouterr().out == "0\n1\n2\n"
+
+
+def test_executar_pela_linha_de_comando(tmp_path):
+    arquivo = tmp_path / "programa.lumen"
+    arquivo.write_text(PROGRAMA.replace("EXIBIR(10 DIVIDIDO (I MENOS 3)) ;", ""))
+
+    for politica in ("linha", "bloco", "fim"):
+        processo = subprocess.run(
+            [sys.executable, os.path.join(RAIZ, "main.py"), str(arquivo), "--executar", "--no-cache", "--saida", politica, "--buffer", "2"],
+            capture_output=True, text=True, check=True,
+        )
+        assert processo.stdout == "0\n1\n2\n"
+
+    assert not (tmp_path / "programa.ll").exists()
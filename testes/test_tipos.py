@@ -0,0 +1,103 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Output, Parser
+
+
+def programa(comandos):
+    return f"""
+    INICIO
+        GUARDAR N COMO NUMERO COM 1 ;
+        GUARDAR T COMO TEXTO COM "a" ;
+        GUARDAR B COMO BOOLEANO COM VERDADEIRO ;
+        EXIBIR("antes") ;
+        {comandos}
+    FIM
+    """
+
+
+def executar(capsys, codigo, **opcoes):
+    Output.configure("linha")
+    Parser.run(codigo, **opcoes)
+    return capsys.readouterr().out
+
+
+REJEITADOS = [
+    ("N RECEBE T ;", "Type mismatch in assignment to 'N'. Expected 'NUMERO', got 'TEXTO'."),
+    ("GUARDAR M COMO NUMERO COM \"x\" ;", "Tipo de variável 'M' não corresponde ao tipo da expressão."),
+    ("QUANDO (N) INICIO FIM", "Condição do 'QUANDO' deve ser do tipo 'BOOLEANO', mas recebeu 'NUMERO'"),
+    ("ENQUANTO (T) INICIO FIM", "Condição do 'ENQUANTO' deve ser do tipo 'BOOLEANO', mas recebeu 'TEXTO'"),
+    ("EXIBIR(N MAIS T) ;", "Operação aritmética requer operandos 'i32', mas recebeu 'NUMERO' e 'TEXTO'"),
+    ("EXIBIR(N E B) ;", "Operação lógica requer operandos 'bool', mas recebeu 'NUMERO' e 'BOOLEANO'"),
+    ("EXIBIR(N IGUAL T) ;", "Comparação requer operandos do mesmo tipo, mas recebeu 'NUMERO' e 'TEXTO'"),
+    ("EXIBIR(NAO N) ;", "Operador unário '!' requer tipo 'bool', mas recebeu 'NUMERO'"),
+    ("EXIBIR(MENOS T) ;", "Operador unário 'MENOS' requer tipo 'i32', mas recebeu 'TEXTO'"),
+]
+
+BACKENDS = [{"bytecode": True}, {"python": True}]
+
+
+@pytest.mark.parametrize("opcoes", BACKENDS)
+@pytest.mark.parametrize("comandos, mensagem", REJEITADOS)
+def test_erro_de_tipo_antes_de_executar(capsys, comandos, mensagem, opcoes):
+    with pytest.raises(TypeError) as erro:
+        executar(capsys, programa(comandos), **opcoes)
+
+    assert str(erro.value) == mensagem
+    assert capsys.readouterr().out == ""
+
+
+def test_evaluate_so_encontra_o_erro_ao_executar(capsys):
+    with pytest.raises(TypeError, match="Type mismatch in assignment to 'N'"):
+        executar(capsys, programa("N RECEBE T ;"), bytecode=False)
+
+    assert capsys.readouterr().out == "antes\n"
+
+
+def test_todos_os_erros_sao_reportados_juntos(capsys):
+    with pytest.raises(TypeError) as erro:
+        executar(capsys, programa("N RECEBE T ; B RECEBE N ;"))
+
+    assert str(erro.value).splitlines() == [
+        "Type mismatch in assignment to 'N'. Expected 'NUMERO', got 'TEXTO'.",
+        "Type mismatch in assignment to 'B'. Expected 'BOOLEANO', got 'NUMERO'.",
+    ]
+
+
+@pytest.mark.parametrize("comandos, mensagem", REJEITADOS)
+def test_erro_de_tipo_nao_gera_ll(tmp_path, comandos, mensagem):
+    arquivo = tmp_path / "programa.lumen"
+
+    with pytest.raises(TypeError) as erro:
+        Parser.geracodigo(programa(comandos), str(arquivo))
+
+    assert str(erro.value) == mensagem
+    assert not (tmp_path / "programa.ll").exists()
+
+
+@pytest.mark.parametrize("opcoes", BACKENDS + [{"bytecode": False}])
+def test_programas_bem_tipados_executam(capsys, opcoes):
+    comandos = """
+        N RECEBE N MAIS 1 ;
+        B RECEBE (N MAIOR 1) E NAO (T IGUAL "b") ;
+        QUANDO (B) INICIO EXIBIR(T CONCATENA N CONCATENA B) ; FIM
+    """
+
+    assert executar(capsys, programa(comandos), **opcoes) == "antes\na2true\n"
+
+
+@pytest.mark.parametrize("opcoes", BACKENDS)
+def test_tipo_desconhecido_fica_para_a_execucao(capsys, monkeypatch, opcoes):
+    # O PERGUNTAR dentro de uma expressão não tem tipo estático: o programa começa a executar e
+    # a verificação acontece quando o valor lido chega ao operador
+    monkeypatch.setattr(sys, "stdin", io.StringIO("abc\n"))
+
+    with pytest.raises(TypeError, match="Operação aritmética requer operandos 'i32'"):
+        executar(capsys, programa("N RECEBE N MAIS PERGUNTAR() ;"), **opcoes)
+
+    assert capsys.readouterr().out == "antes\n"
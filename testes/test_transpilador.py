@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import BytecodeCompiler, Output, Parser, PythonTranspiler
+
+
+def executar(capsys, codigo, **opcoes):
+    Output.configure("linha")
+    Parser.run(codigo, **opcoes)
+    return capsys.readouterr().out
+
+
+def cadeia(operandos):
+    return f"""
+    INICIO
+        GUARDAR X COMO NUMERO COM 2 ;
+        GUARDAR Y COMO NUMERO COM 0 ;
+        Y RECEBE {" MAIS ".join(["X"] * operandos)} ;
+        EXIBIR(Y) ;
+    FIM
+    """
+
+
+def aninhado(niveis):
+    abertura = "".join(f"QUANDO (X MAIOR {i}) INICIO X RECEBE X MAIS 1 ; " for i in range(niveis))
+    return f"INICIO GUARDAR X COMO NUMERO COM 1 ; {abertura}{'FIM ' * niveis}EXIBIR(X) ; FIM"
+
+
+@pytest.mark.parametrize("operandos", (10, PythonTranspiler.EXPRESSION_DEPTH - 1, 600, sys.getrecursionlimit() * 5))
+def test_expressoes_fundas_rodam_no_backend_python(capsys, operandos):
+    assert executar(capsys, cadeia(operandos), python=True) == f"{2 * operandos}\n"
+
+
+def test_expressao_rasa_e_traduzida_e_funda_cai_para_a_vm(monkeypatch):
+    raso = PythonTranspiler.EXPRESSION_DEPTH - 1
+    assert "def programa():" in Parser.transpile(cadeia(raso))
+
+    with pytest.raises(RecursionError):
+        Parser.transpile(cadeia(PythonTranspiler.EXPRESSION_DEPTH + 1))
+
+    # A geração do código Python fica dentro da proteção do run, que passa o programa para a VM
+    compilados = []
+    original = BytecodeCompiler.compile
+    monkeypatch.setattr(BytecodeCompiler, "compile", lambda self, root: compilados.append(root) or original(self, root))
+    Parser.run(cadeia(raso), python=True)
+    assert not compilados
+
+    Parser.run(cadeia(PythonTranspiler.EXPRESSION_DEPTH + 1), python=True)
+    assert len(compilados) == 1
+
+
+def test_blocos_alem_do_limite_do_python_caem_para_a_vm(capsys):
+    assert executar(capsys, aninhado(40), python=True) == executar(capsys, aninhado(40)) == "41\n"
+
+
+def test_erro_de_tipo_em_programa_fundo_continua_reportado(capsys):
+    codigo = cadeia(600).replace("EXIBIR(Y) ;", "Y RECEBE \"texto\" ;")
+
+    with pytest.raises(TypeError, match="Type mismatch in assignment to 'Y'"):
+        executar(capsys, codigo, python=True)
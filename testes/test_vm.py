@@ -0,0 +1,64 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from main import Output, Parser
+
+
+def programa(comando):
+    return f"""
+    INICIO
+        GUARDAR X COMO NUMERO COM 3 ;
+        GUARDAR Y COMO NUMERO COM 0 ;
+        GUARDAR B COMO BOOLEANO COM FALSO ;
+        {comando}
+        EXIBIR(Y) ;
+        EXIBIR(B) ;
+    FIM
+    """
+
+
+def executar(capsys, codigo, **opcoes):
+    Output.configure("linha")
+    Parser.run(codigo, **opcoes)
+    return capsys.readouterr().out
+
+
+# Cadeias fundas o bastante para passar do CLOSURE_DEPTH; as de 600 operandos rodavam no Evaluate
+CADEIAS = {
+    "esquerda": "Y RECEBE " + " MAIS ".join(["X"] * 600) + " ;",
+    "direita": "Y RECEBE " + "X MAIS (" * 300 + "X" + ")" * 300 + " ;",
+    "unarios": "Y RECEBE " + "MENOS " * 301 + "X ; B RECEBE " + "NAO " * 300 + "VERDADEIRO ;",
+    "misturada": "Y RECEBE " + " MAIS ".join(f"(X VEZES {i} DIVIDIDO 2 MENOS MENOS X)" for i in range(1, 150)) + " ;"
+                 + " B RECEBE " + " E ".join(f"(X MENOR {i} OU X IGUAL {i})" for i in range(100)) + " ;",
+}
+
+
+def test_expressoes_fundas_dao_o_mesmo_resultado_na_vm_e_no_evaluate(capsys):
+    for nome, comando in CADEIAS.items():
+        codigo = programa(comando)
+        assert executar(capsys, codigo) == executar(capsys, codigo, bytecode=False), nome
+
+
+@pytest.mark.parametrize("opcoes", [{}, {"bytecode": False}])
+def test_cadeia_mais_funda_que_o_limite_de_recursao(capsys, opcoes):
+    profundidade = sys.getrecursionlimit() * 5
+    codigo = programa(
+        "Y RECEBE " + " MAIS ".join(["X"] * profundidade) + " ;"
+        + " B RECEBE " + "NAO " * profundidade + "(" + " E ".join(["(X MAIOR 1)"] * profundidade) + ") ;"
+    )
+
+    assert executar(capsys, codigo, **opcoes) == f"{3 * profundidade}\ntrue\n"
+
+
+def test_erro_de_tipo_em_expressao_funda(capsys, monkeypatch):
+    # O PERGUNTAR no meio da expressão não tem tipo estático, então a soma é verificada ao executar
+    monkeypatch.setattr(sys, "stdin", io.StringIO("abc\n"))
+    codigo = programa("Y RECEBE " + " MAIS ".join(["X"] * 200) + " MAIS PERGUNTAR() ;")
+
+    with pytest.raises(TypeError, match="Operação aritmética requer operandos 'i32'"):
+        executar(capsys, codigo)